@@ -99,6 +99,42 @@ def apply_boundary_conditions(nodes, elements, geometry_params, contact_params,
 
     return fixed_dofs, contact_forces
 
+
+def find_contact_nodes(nodes, geometry_params, contact_region, tolerance=1e-6):
+    """
+    Returns the top-surface nodes inside the contact region, as in apply_boundary_conditions.
+    """
+    top = geometry_params["H_substrate"] + geometry_params["H_FGM"]
+    x, y = nodes[:, 0], nodes[:, 1]
+    return np.flatnonzero(
+        (x >= contact_region[0] - tolerance) & (x <= contact_region[1] + tolerance)
+        & np.isclose(y, top, atol=tolerance)
+    )
+
+
+def compute_contact_forces(nodes, geometry_params, contact_params):
+    """
+    Computes the contact force vector of apply_boundary_conditions without loops or output.
+
+    Intended for repeated load cases on the same mesh, where only the force changes.
+
+    Parameters:
+        nodes (numpy.ndarray): Array of node coordinates [x, y].
+        geometry_params (dict): Geometry parameters.
+        contact_params (dict): Contact parameters ("normal_force" and "contact_region").
+
+    Returns:
+        numpy.ndarray: Global force vector with the normal force evenly distributed over
+            the top-surface nodes in the contact region.
+    """
+    contact_nodes = find_contact_nodes(nodes, geometry_params, contact_params["contact_region"])
+
+    contact_forces = np.zeros(2 * len(nodes))
+    if len(contact_nodes) > 0:
+        contact_forces[2 * contact_nodes + 1] = -contact_params["normal_force"] / len(contact_nodes)
+    return contact_forces
+
+
 if __name__ == "__main__":
     # Example usage for testing
     from parameters import params
@@ -0,0 +1,55 @@
+import copy
+
+import numpy as np
+import pytest
+
+from parameters import params
+from material_properties import apply_material_gradient
+from boundary_conditions import apply_boundary_conditions
+from fem_mesh import TriangleMesh
+
+
+def structured_mesh(geometry_params, num_elements_x=20, num_elements_y_FGM=2, num_elements_y_substrate=5):
+    """
+    Structured triangle mesh of the substrate and FGM layer, with a row of nodes on the
+    interface, so the tests do not need gmsh.
+
+    Returns:
+        tuple: (nodes, elements)
+    """
+    x = np.linspace(0, geometry_params["W_FGM"], num_elements_x + 1)
+    y = np.concatenate([
+        np.linspace(0, geometry_params["H_substrate"], num_elements_y_substrate + 1),
+        np.linspace(geometry_params["H_substrate"], geometry_params["H_substrate"] + geometry_params["H_FGM"],
+                    num_elements_y_FGM + 1)[1:],
+    ])
+    X, Y = np.meshgrid(x, y)
+    nodes = np.column_stack([X.ravel(), Y.ravel()])
+
+    # Two counter-clockwise triangles per cell
+    columns = len(x)
+    corners = (np.arange(len(y) - 1)[:, None] * columns + np.arange(columns - 1)).ravel()
+    elements = np.concatenate([
+        np.column_stack([corners, corners + 1, corners + columns + 1]),
+        np.column_stack([corners, corners + columns + 1, corners + columns]),
+    ])
+    return nodes, elements
+
+
+@pytest.fixture
+def contact_model():
+    """Default parameters on a small structured mesh, with the material and boundary conditions applied."""
+    model_params = copy.deepcopy(params)
+    nodes, elements = structured_mesh(model_params["geometry"])
+    fixed_dofs, contact_forces = apply_boundary_conditions(
+        nodes, elements, model_params["geometry"], model_params["contact"]
+    )
+    return {
+        "params": model_params,
+        "nodes": nodes,
+        "elements": elements,
+        "mesh": TriangleMesh(nodes, elements),
+        "material_properties": apply_material_gradient(nodes, model_params["material"], model_params["geometry"]),
+        "fixed_dofs": fixed_dofs,
+        "contact_forces": contact_forces,
+    }
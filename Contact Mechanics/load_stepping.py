@@ -0,0 +1,270 @@
+import glob
+import hashlib
+import os
+
+import numpy as np
+from scipy import sparse
+from scipy.sparse.linalg import splu
+
+from boundary_conditions import find_contact_nodes
+from solver import assemble_stiffness_matrix, compute_element_stresses
+
+
+def _contact_system(K_free, contact_positions, active, penalty):
+    # Jacobian of the penalty contact equations for a fixed active set, bordered by the
+    # load-control equation of the indenter displacement
+    n = K_free.shape[0]
+    positions = contact_positions[active]
+    ones = np.ones(len(positions))
+    border = sparse.coo_matrix((penalty * ones, (positions, np.zeros(len(positions), dtype=int))), shape=(n, 1))
+    contact = sparse.coo_matrix((penalty * ones, (positions, positions)), shape=(n, n))
+    corner = sparse.coo_matrix([[penalty * len(positions)]])
+    return sparse.bmat([[K_free + contact, border], [border.T, corner]], format="csc")
+
+
+def _residual(K_free, u, indentation, contact_positions, penalty, force):
+    penetration = u[contact_positions] + indentation
+    contact_forces = penalty * np.maximum(penetration, 0)
+    residual_u = K_free @ u
+    np.add.at(residual_u, contact_positions, contact_forces)
+    return np.append(residual_u, contact_forces.sum() - force), penetration >= 0
+
+
+def solve_contact_step(K_free, contact_positions, force, penalty, u, indentation, tolerance, max_iterations,
+                       factorizations):
+    """
+    Solves one load step of the flat-indenter penalty contact problem with Newton's method.
+
+    The unknowns are the free displacements u and the rigid indenter displacement; the
+    indenter is pushed down until the contact reaction equals the prescribed force. The
+    iteration starts from the given state, so the previous converged displacement and its
+    active contact set serve as the initial guess.
+
+    Parameters:
+        K_free (scipy.sparse.csr_matrix): Stiffness matrix on the free DOFs.
+        contact_positions (numpy.ndarray): Positions of the candidate u_y DOFs in the free DOFs.
+        force (float): Indenter force for this step (N).
+        penalty (float): Penalty coefficient.
+        u (numpy.ndarray): Initial free displacements.
+        indentation (float): Initial indenter displacement (positive downwards).
+        tolerance (float): Convergence tolerance on the residual, relative to the force.
+        max_iterations (int): Maximum number of Newton iterations.
+        factorizations (dict): Factorized Jacobians keyed by active set, reused across steps.
+
+    Returns:
+        tuple: (converged, iterations, u, indentation, active)
+    """
+    u = u.copy()
+    for iteration in range(1, max_iterations + 1):
+        residual, active = _residual(K_free, u, indentation, contact_positions, penalty, force)
+        if not active.any():
+            active[:] = True  # Restart from full contact if the indenter lost contact
+
+        key = active.tobytes()
+        if key not in factorizations:
+            if len(factorizations) >= 8:
+                factorizations.pop(next(iter(factorizations)))
+            factorizations[key] = splu(_contact_system(K_free, contact_positions, active, penalty))
+        correction = factorizations[key].solve(-residual)
+        u += correction[:-1]
+        indentation += correction[-1]
+
+        residual, new_active = _residual(K_free, u, indentation, contact_positions, penalty, force)
+        if np.array_equal(new_active, active) and np.linalg.norm(residual) <= tolerance * abs(force):
+            return True, iteration, u, indentation, active
+
+    return False, max_iterations, u, indentation, active
+
+
+def problem_key(mesh, material_properties, fixed_dofs, contact_positions, normal_force, penalty):
+    """
+    Computes the key stored with every checkpoint.
+
+    The key covers everything the load path depends on: the node coordinates, the
+    connectivity, the nodal material properties, the constrained DOFs, the candidate
+    contact DOFs, the target force and the penalty coefficient.
+    """
+    fixed = np.zeros(2 * mesh.num_nodes, dtype=bool)
+    fixed[list(fixed_dofs)] = True
+
+    digest = hashlib.sha1()
+    for array in (
+        mesh.coordinates,
+        mesh.connectivity.astype(np.int64),
+        np.asarray(material_properties, dtype=np.float64),
+        fixed,
+        np.asarray(contact_positions, dtype=np.int64),
+        np.array([normal_force, penalty], dtype=np.float64),
+    ):
+        digest.update(np.ascontiguousarray(array).tobytes())
+    return digest.hexdigest()
+
+
+def _load_checkpoint(checkpoint_directory, key):
+    files = sorted(glob.glob(os.path.join(checkpoint_directory, "step_*.npz")))
+    if not files:
+        return None
+    with np.load(files[-1]) as data:
+        if "problem_key" not in data.files or str(data["problem_key"]) != key:
+            print(f"Ignoring checkpoints in {checkpoint_directory}: they belong to a different problem")
+            return None
+        print(f"Resuming from {files[-1]}")
+        return {name: data[name] for name in data.files}
+
+
+def _clear_checkpoints(checkpoint_directory):
+    # A fresh run must not leave its steps mixed with those of an earlier run
+    for file_path in glob.glob(os.path.join(checkpoint_directory, "step_*.npz")):
+        os.remove(file_path)
+
+
+def run_load_stepping(mesh, material_properties, fixed_dofs, geometry_params, contact_params, solver_params,
+                      resume=True):
+    """
+    Ramps the indentation force in increments with warm-started contact iterations.
+
+    The load increment grows when steps converge in a few iterations, is halved when they
+    need many, and is halved and retried when a step fails. Every converged step is written
+    to a subdirectory of the checkpoint directory named after the problem key, from which an
+    interrupted run resumes; runs of other problems keep their own subdirectories.
+
+    Parameters:
+        mesh (TriangleMesh): Mesh with node coordinates and connectivity.
+        material_properties (numpy.ndarray): Array of material properties at each node.
+        fixed_dofs (list): List of constrained degrees of freedom.
+        geometry_params (dict): Geometry parameters.
+        contact_params (dict): Contact parameters ("normal_force" and "contact_region").
+        solver_params (dict): Solver parameters (penalty, tolerances and load stepping).
+        resume (bool): If True, continue from the last checkpoint of the same problem.
+
+    Returns:
+        dict: Load-displacement history and final state:
+            - "load_factors", "forces", "indentations", "iterations": Per converged step.
+            - "displacements", "stresses": Final fields, as returned by solve_fem.
+            - "contact_nodes": Nodes in contact with the indenter at the final load.
+    """
+    normal_force = contact_params["normal_force"]
+    penalty = solver_params["penalty_coefficient"]
+    tolerance = solver_params["tolerance"]
+    max_iterations = solver_params["max_contact_iterations"]
+    min_increment = solver_params["min_load_increment"]
+    max_increment = solver_params["max_load_increment"]
+
+    num_dofs = 2 * mesh.num_nodes
+    free = np.ones(num_dofs, dtype=bool)
+    free[list(fixed_dofs)] = False
+    free_dofs = np.flatnonzero(free)
+    position = np.full(num_dofs, -1)
+    position[free_dofs] = np.arange(len(free_dofs))
+
+    candidate_nodes = find_contact_nodes(mesh.coordinates, geometry_params, contact_params["contact_region"])
+    candidate_nodes = candidate_nodes[free[2 * candidate_nodes + 1]]
+    contact_positions = position[2 * candidate_nodes + 1]
+
+    K = assemble_stiffness_matrix(mesh, material_properties)
+    K_free = K[free_dofs][:, free_dofs].tocsr()
+
+    # Initial state, or the last converged step of an interrupted run of the same problem
+    key = problem_key(mesh, material_properties, fixed_dofs, contact_positions, normal_force, penalty)
+    checkpoint_directory = os.path.join(solver_params["checkpoint_directory"], key)
+    os.makedirs(checkpoint_directory, exist_ok=True)
+    state = _load_checkpoint(checkpoint_directory, key) if resume else None
+    if state is None:
+        _clear_checkpoints(checkpoint_directory)
+        step = 0
+        load_factor = 0.0
+        increment = solver_params["load_increment"]
+        u = np.zeros(len(free_dofs))
+        indentation = 0.0
+        active = np.zeros(len(candidate_nodes), dtype=bool)
+        history = np.zeros((0, 4))
+    else:
+        step = int(state["step"])
+        load_factor = float(state["load_factor"])
+        increment = float(state["load_increment"])
+        u = state["displacements"][free_dofs]
+        indentation = float(state["indentation"])
+        active = state["active"].astype(bool)
+        history = state["history"]
+
+    factorizations = {}
+    while load_factor < 1 - 1e-12:
+        increment = min(increment, 1 - load_factor)
+        target = load_factor + increment
+        converged, iterations, u_new, indentation_new, active_new = solve_contact_step(
+            K_free, contact_positions, target * normal_force, penalty, u, indentation, tolerance, max_iterations,
+            factorizations,
+        )
+
+        if not converged:
+            increment *= 0.5
+            print(f"Step {step + 1} did not converge at load factor {target:.4f}, cutting increment to {increment:.4f}")
+            if increment < min_increment:
+                raise RuntimeError(f"Load stepping failed: increment below {min_increment} at load factor {load_factor}")
+            continue
+
+        # Accept the step and adapt the increment from the convergence history
+        step += 1
+        load_factor, u, indentation, active = target, u_new, indentation_new, active_new
+        history = np.vstack([history, [load_factor, target * normal_force, indentation, iterations]])
+        print(f"Step {step}: load factor {load_factor:.4f}, indentation {indentation:.3e} m, "
+              f"{active.sum()} contact nodes, {iterations} iterations")
+
+        if iterations <= 2:
+            increment = min(1.5 * increment, max_increment)
+        elif iterations > max_iterations // 2:
+            increment = max(0.5 * increment, min_increment)
+
+        displacements = np.zeros(num_dofs)
+        displacements[free_dofs] = u
+        np.savez(
+            os.path.join(checkpoint_directory, f"step_{step:04d}.npz"),
+            step=step, load_factor=load_factor, load_increment=increment, displacements=displacements,
+            indentation=indentation, active=active, history=history, problem_key=key,
+        )
+
+    displacements = np.zeros(num_dofs)
+    displacements[free_dofs] = u
+    return {
+        "load_factors": history[:, 0],
+        "forces": history[:, 1],
+        "indentations": history[:, 2],
+        "iterations": history[:, 3].astype(int),
+        "displacements": displacements,
+        "stresses": compute_element_stresses(mesh, material_properties, displacements),
+        "contact_nodes": candidate_nodes[active],
+    }
+
+
+if __name__ == "__main__":
+    # Example usage: ramp the indenter force and plot the load-indentation curve
+    import matplotlib.pyplot as plt
+    from parameters import params
+    from mesh_generation import generate_mesh_gmsh
+    from material_properties import apply_material_gradient
+    from boundary_conditions import apply_boundary_conditions
+    import sys
+    sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+    from fem_mesh import TriangleMesh
+
+    nodes, elements = generate_mesh_gmsh(
+        params["geometry"],
+        params["mesh"]["num_elements_x"],
+        params["mesh"]["num_elements_y_FGM"] + params["mesh"]["num_elements_y_substrate"],
+        visualize=False,
+    )
+    material_properties = apply_material_gradient(nodes, params["material"], params["geometry"])
+    fixed_dofs, _ = apply_boundary_conditions(nodes, elements, params["geometry"], params["contact"])
+
+    mesh = TriangleMesh(nodes, elements)
+    results = run_load_stepping(
+        mesh, material_properties, fixed_dofs, params["geometry"], params["contact"], params["solver"]
+    )
+
+    plt.figure()
+    plt.plot(results["indentations"], results["forces"], "o-")
+    plt.title("Load-Indentation Curve")
+    plt.xlabel("Indentation (m)")
+    plt.ylabel("Normal Force (N)")
+    plt.grid()
+    plt.show()
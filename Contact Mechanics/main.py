@@ -1,41 +1,62 @@
-from parameters import params
-from mesh_generation import generate_mesh_gmsh
-from material_properties import apply_material_gradient
-from boundary_conditions import apply_boundary_conditions
-from solver import solve_fem
+import os
+import sys
+
+from timing import timed_stage, print_timings
+
+timings = {}
+with timed_stage("Imports", timings):
+    from parameters import params
+    from mesh_generation import generate_mesh_gmsh
+    from material_properties import apply_material_gradient
+    from boundary_conditions import apply_boundary_conditions
+    from solver import solve_fem_mesh
+    from substructuring import solve_fem_condensed
 
 def main():
+    from fem_mesh import TriangleMesh  # Shared with Numerical, on the path of the entry scripts
+
     # Step 1: Generate Mesh
     print("Generating Mesh...")
-    nodes, elements = generate_mesh_gmsh(
-        params["geometry"],
-        params["mesh"]["num_elements_x"],
-        params["mesh"]["num_elements_y_FGM"] + params["mesh"]["num_elements_y_substrate"],
-        visualize=False,
-    )
+    with timed_stage("Mesh generation", timings):
+        nodes, elements = generate_mesh_gmsh(
+            params["geometry"],
+            params["mesh"]["num_elements_x"],
+            params["mesh"]["num_elements_y_FGM"] + params["mesh"]["num_elements_y_substrate"],
+            visualize=False,
+            num_threads=params["mesh"]["num_threads"],
+        )
+        mesh = TriangleMesh(nodes, elements)
 
     # Step 2: Apply Material Properties
     print("Applying Material Gradient...")
-    material_properties = apply_material_gradient(nodes, params["material"], params["geometry"])
+    with timed_stage("Material gradient", timings):
+        material_properties = apply_material_gradient(nodes, params["material"], params["geometry"])
 
     # Step 3: Apply Boundary Conditions
     print("Applying Boundary Conditions...")
-    fixed_dofs, contact_forces = apply_boundary_conditions(
-        nodes, elements, params["geometry"], params["contact"]
-    )
+    with timed_stage("Boundary conditions", timings):
+        fixed_dofs, contact_forces = apply_boundary_conditions(
+            nodes, elements, params["geometry"], params["contact"]
+        )
 
     # Step 4: Solve FEM System
     print("Solving FEM System...")
-    displacements, stresses = solve_fem(
-        nodes, elements, material_properties, fixed_dofs, contact_forces, params["solver"]
-    )
+    with timed_stage("Solve", timings):
+        if params["solver"]["use_substrate_superelement"]:
+            displacements, stresses = solve_fem_condensed(
+                mesh, material_properties, fixed_dofs, contact_forces, params["solver"], params["geometry"]
+            )
+        else:
+            displacements, stresses = solve_fem_mesh(mesh, material_properties, fixed_dofs, contact_forces)
 
     # Step 5: Output Results
     print(f"Displacements: {displacements[:10]}...")  # First 10 displacements
     print(f"Stresses: {stresses[:3]}...")  # First 3 stresses
+    print_timings(timings)
 
     # Step 6: Pass to Post-Processing (if ready)
-    return nodes, elements, displacements, stresses, contact_forces
+    return mesh, displacements, stresses, contact_forces
 
 if __name__ == "__main__":
+    sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))  # fem_mesh.py
     results = main()
@@ -1,7 +1,9 @@
+import os
+
 import gmsh
 import numpy as np
 
-def generate_mesh_gmsh(geometry_params, num_elements_x, num_elements_y_total, visualize=False):
+def generate_mesh_gmsh(geometry_params, num_elements_x, num_elements_y_total, visualize=False, num_threads=0):
     """
     Generates a refined triangular mesh for a rectangular domain with an FGM layer and a homogeneous substrate.
 
@@ -10,15 +12,21 @@ def generate_mesh_gmsh(geometry_params, num_elements_x, num_elements_y_total, vi
         num_elements_x (int): Number of elements along the width.
         num_elements_y_total (int): Total number of elements along the height.
         visualize (bool): If True, visualizes the mesh in the Gmsh GUI.
+        num_threads (int): Number of meshing threads (0 uses all available cores).
 
     Returns:
         tuple: (nodes, elements)
             - nodes: Array of node coordinates [x, y].
-            - elements: Array of element connectivity [n1, n2, n3].
+            - elements: Array of element connectivity [n1, n2, n3] (int32).
     """
     gmsh.initialize()
     gmsh.model.add("Mesh Generation")
 
+    # Mesh the substrate and FGM surfaces in parallel
+    num_threads = num_threads or os.cpu_count()
+    gmsh.option.setNumber("General.NumThreads", num_threads)
+    gmsh.option.setNumber("Mesh.MaxNumThreads2D", num_threads)
+
     # Unpack geometry parameters
     W = geometry_params["W_FGM"]
     H_FGM = geometry_params["H_FGM"]
@@ -71,21 +79,15 @@ def generate_mesh_gmsh(geometry_params, num_elements_x, num_elements_y_total, vi
     # Generate mesh
     gmsh.model.mesh.generate(2)
 
-    # Extract nodes and elements
+    # Extract nodes and triangles (element type 2) as flat arrays
     node_tags, node_coords, _ = gmsh.model.mesh.getNodes()
-    nodes = np.array(node_coords).reshape(-1, 3)[:, :2]
-    element_types, _, element_node_tags = gmsh.model.mesh.getElements()
-
-    # Process triangular elements
-    elements = []
-    for i, elem_type in enumerate(element_types):
-        if elem_type == 2:  # Triangular elements
-            triangular_elements = np.array(element_node_tags[i], dtype=int).reshape(-1, 3) - 1
-            elements.extend(triangular_elements)
-        else:
-            print(f"Unsupported element type {elem_type}")
-
-    elements = np.array(elements)
+    nodes = node_coords.reshape(-1, 3)[:, :2]
+    _, element_node_tags = gmsh.model.mesh.getElementsByType(2)
+
+    # Map node tags to row indices (tags are not guaranteed to be contiguous)
+    tag_to_index = np.full(int(node_tags.max()) + 1, -1, dtype=np.int32)
+    tag_to_index[node_tags] = np.arange(len(node_tags), dtype=np.int32)
+    elements = tag_to_index[element_node_tags].reshape(-1, 3)
 
     if visualize:
         gmsh.fltk.run()
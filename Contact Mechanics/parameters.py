@@ -1,4 +1,4 @@
-import numpy as np
+from material_properties import compute_inhomogeneity_constant
 
 # Geometry Parameters
 geometry_params = {
@@ -21,10 +21,11 @@ material_params = {
     "poisson_ratio": 0.3,  # Poisson's ratio (assumed constant across the domain)
 }
 
-# Compute the inhomogeneity constant 'c' for the exponential material gradient
-material_params["inhomogeneity_constant"] = -np.log(
-    material_params["shear_modulus_surface"] / material_params["shear_modulus_substrate"]
-) / geometry_params["H_FGM"]
+# Compute the inhomogeneity constant 'c' for the exponential material gradient, so that the
+# FGM modulus decays from the surface value to the substrate value at the interface. This is
+# the opposite sign of the former -log(G_surface / G_substrate) / H_FGM, which made the modulus
+# jump at the interface: main.py results computed with the old default are not comparable
+material_params["inhomogeneity_constant"] = compute_inhomogeneity_constant(material_params, geometry_params)
 
 # Contact and Loading Parameters
 contact_params = {
@@ -42,6 +43,7 @@ mesh_params = {
     "num_elements_y_FGM": 10,  # Number of elements along the FGM height [default: 10]
     "num_elements_y_substrate": 50,  # Number of elements along the substrate height [default: 40]
     "element_order": 2,  # Polynomial order of finite elements (e.g., linear/quadratic)
+    "num_threads": 0,  # Gmsh meshing threads (0 uses all available cores)
 }
 
 # Solver Parameters
@@ -49,6 +51,13 @@ solver_params = {
     "tolerance": 1e-6,  # Convergence tolerance for iterative solvers
     "max_iterations": 500,  # Maximum number of iterations
     "penalty_coefficient": 1e9,  # Penalty method coefficient for enforcing contact
+    "use_substrate_superelement": False,  # Condense the homogeneous substrate and reuse it across FGM variants
+    "superelement_cache_directory": "./cache/",  # Directory where condensed substrates are stored
+    "max_contact_iterations": 20,  # Active-set iterations per load step
+    "load_increment": 0.1,  # Initial load increment (fraction of the normal force)
+    "min_load_increment": 1e-3,  # Smallest increment before load stepping gives up
+    "max_load_increment": 0.25,  # Largest increment allowed when steps converge easily
+    "checkpoint_directory": "./output/checkpoints/",  # Converged load steps, used to resume runs
 }
 
 # Post-Processing Parameters
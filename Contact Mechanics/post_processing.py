@@ -2,24 +2,32 @@ import numpy as np
 import matplotlib.pyplot as plt
 from matplotlib.tri import Triangulation
 
-def plot_mesh_with_refinement(nodes, elements, contact_region, refined_region=None):
+def _triangulation(mesh, coordinates=None, elements=None):
+    coordinates = mesh.coordinates if coordinates is None else coordinates
+    elements = mesh.connectivity if elements is None else elements
+    return Triangulation(coordinates[:, 0], coordinates[:, 1], elements)
+
+
+def plot_mesh_with_refinement(mesh, contact_region, refined_region=None):
     """
     Plots the mesh, highlighting refined regions and contact nodes.
     """
     plt.figure(figsize=(8, 6))
 
     # Plot all elements
-    for element in elements:
-        polygon = nodes[element]
-        plt.fill(*polygon.T, edgecolor="gray", fill=False, linewidth=0.5)
+    plt.triplot(_triangulation(mesh), color="gray", linewidth=0.5)
 
     # Highlight elements in the refined region
     if refined_region:
-        for element in elements:
-            element_nodes = nodes[element]
-            x_min, x_max = element_nodes[:, 0].min(), element_nodes[:, 0].max()
-            if refined_region[0] <= x_min <= refined_region[1] or refined_region[0] <= x_max <= refined_region[1]:
-                plt.fill(*element_nodes.T, edgecolor="blue", fill=False, linewidth=1.0, alpha=0.6)
+        element_x = mesh.coordinates[mesh.connectivity, 0]
+        x_min, x_max = element_x.min(axis=1), element_x.max(axis=1)
+        refined = ((refined_region[0] <= x_min) & (x_min <= refined_region[1])) | (
+            (refined_region[0] <= x_max) & (x_max <= refined_region[1])
+        )
+        if refined.any():
+            plt.triplot(
+                _triangulation(mesh, elements=mesh.connectivity[refined]), color="blue", linewidth=1.0, alpha=0.6
+            )
 
     # Highlight the contact region
     plt.axvspan(contact_region[0], contact_region[1], color="red", alpha=0.3, label="Contact Region")
@@ -32,24 +40,20 @@ def plot_mesh_with_refinement(nodes, elements, contact_region, refined_region=No
     plt.show()
 
 
-def plot_deformation_with_annotations(nodes, elements, displacements, scale=1.0, contact_region=None):
+def plot_deformation_with_annotations(mesh, displacements, scale=1.0, contact_region=None):
     """
     Plots the deformed mesh and overlays it with the original mesh for comparison.
     """
     plt.figure(figsize=(8, 6))
 
     # Compute deformed coordinates
-    deformed_nodes = nodes + scale * displacements.reshape(-1, 2)
+    deformed_nodes = mesh.coordinates + scale * displacements.reshape(-1, 2)
 
     # Plot original mesh
-    for element in elements:
-        original = nodes[element]
-        plt.fill(*original.T, edgecolor="gray", fill=False, linewidth=0.5)
+    plt.triplot(_triangulation(mesh), color="gray", linewidth=0.5)
 
     # Plot deformed mesh
-    for element in elements:
-        deformed = deformed_nodes[element]
-        plt.fill(*deformed.T, edgecolor="blue", fill=False, linewidth=0.5)
+    plt.triplot(_triangulation(mesh, coordinates=deformed_nodes), color="blue", linewidth=0.5)
 
     # Highlight contact region
     if contact_region:
@@ -63,13 +67,12 @@ def plot_deformation_with_annotations(nodes, elements, displacements, scale=1.0,
     plt.show()
 
 
-def plot_stresses_with_contact(nodes, elements, stresses, stress_component, contact_region):
+def plot_stresses_with_contact(mesh, stresses, stress_component, contact_region):
     """
     Plots the stress distribution across the material, ensuring proper mapping of stress values.
 
     Parameters:
-        nodes (numpy.ndarray): Array of node coordinates [x, y].
-        elements (numpy.ndarray): Array of element connectivity [n1, n2, n3].
+        mesh (TriangleMesh): Mesh with node coordinates and connectivity.
         stresses (numpy.ndarray): Array of element stresses [sigma_xx, sigma_yy, tau_xy].
         stress_component (int): Index of the stress component to plot.
         contact_region (tuple): x-coordinates of the contact region.
@@ -81,26 +84,22 @@ def plot_stresses_with_contact(nodes, elements, stresses, stress_component, cont
 
     # Debugging: Print sizes for validation
     print(f"Number of stress values: {len(stress_values)}")
-    print(f"Number of elements: {len(elements)}")
-    print(f"Number of nodes: {len(nodes)}")
+    print(f"Number of elements: {mesh.num_elements}")
+    print(f"Number of nodes: {mesh.num_nodes}")
 
     # Ensure stress values align with the nodes for plotting
-    if len(stress_values) == len(elements):
-        # Map stress values from elements to nodes
-        stress_per_node = np.zeros(len(nodes))
-        count_per_node = np.zeros(len(nodes))
-        for element, stress in zip(elements, stress_values):
-            for node in element:
-                stress_per_node[node] += stress
-                count_per_node[node] += 1
+    if len(stress_values) == mesh.num_elements:
+        # Map stress values from elements to nodes (average over the adjacent elements)
+        stress_per_node = mesh.node_elements @ stress_values
+        count_per_node = np.diff(mesh.node_elements.indptr)
         # Avoid division by zero
         count_per_node[count_per_node == 0] = 1
         stress_values = stress_per_node / count_per_node
-    elif len(stress_values) != len(nodes):
+    elif len(stress_values) != mesh.num_nodes:
         raise ValueError("Mismatch between stress values and nodes/elements.")
 
     # Create a triangulation object for plotting
-    triangulation = Triangulation(nodes[:, 0], nodes[:, 1], elements)
+    triangulation = _triangulation(mesh)
 
     # Plot the stress distribution
     levels = np.linspace(stress_values.min(), stress_values.max(), 20)
@@ -139,11 +138,16 @@ def plot_forces(nodes, contact_forces, scale=1.0):
 
 
 if __name__ == "__main__":
+    import os
+    import sys
+
+    sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))  # fem_mesh.py
+
     from main import main
     from parameters import params
 
     # Run the main function to retrieve results
-    nodes, elements, displacements, stresses, contact_forces = main()
+    mesh, displacements, stresses, contact_forces = main()
 
     # Define regions for plotting
     contact_region = params["contact"]["contact_region"]
@@ -153,14 +157,13 @@ if __name__ == "__main__":
     ]
 
     # Plotting
-    plot_mesh_with_refinement(nodes, elements, contact_region, refined_region=refined_region)
-    plot_deformation_with_annotations(nodes, elements, displacements, scale=1e4, contact_region=contact_region)
-    plot_forces(nodes, contact_forces, scale=0.1)
+    plot_mesh_with_refinement(mesh, contact_region, refined_region=refined_region)
+    plot_deformation_with_annotations(mesh, displacements, scale=1e4, contact_region=contact_region)
+    plot_forces(mesh.coordinates, contact_forces, scale=0.1)
 
     for i, stress_label in enumerate(["σ_xx", "σ_yy", "τ_xy"]):
         plot_stresses_with_contact(
-            nodes,
-            elements,
+            mesh,
             stresses,
             stress_component=i,
             contact_region=contact_region,
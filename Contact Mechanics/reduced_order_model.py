@@ -0,0 +1,342 @@
+import time
+
+import numpy as np
+from scipy import sparse
+from scipy.sparse.linalg import spsolve
+
+from material_properties import apply_material_gradient, compute_inhomogeneity_constant
+from solver import element_dof_indices, element_matrices
+
+# Uncertain material parameters handled by the reduced model
+PARAMETER_NAMES = ("shear_modulus_surface", "shear_modulus_substrate", "poisson_ratio")
+
+# Constant parts of the plane material matrix: D = 2G / (1 - nu) * (D0 + nu * D1)
+D0 = np.diag([1.0, 1.0, 0.5])
+D1 = np.array([[0.0, 1.0, 0.0], [1.0, 0.0, 0.0], [0.0, 0.0, -0.5]])
+
+
+def sample_material(material_params, geometry_params, sample):
+    """
+    Returns a copy of material_params with the uncertain parameters replaced.
+
+    Parameters:
+        material_params (dict): Nominal material properties.
+        geometry_params (dict): Geometry parameters.
+        sample (dict): Values for (a subset of) PARAMETER_NAMES.
+
+    Returns:
+        dict: Material properties, with the inhomogeneity constant recomputed from the
+            surface and substrate shear moduli with compute_inhomogeneity_constant.
+    """
+    material = dict(material_params)
+    material.update(sample)
+    material["inhomogeneity_constant"] = compute_inhomogeneity_constant(material, geometry_params)
+    return material
+
+
+def sample_material_parameters(material_params, relative_spread, num_samples, seed=None):
+    """
+    Draws uniformly distributed samples of the uncertain material parameters.
+
+    Parameters:
+        material_params (dict): Nominal material properties.
+        relative_spread (dict): Relative half-width of the interval for each parameter,
+            e.g. {"shear_modulus_surface": 0.2} samples within +/- 20% of the nominal value.
+        num_samples (int): Number of samples.
+        seed (int): Seed of the random generator.
+
+    Returns:
+        list: List of sample dictionaries.
+    """
+    rng = np.random.default_rng(seed)
+    samples = [{} for _ in range(num_samples)]
+    for name in PARAMETER_NAMES:
+        nominal = material_params[name]
+        spread = relative_spread.get(name, 0.0)
+        values = nominal * (1 + spread * rng.uniform(-1, 1, num_samples))
+        for sample, value in zip(samples, values):
+            sample[name] = value
+    return samples
+
+
+def element_shear_moduli(mesh, material_params, geometry_params, element_mask=None):
+    """
+    Computes the element shear modulus used by the solver (average of the nodal values).
+
+    Only the nodes of the selected elements are evaluated, so this is cheap for a few elements.
+    """
+    selection = slice(None) if element_mask is None else element_mask
+    element_nodes = mesh.coordinates[mesh.connectivity[selection]].reshape(-1, 2)
+    properties = apply_material_gradient(element_nodes, material_params, geometry_params)
+    shear_moduli = properties[:, 0] / (2 * (1 + properties[:, 1]))
+    return shear_moduli.reshape(-1, 3).mean(axis=1)
+
+
+def _free_dofs(num_dofs, fixed_dofs):
+    free = np.ones(num_dofs, dtype=bool)
+    free[list(fixed_dofs)] = False
+    return np.flatnonzero(free)
+
+
+def _unit_stiffness_matrices(mesh):
+    # Element matrices A * B^T D0 B and A * B^T D1 B, independent of the material
+    dummy_material = np.tile([1.0, 0.0], (mesh.num_nodes, 1))
+    areas, B, _, degenerate = element_matrices(mesh, dummy_material)
+    K0 = areas[:, None, None] * np.einsum("eji,jk,ekl->eil", B, D0, B)
+    K1 = areas[:, None, None] * np.einsum("eji,jk,ekl->eil", B, D1, B)
+    K0[degenerate] = 0
+    K1[degenerate] = 0
+    return K0, K1, B, degenerate
+
+
+def _assemble_weighted(K_elements, weights, dofs, num_dofs):
+    rows = np.repeat(dofs, 6, axis=1).ravel()
+    cols = np.tile(dofs, (1, 6)).ravel()
+    data = (weights[:, None, None] * K_elements).ravel()
+    return sparse.coo_matrix((data, (rows, cols)), shape=(num_dofs, num_dofs)).tocsr()
+
+
+def _stresses_from_strains(strains, shear_moduli, poisson_ratio, degenerate):
+    D = 2 / (1 - poisson_ratio) * (D0 + poisson_ratio * D1)
+    stresses = shear_moduli[:, None] * (strains @ D.T)
+    stresses[degenerate] = 0
+    return stresses
+
+
+def solve_full_order(mesh, material_params, geometry_params, fixed_dofs, contact_forces):
+    """
+    Solves the full-order model for one material sample with a sparse direct solver.
+
+    Returns:
+        tuple: (displacements, stresses), as returned by solve_fem.
+    """
+    num_dofs = 2 * mesh.num_nodes
+    free_dofs = _free_dofs(num_dofs, fixed_dofs)
+    K0, K1, B, degenerate = _unit_stiffness_matrices(mesh)
+    dofs = element_dof_indices(mesh.connectivity)
+
+    nu = material_params["poisson_ratio"]
+    shear_moduli = element_shear_moduli(mesh, material_params, geometry_params)
+    K = _assemble_weighted(K0 + nu * K1, 2 / (1 - nu) * shear_moduli, dofs, num_dofs)
+
+    displacements = np.zeros(num_dofs)
+    displacements[free_dofs] = spsolve(K[free_dofs][:, free_dofs].tocsc(), contact_forces[free_dofs])
+
+    strains = np.einsum("eij,ej->ei", B, displacements[dofs])
+    return displacements, _stresses_from_strains(strains, shear_moduli, nu, degenerate)
+
+
+def _pod_basis(snapshots, tolerance):
+    # Keep the left singular vectors that capture all but `tolerance` of the snapshot energy
+    U, s, _ = np.linalg.svd(snapshots, full_matrices=False)
+    energy = np.cumsum(s**2) / np.sum(s**2)
+    size = min(int(np.searchsorted(energy, 1 - tolerance)) + 1, len(s))
+    return U[:, :size]
+
+
+def _deim_indices(basis):
+    # Greedy selection of the discrete empirical interpolation points
+    indices = [int(np.argmax(np.abs(basis[:, 0])))]
+    for j in range(1, basis.shape[1]):
+        coefficients = np.linalg.solve(basis[indices, :j], basis[indices, j])
+        residual = basis[:, j] - basis[:, :j] @ coefficients
+        indices.append(int(np.argmax(np.abs(residual))))
+    return np.array(indices)
+
+
+def build_reduced_model(mesh, material_params, geometry_params, fixed_dofs, contact_forces, training_samples,
+                        validation_samples=None, pod_tolerance=1e-10, deim_tolerance=1e-12):
+    """
+    Offline stage: builds a reduced-basis model of the FGM contact problem.
+
+    The stiffness is written as K = sum_e G_e * 2 / (1 - nu) * (K0_e + nu * K1_e). The
+    element shear moduli G_e, which depend exponentially on the surface and substrate
+    moduli, are approximated by discrete empirical interpolation (DEIM), giving an affine
+    decomposition that is projected once onto the POD basis of the snapshot solutions.
+
+    Parameters:
+        mesh (TriangleMesh): Mesh with node coordinates and connectivity.
+        material_params (dict): Nominal material properties.
+        geometry_params (dict): Geometry parameters.
+        fixed_dofs (list): List of constrained degrees of freedom.
+        contact_forces (numpy.ndarray): Global force vector (N).
+        training_samples (list): Samples (dicts of PARAMETER_NAMES) used for the snapshots.
+        validation_samples (list): Samples used to calibrate the error estimate.
+            Defaults to a random draw of 5 samples around the training set.
+        pod_tolerance (float): Neglected snapshot energy of the displacement basis.
+        deim_tolerance (float): Neglected snapshot energy of the shear modulus basis.
+
+    Returns:
+        dict: Reduced model, to be evaluated with evaluate_reduced_model.
+    """
+    start = time.perf_counter()
+    num_dofs = 2 * mesh.num_nodes
+    free_dofs = _free_dofs(num_dofs, fixed_dofs)
+    K0, K1, B, degenerate = _unit_stiffness_matrices(mesh)
+    dofs = element_dof_indices(mesh.connectivity)
+
+    # Snapshots of the displacements and of the element shear moduli
+    displacement_snapshots = []
+    modulus_snapshots = []
+    for sample in training_samples:
+        material = sample_material(material_params, geometry_params, sample)
+        displacements, _ = solve_full_order(mesh, material, geometry_params, fixed_dofs, contact_forces)
+        displacement_snapshots.append(displacements[free_dofs])
+        modulus_snapshots.append(element_shear_moduli(mesh, material, geometry_params))
+
+    V = _pod_basis(np.column_stack(displacement_snapshots), pod_tolerance)
+    Q = _pod_basis(np.column_stack(modulus_snapshots), deim_tolerance)
+    deim_elements = _deim_indices(Q)
+    print(f"POD basis: {V.shape[1]} modes, DEIM: {Q.shape[1]} interpolation elements "
+          f"({len(training_samples)} snapshots)")
+
+    # Affine terms: for each DEIM mode q, the matrices sum_e Q_eq K0_e and sum_e Q_eq K1_e
+    V_full = np.zeros((num_dofs, V.shape[1]))
+    V_full[free_dofs] = V
+    F = contact_forces[free_dofs]
+    affine_terms = []
+    for q in range(Q.shape[1]):
+        for K_elements in (K0, K1):
+            A = _assemble_weighted(K_elements, Q[:, q], dofs, num_dofs)[free_dofs][:, free_dofs]
+            affine_terms.append(A @ V)
+    reduced_matrices = np.array([V.T @ AV for AV in affine_terms])
+
+    # Offline parts of the residual norm ||F - sum_k c_k A_k V a||^2
+    AV = np.array(affine_terms)
+    num_terms, _, size = AV.shape
+    AV_columns = AV.transpose(1, 0, 2).reshape(len(free_dofs), num_terms * size)
+    rom = {
+        "mesh": mesh,
+        "material_params": dict(material_params),
+        "geometry_params": geometry_params,
+        "fixed_dofs": fixed_dofs,
+        "contact_forces": contact_forces,
+        "free_dofs": free_dofs,
+        "basis": V,
+        "reduced_matrices": reduced_matrices,
+        "reduced_forces": V.T @ F,
+        "deim_basis": Q,
+        "deim_elements": deim_elements,
+        "deim_matrix": Q[deim_elements],
+        "residual_FF": F @ F,
+        "residual_FA": np.einsum("i,kir->kr", F, AV),
+        "residual_AA": (AV_columns.T @ AV_columns).reshape(num_terms, size, num_terms, size).transpose(0, 2, 1, 3),
+        "strain_basis": np.einsum("eij,ejr->eir", B, V_full[dofs]),
+        "degenerate": degenerate,
+        "effectivity": 1.0,
+    }
+
+    # Calibrate the residual-based estimate against the true error
+    if validation_samples is None:
+        spread = {name: 0.1 for name in PARAMETER_NAMES}
+        validation_samples = sample_material_parameters(material_params, spread, 5, seed=1)
+    ratios = []
+    for sample in validation_samples:
+        material = sample_material(material_params, geometry_params, sample)
+        reference, _ = solve_full_order(mesh, material, geometry_params, fixed_dofs, contact_forces)
+        approximation, _, residual = evaluate_reduced_model(rom, sample)
+        error = np.linalg.norm(approximation - reference) / np.linalg.norm(reference)
+        ratios.append(error / max(residual, 1e-14))
+    rom["effectivity"] = max(1.0, max(ratios))
+
+    print(f"Reduced model built in {time.perf_counter() - start:.2f} s "
+          f"(error estimate effectivity {rom['effectivity']:.2f})")
+    return rom
+
+
+def evaluate_reduced_model(rom, sample):
+    """
+    Online stage: evaluates the reduced model for one material sample.
+
+    Parameters:
+        rom (dict): Reduced model from build_reduced_model.
+        sample (dict): Values for (a subset of) PARAMETER_NAMES.
+
+    Returns:
+        tuple: (displacements, stresses, error_estimate)
+            - displacements: Array of nodal displacements [u_x, u_y].
+            - stresses: Array of element stresses [sigma_xx, sigma_yy, tau_xy].
+            - error_estimate: Estimated relative displacement error with respect to the
+              full model (relative residual norm times the calibrated effectivity). The
+              residual is that of the DEIM-approximated operator, so the DEIM error only
+              enters through the calibration of the effectivity.
+    """
+    material = sample_material(rom["material_params"], rom["geometry_params"], sample)
+    nu = material["poisson_ratio"]
+
+    # DEIM coefficients from the shear modulus at the interpolation elements
+    moduli_at_points = element_shear_moduli(rom["mesh"], material, rom["geometry_params"], rom["deim_elements"])
+    theta = np.linalg.solve(rom["deim_matrix"], moduli_at_points)
+    coefficients = np.column_stack([theta * 2 / (1 - nu), theta * 2 * nu / (1 - nu)]).ravel()
+
+    K_reduced = np.tensordot(coefficients, rom["reduced_matrices"], axes=1)
+    a = np.linalg.solve(K_reduced, rom["reduced_forces"])
+
+    residual_squared = (
+        rom["residual_FF"]
+        - 2 * coefficients @ rom["residual_FA"] @ a
+        + np.einsum("k,l,klrs,r,s->", coefficients, coefficients, rom["residual_AA"], a, a)
+    )
+    relative_residual = np.sqrt(max(residual_squared, 0.0) / rom["residual_FF"])
+
+    displacements = np.zeros(2 * rom["mesh"].num_nodes)
+    displacements[rom["free_dofs"]] = rom["basis"] @ a
+
+    strains = rom["strain_basis"] @ a
+    shear_moduli = element_shear_moduli(rom["mesh"], material, rom["geometry_params"])
+    stresses = _stresses_from_strains(strains, shear_moduli, nu, rom["degenerate"])
+
+    return displacements, stresses, rom["effectivity"] * relative_residual
+
+
+def evaluate_with_fallback(rom, sample, tolerance=1e-3):
+    """
+    Evaluates the reduced model and falls back to the full model when the error estimate
+    exceeds the tolerance.
+
+    Returns:
+        tuple: (displacements, stresses, error_estimate, used_full_model)
+    """
+    displacements, stresses, error_estimate = evaluate_reduced_model(rom, sample)
+    if error_estimate <= tolerance:
+        return displacements, stresses, error_estimate, False
+
+    material = sample_material(rom["material_params"], rom["geometry_params"], sample)
+    displacements, stresses = solve_full_order(
+        rom["mesh"], material, rom["geometry_params"], rom["fixed_dofs"], rom["contact_forces"]
+    )
+    return displacements, stresses, 0.0, True
+
+
+if __name__ == "__main__":
+    # Example usage: Monte Carlo study of the maximum indentation depth
+    from parameters import params
+    from mesh_generation import generate_mesh_gmsh
+    from boundary_conditions import apply_boundary_conditions
+    import os
+    import sys
+    sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+    from fem_mesh import TriangleMesh
+
+    nodes, elements = generate_mesh_gmsh(
+        params["geometry"],
+        params["mesh"]["num_elements_x"],
+        params["mesh"]["num_elements_y_FGM"] + params["mesh"]["num_elements_y_substrate"],
+        visualize=False,
+    )
+    mesh = TriangleMesh(nodes, elements)
+    fixed_dofs, contact_forces = apply_boundary_conditions(nodes, elements, params["geometry"], params["contact"])
+
+    spread = {"shear_modulus_surface": 0.2, "shear_modulus_substrate": 0.2, "poisson_ratio": 0.1}
+    training = sample_material_parameters(params["material"], spread, 30, seed=0)
+    rom = build_reduced_model(mesh, params["material"], params["geometry"], fixed_dofs, contact_forces, training)
+
+    samples = sample_material_parameters(params["material"], spread, 2000, seed=42)
+    start = time.perf_counter()
+    results = [evaluate_with_fallback(rom, sample) for sample in samples]
+    elapsed = time.perf_counter() - start
+
+    max_depth = np.array([-displacements[1::2].min() for displacements, _, _, _ in results])
+    fallbacks = sum(used_full_model for _, _, _, used_full_model in results)
+    print(f"{len(samples)} samples in {elapsed:.2f} s ({fallbacks} full-model fallbacks)")
+    print(f"Indentation depth: mean = {max_depth.mean():.3e} m, std = {max_depth.std():.3e} m")
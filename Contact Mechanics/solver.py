@@ -1,9 +1,15 @@
+import warnings
+
 import numpy as np
+from scipy import sparse
+from scipy.sparse.linalg import MatrixRankWarning, spsolve
 
 def solve_fem(nodes, elements, material_properties, fixed_dofs, contact_forces, solver_params):
     """
     Solves the FEM system for the given stiffness matrix, boundary conditions, and forces.
 
+    Thin wrapper of solve_fem_mesh for callers that hold the nodes and elements only.
+
     Parameters:
         nodes (numpy.ndarray): Array of node coordinates [x, y].
         elements (numpy.ndarray): Array of element connectivity [n1, n2, n3].
@@ -17,81 +23,45 @@ def solve_fem(nodes, elements, material_properties, fixed_dofs, contact_forces,
             - displacements: Array of nodal displacements [u_x, u_y].
             - stresses: Array of element stresses [sigma_xx, sigma_yy, tau_xy].
     """
-    num_nodes = len(nodes)
-    num_dofs = 2 * num_nodes  # Two degrees of freedom (u_x, u_y) per node
+    from fem_mesh import TriangleMesh  # Shared with Numerical, on the path of the entry scripts
 
-    # Initialize global stiffness matrix and force vector
-    K = np.zeros((num_dofs, num_dofs))  # Global stiffness matrix
-    F = contact_forces.copy()           # Force vector (already includes contact forces)
+    return solve_fem_mesh(TriangleMesh(nodes, elements), material_properties, fixed_dofs, contact_forces)
 
-    # Assemble global stiffness matrix
-    for element in elements:
-        element_nodes = nodes[element]  # Coordinates of element nodes
-        element_material = material_properties[element]  # Extract material properties [E, nu] for element nodes
-        K_element = element_stiffness_matrix(element_nodes, element_material)
 
-        # Skip degenerate elements
-        if np.allclose(K_element, 0):
-            print(f"Skipping degenerate element with nodes: {element_nodes}")
-            continue
-
-        # Global DOF indices for triangular elements
-        global_dof_indices = np.array([2 * n for n in element] + [2 * n + 1 for n in element], dtype=int)
+def solve_fem_mesh(mesh, material_properties, fixed_dofs, contact_forces):
+    """
+    Solves the FEM system with the sparse stiffness matrix of the mesh.
 
-        # Assemble into the global stiffness matrix
-        for i in range(6):  # 6 DOFs for triangular elements
-            for j in range(6):
-                K[global_dof_indices[i], global_dof_indices[j]] += K_element[i, j]
+    The fixed DOFs get zero displacement and the system is solved on the free DOFs only.
+    Degenerate elements (area < 1e-6) are skipped, as in element_stiffness_matrix.
 
-    print(f"Non-zero elements in global K after assembly: {np.count_nonzero(K)}")
-    print(f"Force Vector Size: {F.shape}")
-    print(f"Stiffness Matrix Shape: {K.shape}")
-    print(f"First row of K (sample): {K[0, :10]}")  # Display part of the stiffness matrix
+    Parameters:
+        mesh (TriangleMesh): Mesh with node coordinates and connectivity.
+        material_properties (numpy.ndarray): Array of material properties at each node [E, nu].
+        fixed_dofs (list): List of constrained degrees of freedom.
+        contact_forces (numpy.ndarray): Global force vector (N).
 
-    # Before applying boundary conditions
-    print(f"Initial Force Vector (F): Non-zero entries: {np.nonzero(F)[0]}")
-    print(f"Force Magnitudes: {F[np.nonzero(F)]}")
+    Returns:
+        tuple: (displacements, stresses), as returned by solve_fem.
+            Zero displacements and stresses if the stiffness matrix is singular.
+    """
+    num_dofs = 2 * mesh.num_nodes
+    K = assemble_stiffness_matrix(mesh, material_properties)
 
     # Apply boundary conditions
-    for dof in fixed_dofs:
-        K[dof, :] = 0
-        K[:, dof] = 0
-        K[dof, dof] = 1
-        F[dof] = 0
-
-    # After applying boundary conditions
-    F_bc = F.copy()  # Copy of F after applying boundary conditions
-    print(f"Force Vector after BCs: Non-zero entries: {np.nonzero(F_bc)[0]}")
-    print(f"Force Magnitudes after BCs: {F_bc[np.nonzero(F_bc)]}")
-
-    # Check equilibrium
-    net_force = np.sum(F_bc)
-    print(f"Net Force in the system after applying BCs: {net_force}")
-
-    # Solve the system of equations
-    try:
-        print("Solving system of equations...")
-        displacements = np.linalg.solve(K, F)
-    except np.linalg.LinAlgError:
+    free = np.ones(num_dofs, dtype=bool)
+    free[np.asarray(fixed_dofs, dtype=int)] = False
+    free_dofs = np.flatnonzero(free)
+
+    displacements = np.zeros(num_dofs)
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", MatrixRankWarning)
+        displacements[free_dofs] = spsolve(K[free_dofs][:, free_dofs].tocsc(), contact_forces[free_dofs])
+    if not np.all(np.isfinite(displacements)):
         print("Error: Stiffness matrix is singular. Check boundary conditions or mesh connectivity.")
-        return np.zeros(num_dofs), np.zeros((len(elements), 3))  # Return zero displacements and stresses
-
-    print(f"Maximum Displacement: {np.max(displacements):.2e}")
-    print(f"Non-zero forces in F: {np.nonzero(F)}")
-    print(f"Force values: {F[np.nonzero(F)]}")
-
-
-    # Compute stresses for each element
-    stresses = []
-    for element in elements:
-        element_nodes = nodes[element]
-        element_material = material_properties[element]
-        element_displacements = displacements[[2 * n for n in element] + [2 * n + 1 for n in element]]
-        stress = compute_element_stress(element_nodes, element_material, element_displacements)
-        stresses.append(stress)
-
-    return displacements, np.array(stresses)
+        return np.zeros(num_dofs), np.zeros((mesh.num_elements, 3))  # Return zero displacements and stresses
 
+    return displacements, compute_element_stresses(mesh, material_properties, displacements)
 
 
 def element_stiffness_matrix(nodes, material_properties):
@@ -202,7 +172,106 @@ def compute_element_stress(nodes, material_properties, displacements):
     return stress
 
 
+def element_dof_indices(elements):
+    """
+    Returns the global DOF indices of every element, in the same order used by solve_fem.
+
+    Parameters:
+        elements (numpy.ndarray): Array of element connectivity [n1, n2, n3].
+
+    Returns:
+        numpy.ndarray: Global DOF indices, shape (num_elements, 6).
+    """
+    elements = np.asarray(elements, dtype=int)
+    return np.hstack([2 * elements, 2 * elements + 1])
+
+
+def element_matrices(mesh, material_properties, element_mask=None):
+    """
+    Returns the B and D matrices of all triangular elements at once.
+
+    The B-matrices come from the cached mesh data and follow element_stiffness_matrix,
+    which scales by 1 / (2 * |A|) whatever the element orientation.
+
+    Parameters:
+        mesh (TriangleMesh): Mesh with node coordinates and connectivity.
+        material_properties (numpy.ndarray): Array of material properties at each node [E, nu].
+        element_mask (numpy.ndarray): Optional mask or indices selecting a subset of elements.
+
+    Returns:
+        tuple: (areas, B, D, degenerate)
+            - areas: Element areas, shape (num_elements,).
+            - B: Strain-displacement matrices, shape (num_elements, 3, 6).
+            - D: Material matrices, shape (num_elements, 3, 3).
+            - degenerate: Boolean mask of elements skipped by the solver (area < 1e-6).
+    """
+    selection = slice(None) if element_mask is None else element_mask
+    elements = mesh.connectivity[selection]
+    areas = mesh.areas[selection]
+    degenerate = areas < 1e-6
+    orientation = np.sign(mesh.signed_areas[selection])
+    B = mesh.strain_matrices[selection] * orientation[:, None, None]
+
+    # Averaged material properties per element
+    E_avg = material_properties[elements, 0].mean(axis=1)
+    nu_avg = material_properties[elements, 1].mean(axis=1)
+
+    D = np.zeros((len(elements), 3, 3))
+    D[:, 0, 0] = D[:, 1, 1] = 1
+    D[:, 0, 1] = D[:, 1, 0] = nu_avg
+    D[:, 2, 2] = (1 - nu_avg) / 2
+    D *= (E_avg / (1 - nu_avg**2))[:, None, None]
+
+    return areas, B, D, degenerate
+
+
+def element_stiffness_matrices(mesh, material_properties, element_mask=None):
+    """
+    Vectorized counterpart of element_stiffness_matrix for all (or the selected) elements.
+
+    Returns:
+        numpy.ndarray: Element stiffness matrices, shape (num_elements, 6, 6).
+            Degenerate elements get a zero matrix, as in element_stiffness_matrix.
+    """
+    areas, B, D, degenerate = element_matrices(mesh, material_properties, element_mask)
+    K = areas[:, None, None] * np.einsum("eji,ejk,ekl->eil", B, D, B)
+    K[degenerate] = 0
+    return K
+
+
+def assemble_stiffness_matrix(mesh, material_properties, element_mask=None):
+    """
+    Assembles the global stiffness matrix in sparse (CSR) format.
 
+    Parameters:
+        mesh (TriangleMesh): Mesh with node coordinates and connectivity.
+        material_properties (numpy.ndarray): Array of material properties at each node [E, nu].
+        element_mask (numpy.ndarray): Optional mask or indices of the elements to assemble.
+
+    Returns:
+        scipy.sparse.csr_matrix: Global stiffness matrix without boundary conditions.
+    """
+    num_dofs = 2 * mesh.num_nodes
+    selection = slice(None) if element_mask is None else element_mask
+    K_elements = element_stiffness_matrices(mesh, material_properties, element_mask)
+    dofs = element_dof_indices(mesh.connectivity[selection])
+    rows = np.repeat(dofs, 6, axis=1).ravel()
+    cols = np.tile(dofs, (1, 6)).ravel()
+    return sparse.coo_matrix((K_elements.ravel(), (rows, cols)), shape=(num_dofs, num_dofs)).tocsr()
+
+
+def compute_element_stresses(mesh, material_properties, displacements):
+    """
+    Vectorized counterpart of compute_element_stress for all elements.
+
+    Returns:
+        numpy.ndarray: Array of element stresses [sigma_xx, sigma_yy, tau_xy].
+    """
+    _, B, D, degenerate = element_matrices(mesh, material_properties)
+    element_displacements = displacements[element_dof_indices(mesh.connectivity)]
+    stresses = np.einsum("eij,ejk,ek->ei", D, B, element_displacements)
+    stresses[degenerate] = 0
+    return stresses
 
 
 if __name__ == "__main__":
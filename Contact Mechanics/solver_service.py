@@ -0,0 +1,373 @@
+"""
+Long-running solver process for interactive load cases.
+
+The server keeps the mesh, the assembled stiffness matrix and its factorization of each
+model configuration in memory, so a repeated query only builds a force vector and does a
+pair of triangular solves. Requests are newline-delimited JSON over a Unix socket (or a
+localhost TCP port where Unix sockets are unavailable); the displacement and stress
+arrays are returned in shared memory blocks, which the client releases once copied.
+
+Start the server:
+    python solver_service.py --socket /tmp/contact_solver.sock
+
+Query it from another process:
+    from solver_service import request_solution
+    displacements, stresses = request_solution({"normal_force": 2e6}, socket_path="/tmp/contact_solver.sock")
+"""
+import argparse
+import asyncio
+import copy
+import hashlib
+import json
+import os
+import socket
+import sys
+import time
+from collections import OrderedDict
+from multiprocessing import resource_tracker, shared_memory
+
+import numpy as np
+from scipy.sparse.linalg import factorized
+
+from parameters import params
+from material_properties import apply_material_gradient, compute_inhomogeneity_constant
+from boundary_conditions import apply_boundary_conditions, compute_contact_forces
+from solver import assemble_stiffness_matrix, element_dof_indices, element_matrices
+
+DEFAULT_SOCKET_PATH = "/tmp/contact_solver.sock"
+
+# Parameter categories that define a model (mesh, matrices and factorization)
+MODEL_CATEGORIES = ("geometry", "material", "mesh")
+
+
+def resolve_parameters(config):
+    """
+    Merges per-category overrides into a copy of the default parameters.
+
+    Parameters:
+        config (dict): Overrides, e.g. {"material": {"shear_modulus_surface": 1e11}}, or
+            a value for a scalar entry, e.g. {"domain_scaling_factor": 5.0}.
+
+    Returns:
+        dict: Full parameter dictionary. The inhomogeneity constant is always derived from
+            the resolved moduli and H_FGM with compute_inhomogeneity_constant, as in
+            parameters.py, unless it is given explicitly.
+    """
+    config = config or {}
+    resolved = copy.deepcopy(params)
+    for category, overrides in config.items():
+        if category not in resolved:
+            raise ValueError(f"Unknown parameter category {category!r}, expected one of {sorted(resolved)}")
+        if not isinstance(resolved[category], dict):
+            resolved[category] = overrides
+        elif isinstance(overrides, dict):
+            resolved[category].update(overrides)
+        else:
+            raise ValueError(f"Overrides of {category!r} must be a dict of parameters, got {overrides!r}")
+
+    # The domain is widened for semi-infinite behavior, as in parameters.py
+    geometry_params = resolved["geometry"]
+    geometry_params["W_FGM"] = max(
+        resolved["domain_scaling_factor"] * geometry_params["indenter_width"], geometry_params["W_FGM"]
+    )
+
+    if "inhomogeneity_constant" not in config.get("material", {}):
+        resolved["material"]["inhomogeneity_constant"] = compute_inhomogeneity_constant(
+            resolved["material"], resolved["geometry"]
+        )
+    return resolved
+
+
+def model_key(resolved_params):
+    """Hashes the parameters that define a model into a cache key."""
+    model_params = {category: resolved_params[category] for category in MODEL_CATEGORIES}
+    return hashlib.sha1(json.dumps(model_params, sort_keys=True).encode()).hexdigest()
+
+
+def build_model(resolved_params):
+    """
+    Meshes, assembles and factorizes one model configuration.
+
+    Returns:
+        dict: Resident model, as returned by assemble_model.
+    """
+    from mesh_generation import generate_mesh_gmsh  # Only the server pays for the gmsh import
+
+    start = time.perf_counter()
+    nodes, elements = generate_mesh_gmsh(
+        resolved_params["geometry"],
+        resolved_params["mesh"]["num_elements_x"],
+        resolved_params["mesh"]["num_elements_y_FGM"] + resolved_params["mesh"]["num_elements_y_substrate"],
+        visualize=False,
+    )
+    model = assemble_model(resolved_params, nodes, elements)
+    mesh = model["mesh"]
+    print(f"Model built in {time.perf_counter() - start:.2f} s ({mesh.num_nodes} nodes, {mesh.num_elements} elements)")
+    return model
+
+
+def assemble_model(resolved_params, nodes, elements):
+    """
+    Assembles and factorizes one model configuration on a given mesh.
+
+    Returns:
+        dict: Resident model with the mesh, the factorized stiffness on the free DOFs and
+            the element stress operators D @ B.
+    """
+    from fem_mesh import TriangleMesh  # Shared with Numerical, on the path of the entry scripts
+
+    geometry_params = resolved_params["geometry"]
+    material_properties = apply_material_gradient(nodes, resolved_params["material"], geometry_params)
+    fixed_dofs, _ = apply_boundary_conditions(nodes, elements, geometry_params, resolved_params["contact"])
+    mesh = TriangleMesh(nodes, elements)
+
+    num_dofs = 2 * mesh.num_nodes
+    free = np.ones(num_dofs, dtype=bool)
+    free[fixed_dofs] = False
+    free_dofs = np.flatnonzero(free)
+
+    K = assemble_stiffness_matrix(mesh, material_properties)
+    solve = factorized(K[free_dofs][:, free_dofs].tocsc())
+
+    _, B, D, degenerate = element_matrices(mesh, material_properties)
+    stress_operators = D @ B
+    stress_operators[degenerate] = 0
+
+    return {
+        "mesh": mesh,
+        "geometry": geometry_params,
+        "free_dofs": free_dofs,
+        "solve": solve,
+        "element_dofs": element_dof_indices(mesh.connectivity),
+        "stress_operators": stress_operators,
+    }
+
+
+def solve_load_case(model, contact_params):
+    """
+    Solves one load case on a resident model.
+
+    Returns:
+        tuple: (displacements, stresses), as returned by solve_fem.
+    """
+    forces = compute_contact_forces(model["mesh"].coordinates, model["geometry"], contact_params)
+    displacements = np.zeros(len(forces))
+    displacements[model["free_dofs"]] = model["solve"](forces[model["free_dofs"]])
+    stresses = np.einsum("eij,ej->ei", model["stress_operators"], displacements[model["element_dofs"]])
+    return displacements, stresses
+
+
+def _read_shared_array(description):
+    # Copy an array out of a block owned by the service; the service unlinks the block
+    if sys.version_info >= (3, 13):
+        block = shared_memory.SharedMemory(name=description["name"], track=False)
+    else:
+        block = shared_memory.SharedMemory(name=description["name"])
+        if os.name == "posix":
+            # Attaching registers the block with this process's resource tracker, which would
+            # unlink it (and warn about a leak) when the client exits
+            resource_tracker.unregister(f"/{block.name}", "shared_memory")
+    try:
+        return np.ndarray(description["shape"], dtype=description["dtype"], buffer=block.buf).copy()
+    finally:
+        block.close()
+
+
+class SolverService:
+    """
+    Resident models keyed by configuration, served over asyncio streams.
+
+    Results are returned in shared memory blocks created and owned by the service: a
+    client releases them once copied, and blocks that are never released are unlinked
+    after shared_memory_timeout seconds or when the service stops, so nothing is left in
+    /dev/shm.
+    """
+
+    def __init__(self, max_models=8, shared_memory_timeout=300.0):
+        self.max_models = max_models
+        self.shared_memory_timeout = shared_memory_timeout
+        self.models = OrderedDict()
+        self.build_lock = asyncio.Lock()
+        self.shared_blocks = {}
+        self.server = None
+        self.stopped = None
+
+    async def get_model(self, resolved_params):
+        """
+        Returns the resident model of a configuration, building it if needed.
+
+        Builds run one at a time: gmsh keeps global state, so two configurations must not be
+        meshed in parallel, and concurrent requests for a new configuration build it only once.
+
+        Returns:
+            tuple: (model, build_time), build_time being 0 for a resident model.
+        """
+        key = model_key(resolved_params)
+        build_time = 0.0
+        if key not in self.models:
+            async with self.build_lock:
+                if key not in self.models:
+                    start = time.perf_counter()
+                    loop = asyncio.get_running_loop()
+                    self.models[key] = await loop.run_in_executor(None, build_model, resolved_params)
+                    build_time = time.perf_counter() - start
+                    if len(self.models) > self.max_models:
+                        self.models.popitem(last=False)
+        self.models.move_to_end(key)
+        return self.models[key], build_time
+
+    def share_array(self, array):
+        # Copy an array into a new shared memory block, kept until released or expired
+        block = shared_memory.SharedMemory(create=True, size=max(array.nbytes, 1))
+        np.ndarray(array.shape, dtype=array.dtype, buffer=block.buf)[...] = array
+        self.shared_blocks[block.name] = (block, time.monotonic())
+        return {"name": block.name, "shape": list(array.shape), "dtype": array.dtype.str}
+
+    def release_blocks(self, names):
+        for name in names:
+            block, _ = self.shared_blocks.pop(name, (None, None))
+            if block is not None:
+                block.close()
+                block.unlink()
+
+    def release_expired_blocks(self):
+        now = time.monotonic()
+        self.release_blocks(
+            [name for name, (_, created) in self.shared_blocks.items() if now - created > self.shared_memory_timeout]
+        )
+
+    async def handle_request(self, request):
+        command = request.get("command", "solve")
+        if command == "status":
+            return {"status": "ok", "models": list(self.models), "shared_blocks": len(self.shared_blocks)}
+        if command == "shutdown":
+            self.stopped.set()
+            return {"status": "ok"}
+        if command == "release":
+            self.release_blocks(request.get("blocks", []))
+            return {"status": "ok"}
+        if command != "solve":
+            raise ValueError(f"Unknown command {command!r}")
+
+        self.release_expired_blocks()
+        resolved = resolve_parameters(request.get("config"))
+        model, build_time = await self.get_model(resolved)
+
+        geometry_params = resolved["geometry"]
+        contact_params = {
+            "normal_force": resolved["contact"]["normal_force"],
+            "contact_region": [
+                geometry_params["W_FGM"] / 2 - geometry_params["indenter_width"] / 2,
+                geometry_params["W_FGM"] / 2 + geometry_params["indenter_width"] / 2,
+            ],
+        }
+        contact_params.update(request.get("load_case", {}))
+
+        start = time.perf_counter()
+        displacements, stresses = solve_load_case(model, contact_params)
+        solve_time = time.perf_counter() - start
+        return {
+            "status": "ok",
+            "displacements": self.share_array(displacements),
+            "stresses": self.share_array(stresses),
+            "build_time": build_time,
+            "solve_time": solve_time,
+        }
+
+    async def handle_connection(self, reader, writer):
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                try:
+                    response = await self.handle_request(json.loads(line))
+                except Exception as error:  # Report the failure to the client and keep serving
+                    response = {"status": "error", "message": f"{type(error).__name__}: {error}"}
+                writer.write(json.dumps(response).encode() + b"\n")
+                await writer.drain()
+                if self.stopped.is_set():
+                    break
+        finally:
+            writer.close()
+
+    async def sweep_shared_blocks(self):
+        # Unlinks the blocks of clients that never released them, also while no requests arrive
+        while True:
+            await asyncio.sleep(self.shared_memory_timeout / 2)
+            self.release_expired_blocks()
+
+    async def serve(self, socket_path=DEFAULT_SOCKET_PATH, host="127.0.0.1", port=None):
+        self.stopped = asyncio.Event()
+        if port is None:
+            if os.path.exists(socket_path):
+                os.remove(socket_path)
+            self.server = await asyncio.start_unix_server(self.handle_connection, path=socket_path)
+            print(f"Contact solver listening on {socket_path}")
+        else:
+            self.server = await asyncio.start_server(self.handle_connection, host=host, port=port)
+            print(f"Contact solver listening on {host}:{port}")
+
+        sweeper = asyncio.create_task(self.sweep_shared_blocks())
+        try:
+            await self.stopped.wait()  # Set by a "shutdown" request
+        finally:
+            sweeper.cancel()
+            self.server.close()
+            await self.server.wait_closed()
+            self.release_blocks(list(self.shared_blocks))
+            if port is None and os.path.exists(socket_path):
+                os.remove(socket_path)
+
+
+def request_solution(load_case, config=None, socket_path=DEFAULT_SOCKET_PATH, host="127.0.0.1", port=None):
+    """
+    Sends one load case to a running solver service and returns the results.
+
+    Parameters:
+        load_case (dict): Contact parameters for this query ("normal_force" and,
+            optionally, "contact_region").
+        config (dict): Parameter overrides per category selecting the model.
+        socket_path (str): Unix socket of the service (used when port is None).
+        host (str), port (int): TCP address of the service.
+
+    Returns:
+        tuple: (displacements, stresses)
+    """
+    if port is None:
+        connection = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        connection.connect(socket_path)
+    else:
+        connection = socket.create_connection((host, port))
+
+    with connection, connection.makefile("rwb") as stream:
+        request = {"command": "solve", "config": config or {}, "load_case": load_case}
+        stream.write(json.dumps(request).encode() + b"\n")
+        stream.flush()
+        response = json.loads(stream.readline())
+        if response["status"] != "ok":
+            raise RuntimeError(f"Solver service error: {response['message']}")
+
+        try:
+            return _read_shared_array(response["displacements"]), _read_shared_array(response["stresses"])
+        finally:
+            names = [response["displacements"]["name"], response["stresses"]["name"]]
+            stream.write(json.dumps({"command": "release", "blocks": names}).encode() + b"\n")
+            stream.flush()
+            stream.readline()
+
+
+if __name__ == "__main__":
+    sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))  # fem_mesh.py
+
+    parser = argparse.ArgumentParser(description="Resident contact mechanics solver")
+    parser.add_argument("--socket", default=DEFAULT_SOCKET_PATH, help="Unix socket path")
+    parser.add_argument("--port", type=int, default=None, help="Serve on localhost TCP instead of a Unix socket")
+    parser.add_argument("--max-models", type=int, default=8, help="Number of resident model configurations")
+    parser.add_argument(
+        "--shared-memory-timeout", type=float, default=300.0, help="Seconds before unreleased results are unlinked"
+    )
+    args = parser.parse_args()
+
+    service = SolverService(max_models=args.max_models, shared_memory_timeout=args.shared_memory_timeout)
+    asyncio.run(service.serve(socket_path=args.socket, port=args.port))
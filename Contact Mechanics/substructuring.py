@@ -0,0 +1,297 @@
+import hashlib
+import os
+
+import numpy as np
+from scipy import sparse
+from scipy.sparse.linalg import splu, spsolve
+
+from solver import assemble_stiffness_matrix, compute_element_stresses
+
+# Superelements already loaded or built during this session, keyed by their cache key
+_superelement_cache = {}
+
+
+def partition_substrate(mesh, geometry_params):
+    """
+    Splits the mesh into the condensable substrate region and the top region.
+
+    The substrate region contains the elements whose nodes all lie strictly below the
+    FGM layer, so their stiffness does not depend on any FGM property. The interface
+    consists of the region nodes that are shared with the remaining (top) elements.
+
+    Parameters:
+        mesh (TriangleMesh): Mesh with node coordinates and connectivity.
+        geometry_params (dict): Geometry parameters (uses "H_substrate").
+
+    Returns:
+        tuple: (region_elements, internal_nodes, interface_nodes)
+            - region_elements: Boolean mask of the substrate elements that are condensed.
+            - internal_nodes: Nodes only connected to substrate elements.
+            - interface_nodes: Nodes shared between the substrate and the top region.
+    """
+    # Same classification as apply_material_gradient
+    elements = mesh.connectivity
+    substrate_nodes = mesh.coordinates[:, 1] < geometry_params["H_substrate"]
+    region_elements = np.all(substrate_nodes[elements], axis=1)
+
+    region_nodes = np.unique(elements[region_elements])
+    top_nodes = np.unique(elements[~region_elements])
+    interface_nodes = np.intersect1d(region_nodes, top_nodes)
+    internal_nodes = np.setdiff1d(region_nodes, top_nodes)
+
+    return region_elements, internal_nodes, interface_nodes
+
+
+def _node_dofs(node_ids):
+    return np.column_stack([2 * node_ids, 2 * node_ids + 1]).ravel()
+
+
+def _canonical_order(nodes, node_ids):
+    # Sort by (x, y) so that the superelement does not depend on the global node numbering
+    coords = nodes[node_ids]
+    return node_ids[np.lexsort((coords[:, 1], coords[:, 0]))]
+
+
+def superelement_key(mesh, material_properties, fixed_dofs, region_elements):
+    """
+    Computes the cache key of the substrate superelement.
+
+    The key covers everything the condensed matrices depend on: the substrate node
+    coordinates, the connectivity, the substrate material and the constrained DOFs.
+    Nodes are relabelled in coordinate order first, so regenerating the mesh with a
+    different FGM layer (which renumbers the substrate nodes) still hits the cache.
+    """
+    nodes, elements = mesh.coordinates, mesh.connectivity
+    region_nodes = _canonical_order(nodes, np.unique(elements[region_elements]))
+    local_index = np.full(len(nodes), -1)
+    local_index[region_nodes] = np.arange(len(region_nodes))
+
+    connectivity = local_index[elements[region_elements]]
+    connectivity = connectivity[np.lexsort(connectivity.T[::-1])]
+
+    fixed = np.zeros(2 * len(nodes), dtype=bool)
+    fixed[list(fixed_dofs)] = True
+
+    digest = hashlib.sha1()
+    for array in (
+        nodes[region_nodes],
+        connectivity.astype(np.int64),
+        material_properties[region_nodes],
+        fixed[_node_dofs(region_nodes)],
+    ):
+        digest.update(np.ascontiguousarray(array).tobytes())
+    return digest.hexdigest()
+
+
+def build_substrate_superelement(mesh, material_properties, fixed_dofs, geometry_params):
+    """
+    Statically condenses the substrate region onto its interface with the top region.
+
+    With the substrate DOFs split into internal (i) and interface (b) DOFs, the condensed
+    stiffness is the Schur complement S = K_bb - K_bi K_ii^-1 K_ib and the internal
+    displacements follow from u_i = T u_b + K_ii^-1 F_i with T = -K_ii^-1 K_ib.
+
+    Parameters:
+        mesh (TriangleMesh): Mesh with node coordinates and connectivity.
+        material_properties (numpy.ndarray): Array of material properties at each node [E, nu].
+        fixed_dofs (list): List of constrained degrees of freedom.
+        geometry_params (dict): Geometry parameters.
+
+    Returns:
+        dict: Superelement with the condensed matrices, stored in canonical (coordinate
+            sorted) DOF order:
+            - "schur_complement": Condensed interface stiffness S.
+            - "recovery_matrix": Internal displacement recovery operator T.
+            - "K_ii": Sparse internal stiffness, used when the substrate carries loads.
+            - "internal_dofs", "interface_dofs": Free DOFs in canonical numbering.
+    """
+    region_elements, internal_nodes, interface_nodes = partition_substrate(mesh, geometry_params)
+    region_nodes = _canonical_order(mesh.coordinates, np.unique(mesh.connectivity[region_elements]))
+
+    fixed = np.zeros(2 * mesh.num_nodes, dtype=bool)
+    fixed[list(fixed_dofs)] = True
+    region_dofs = _node_dofs(region_nodes)
+    is_interface = np.isin(region_dofs // 2, interface_nodes)
+
+    # Free DOFs, in canonical numbering (position within region_dofs)
+    internal_local = np.flatnonzero(~is_interface & ~fixed[region_dofs])
+    interface_local = np.flatnonzero(is_interface & ~fixed[region_dofs])
+
+    K_region = assemble_stiffness_matrix(mesh, material_properties, region_elements)
+    K_region = K_region[region_dofs][:, region_dofs].tocsc()
+
+    K_ii = K_region[internal_local][:, internal_local].tocsc()
+    K_ib = K_region[internal_local][:, interface_local].toarray()
+    K_bb = K_region[interface_local][:, interface_local].toarray()
+
+    print(f"Condensing substrate: {len(internal_local)} internal DOFs onto {len(interface_local)} interface DOFs")
+    recovery_matrix = -splu(K_ii).solve(K_ib)
+    schur_complement = K_bb + K_ib.T @ recovery_matrix
+    schur_complement = 0.5 * (schur_complement + schur_complement.T)  # Remove round-off asymmetry
+
+    return {
+        "schur_complement": schur_complement,
+        "recovery_matrix": recovery_matrix,
+        "K_ii": K_ii,
+        "internal_dofs": internal_local,
+        "interface_dofs": interface_local,
+    }
+
+
+def save_superelement(superelement, file_path):
+    """Writes a superelement to a compressed .npz file."""
+    K_ii = superelement["K_ii"].tocsc()
+    np.savez_compressed(
+        file_path,
+        schur_complement=superelement["schur_complement"],
+        recovery_matrix=superelement["recovery_matrix"],
+        K_ii_data=K_ii.data,
+        K_ii_indices=K_ii.indices,
+        K_ii_indptr=K_ii.indptr,
+        K_ii_shape=K_ii.shape,
+        internal_dofs=superelement["internal_dofs"],
+        interface_dofs=superelement["interface_dofs"],
+    )
+
+
+def load_superelement(file_path):
+    """Reads a superelement written by save_superelement."""
+    with np.load(file_path) as data:
+        K_ii = sparse.csc_matrix(
+            (data["K_ii_data"], data["K_ii_indices"], data["K_ii_indptr"]), shape=tuple(data["K_ii_shape"])
+        )
+        return {
+            "schur_complement": data["schur_complement"],
+            "recovery_matrix": data["recovery_matrix"],
+            "K_ii": K_ii,
+            "internal_dofs": data["internal_dofs"],
+            "interface_dofs": data["interface_dofs"],
+        }
+
+
+def get_substrate_superelement(mesh, material_properties, fixed_dofs, geometry_params, cache_directory):
+    """
+    Returns the substrate superelement, from memory or disk when available.
+
+    A missing superelement is built with build_substrate_superelement and written to
+    cache_directory, so later FGM variants on the same substrate reuse it.
+    """
+    region_elements, _, _ = partition_substrate(mesh, geometry_params)
+    key = superelement_key(mesh, material_properties, fixed_dofs, region_elements)
+
+    if key in _superelement_cache:
+        return _superelement_cache[key]
+
+    file_path = os.path.join(cache_directory, f"substrate_{key}.npz") if cache_directory else None
+    if file_path and os.path.exists(file_path):
+        print(f"Loading substrate superelement from {file_path}")
+        superelement = load_superelement(file_path)
+    else:
+        superelement = build_substrate_superelement(mesh, material_properties, fixed_dofs, geometry_params)
+        if file_path:
+            os.makedirs(cache_directory, exist_ok=True)
+            save_superelement(superelement, file_path)
+            print(f"Substrate superelement written to {file_path}")
+
+    _superelement_cache[key] = superelement
+    return superelement
+
+
+def solve_fem_condensed(mesh, material_properties, fixed_dofs, contact_forces, solver_params, geometry_params):
+    """
+    Solves the FEM system with the substrate replaced by its cached superelement.
+
+    Only the elements touching the FGM layer are assembled; the substrate enters through
+    its Schur complement on the interface. The result is the same as solve_fem.
+
+    Parameters:
+        mesh (TriangleMesh): Mesh with node coordinates and connectivity.
+        material_properties (numpy.ndarray): Array of material properties at each node.
+        fixed_dofs (list): List of constrained degrees of freedom.
+        contact_forces (numpy.ndarray): Global force vector (N).
+        solver_params (dict): Solver parameters (uses "superelement_cache_directory").
+        geometry_params (dict): Geometry parameters.
+
+    Returns:
+        tuple: (displacements, stresses)
+            - displacements: Array of nodal displacements [u_x, u_y].
+            - stresses: Array of element stresses [sigma_xx, sigma_yy, tau_xy].
+    """
+    num_dofs = 2 * mesh.num_nodes
+    region_elements, _, _ = partition_substrate(mesh, geometry_params)
+    superelement = get_substrate_superelement(
+        mesh, material_properties, fixed_dofs, geometry_params,
+        solver_params.get("superelement_cache_directory"),
+    )
+
+    # Map the canonical superelement DOFs to the current global numbering
+    region_dofs = _node_dofs(_canonical_order(mesh.coordinates, np.unique(mesh.connectivity[region_elements])))
+    internal_dofs = region_dofs[superelement["internal_dofs"]]
+    interface_dofs = region_dofs[superelement["interface_dofs"]]
+
+    # Free DOFs of the reduced system: everything except fixed and internal substrate DOFs
+    reduced = np.ones(num_dofs, dtype=bool)
+    reduced[list(fixed_dofs)] = False
+    reduced[internal_dofs] = False
+    reduced_dofs = np.flatnonzero(reduced)
+    position = np.full(num_dofs, -1)
+    position[reduced_dofs] = np.arange(len(reduced_dofs))
+
+    K_top = assemble_stiffness_matrix(mesh, material_properties, ~region_elements)
+    interface_position = position[interface_dofs]
+    rows = np.repeat(interface_position, len(interface_position))
+    cols = np.tile(interface_position, len(interface_position))
+    S = sparse.coo_matrix(
+        (superelement["schur_complement"].ravel(), (rows, cols)), shape=(len(reduced_dofs), len(reduced_dofs))
+    )
+    K_reduced = (K_top[reduced_dofs][:, reduced_dofs] + S).tocsc()
+
+    F = contact_forces.copy()
+    F_internal = F[internal_dofs]
+    F_reduced = F[reduced_dofs]
+    F_reduced[interface_position] += superelement["recovery_matrix"].T @ F_internal
+
+    print(f"Solving condensed system with {len(reduced_dofs)} DOFs ({len(internal_dofs)} substrate DOFs condensed)")
+    displacements = np.zeros(num_dofs)
+    displacements[reduced_dofs] = spsolve(K_reduced, F_reduced)
+
+    # Recover the substrate displacements
+    u_internal = superelement["recovery_matrix"] @ displacements[interface_dofs]
+    if np.any(F_internal):
+        u_internal += splu(superelement["K_ii"]).solve(F_internal)
+    displacements[internal_dofs] = u_internal
+
+    print(f"Maximum Displacement: {np.max(displacements):.2e}")
+
+    stresses = compute_element_stresses(mesh, material_properties, displacements)
+    return displacements, stresses
+
+
+if __name__ == "__main__":
+    # Example usage: vary the FGM surface modulus on a fixed substrate
+    from parameters import params
+    from mesh_generation import generate_mesh_gmsh
+    from material_properties import apply_material_gradient, compute_inhomogeneity_constant
+    from boundary_conditions import apply_boundary_conditions
+    import sys
+    sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+    from fem_mesh import TriangleMesh
+
+    nodes, elements = generate_mesh_gmsh(
+        params["geometry"],
+        params["mesh"]["num_elements_x"],
+        params["mesh"]["num_elements_y_FGM"] + params["mesh"]["num_elements_y_substrate"],
+        visualize=False,
+    )
+    mesh = TriangleMesh(nodes, elements)
+    fixed_dofs, contact_forces = apply_boundary_conditions(nodes, elements, params["geometry"], params["contact"])
+
+    for shear_modulus_surface in [40e9, 80e9, 120e9]:
+        material = dict(params["material"], shear_modulus_surface=shear_modulus_surface)
+        material["inhomogeneity_constant"] = compute_inhomogeneity_constant(material, params["geometry"])
+        material_properties = apply_material_gradient(nodes, material, params["geometry"])
+
+        displacements, stresses = solve_fem_condensed(
+            mesh, material_properties, fixed_dofs, contact_forces, params["solver"], params["geometry"]
+        )
+        print(f"G_surface = {shear_modulus_surface:.1e}: max |u_y| = {np.abs(displacements[1::2]).max():.3e}")
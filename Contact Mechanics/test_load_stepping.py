@@ -0,0 +1,91 @@
+import glob
+import os
+
+import numpy as np
+import pytest
+
+from load_stepping import run_load_stepping
+
+
+@pytest.fixture
+def stepping(contact_model, tmp_path):
+    def run(material_properties=None, resume=True, **solver_overrides):
+        solver_params = dict(contact_model["params"]["solver"], checkpoint_directory=str(tmp_path), **solver_overrides)
+        return run_load_stepping(
+            contact_model["mesh"],
+            contact_model["material_properties"] if material_properties is None else material_properties,
+            contact_model["fixed_dofs"], contact_model["params"]["geometry"], contact_model["params"]["contact"],
+            solver_params, resume=resume,
+        )
+
+    return run
+
+
+def checkpoint_files(tmp_path):
+    # Checkpoints of every problem, by problem subdirectory
+    files = {}
+    for path in sorted(glob.glob(os.path.join(tmp_path, "*", "step_*.npz"))):
+        files.setdefault(os.path.basename(os.path.dirname(path)), []).append(path)
+    return files
+
+
+def test_load_stepping_reaches_the_full_force(stepping):
+    results = stepping()
+    assert np.isclose(results["load_factors"][-1], 1.0)
+    assert np.isclose(results["forces"][-1], 1e6)
+    assert np.all(np.diff(results["indentations"]) > 0)
+    assert len(results["contact_nodes"]) > 0
+
+
+def test_resume_restores_the_last_converged_step(stepping, tmp_path):
+    complete = stepping(resume=False)
+    (checkpoints,) = checkpoint_files(tmp_path).values()
+    assert len(checkpoints) == len(complete["load_factors"]) >= 2
+
+    # Finished run: nothing left to do, and the stored active set gives the contact nodes
+    resumed = stepping()
+    np.testing.assert_array_equal(resumed["displacements"], complete["displacements"])
+    np.testing.assert_array_equal(resumed["contact_nodes"], complete["contact_nodes"])
+
+    # Interrupted run: continue from the last remaining checkpoint
+    os.remove(checkpoints[-1])
+    resumed = stepping()
+    np.testing.assert_allclose(resumed["load_factors"], complete["load_factors"])
+    np.testing.assert_array_equal(resumed["contact_nodes"], complete["contact_nodes"])
+    np.testing.assert_allclose(
+        resumed["displacements"], complete["displacements"], rtol=0, atol=1e-6 * np.abs(complete["displacements"]).max()
+    )
+
+
+def test_checkpoints_of_another_material_are_kept_apart(stepping, contact_model, tmp_path):
+    stiff = stepping(resume=False)
+    softer = contact_model["material_properties"].copy()
+    softer[:, 0] *= 0.5
+
+    soft = stepping(softer)
+    assert np.abs(soft["displacements"]).max() > 1.5 * np.abs(stiff["displacements"]).max()
+    assert sorted(len(files) for files in checkpoint_files(tmp_path).values()) == sorted(
+        [len(stiff["load_factors"]), len(soft["load_factors"])]
+    )
+
+
+def test_a_longer_run_of_another_problem_does_not_hide_checkpoints(stepping, contact_model, tmp_path):
+    softer = contact_model["material_properties"].copy()
+    softer[:, 0] *= 0.5
+    longer = stepping(softer, resume=False, load_increment=0.05, max_load_increment=0.05)
+    complete = stepping(resume=False)
+    assert len(longer["load_factors"]) > len(complete["load_factors"])
+
+    # Interrupt the shorter run: it resumes from its own last step, not from scratch
+    files = checkpoint_files(tmp_path)
+    (own,) = [paths for paths in files.values() if len(paths) == len(complete["load_factors"])]
+    os.remove(own[-1])
+    resumed = stepping()
+    np.testing.assert_allclose(resumed["load_factors"], complete["load_factors"])
+    np.testing.assert_allclose(
+        resumed["displacements"], complete["displacements"], rtol=0, atol=1e-6 * np.abs(complete["displacements"]).max()
+    )
+
+    # A fresh run replaces its own steps only
+    stepping(resume=False)
+    assert sorted(map(len, checkpoint_files(tmp_path).values())) == sorted(map(len, files.values()))
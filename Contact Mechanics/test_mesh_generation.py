@@ -0,0 +1,37 @@
+import numpy as np
+import pytest
+
+from parameters import params
+from fem_mesh import TriangleMesh
+from timing import timed_stage
+
+
+@pytest.fixture
+def generate_mesh_gmsh():
+    # gmsh may be installed without the system libraries it loads (OSError, not ImportError)
+    try:
+        from mesh_generation import generate_mesh_gmsh
+    except (ImportError, OSError) as error:
+        pytest.skip(f"gmsh is not available: {error}")
+    return generate_mesh_gmsh
+
+
+def test_mesh_covers_the_domain(generate_mesh_gmsh):
+    geometry_params = params["geometry"]
+    nodes, elements = generate_mesh_gmsh(geometry_params, 20, 10, num_threads=2)
+
+    assert elements.dtype == np.int32
+    assert elements.min() >= 0 and elements.max() < len(nodes)
+    assert len(np.unique(elements)) == len(nodes)
+    area = geometry_params["W_FGM"] * (geometry_params["H_substrate"] + geometry_params["H_FGM"])
+    assert np.isclose(TriangleMesh(nodes, elements).areas.sum(), area)
+
+
+def test_timed_stage_records_failing_stages():
+    timings = {}
+    with timed_stage("first", timings):
+        pass
+    with pytest.raises(ValueError), timed_stage("second", timings):
+        raise ValueError
+    assert list(timings) == ["first", "second"]
+    assert all(elapsed >= 0 for elapsed in timings.values())
@@ -0,0 +1,79 @@
+import numpy as np
+
+from parameters import params
+from solver import solve_fem
+from material_properties import apply_material_gradient
+from reduced_order_model import (
+    build_reduced_model, evaluate_reduced_model, evaluate_with_fallback, sample_material, sample_material_parameters,
+    solve_full_order,
+)
+
+SPREAD = {"shear_modulus_surface": 0.2, "shear_modulus_substrate": 0.2, "poisson_ratio": 0.1}
+
+
+def test_nominal_sample_matches_parameters():
+    material = sample_material(params["material"], params["geometry"], {})
+    assert np.isclose(material["inhomogeneity_constant"], params["material"]["inhomogeneity_constant"])
+
+    # The FGM modulus meets the substrate modulus at the interface
+    interface = np.array([[0.0, params["geometry"]["H_substrate"] + 1e-12]])
+    properties = apply_material_gradient(interface, material, params["geometry"])
+    shear_modulus = properties[0, 0] / (2 * (1 + properties[0, 1]))
+    assert np.isclose(shear_modulus, material["shear_modulus_substrate"])
+
+
+def test_full_order_at_nominal_parameters_matches_solve_fem(contact_model):
+    model_params = contact_model["params"]
+    material = sample_material(model_params["material"], model_params["geometry"], {})
+    displacements, stresses = solve_full_order(
+        contact_model["mesh"], material, model_params["geometry"], contact_model["fixed_dofs"],
+        contact_model["contact_forces"],
+    )
+    expected = solve_fem(
+        contact_model["nodes"], contact_model["elements"], contact_model["material_properties"],
+        contact_model["fixed_dofs"], contact_model["contact_forces"], model_params["solver"],
+    )
+
+    np.testing.assert_allclose(displacements, expected[0], rtol=0, atol=1e-8 * np.abs(expected[0]).max())
+    np.testing.assert_allclose(stresses, expected[1], rtol=0, atol=1e-8 * np.abs(expected[1]).max())
+
+
+def test_reduced_model_error_is_bounded_by_its_estimate(contact_model):
+    model_params = contact_model["params"]
+    training = sample_material_parameters(model_params["material"], SPREAD, 15, seed=0)
+    calibration = sample_material_parameters(model_params["material"], SPREAD, 5, seed=1)
+    rom = build_reduced_model(
+        contact_model["mesh"], model_params["material"], model_params["geometry"], contact_model["fixed_dofs"],
+        contact_model["contact_forces"], training, validation_samples=calibration,
+    )
+
+    # Samples independent of the calibration, so the bound does not hold by construction
+    for sample in sample_material_parameters(model_params["material"], SPREAD, 10, seed=2):
+        material = sample_material(model_params["material"], model_params["geometry"], sample)
+        reference, _ = solve_full_order(
+            contact_model["mesh"], material, model_params["geometry"], contact_model["fixed_dofs"],
+            contact_model["contact_forces"],
+        )
+        displacements, _, error_estimate = evaluate_reduced_model(rom, sample)
+        error = np.linalg.norm(displacements - reference) / np.linalg.norm(reference)
+        assert error <= error_estimate * (1 + 1e-9)
+        assert error_estimate < 1e-3
+
+
+def test_fallback_solves_the_full_model_above_the_tolerance(contact_model):
+    model_params = contact_model["params"]
+    training = sample_material_parameters(model_params["material"], SPREAD, 3, seed=0)
+    rom = build_reduced_model(
+        contact_model["mesh"], model_params["material"], model_params["geometry"], contact_model["fixed_dofs"],
+        contact_model["contact_forces"], training,
+    )
+    sample = sample_material_parameters(model_params["material"], SPREAD, 1, seed=7)[0]
+
+    displacements, _, error_estimate, used_full_model = evaluate_with_fallback(rom, sample, tolerance=0.0)
+    material = sample_material(model_params["material"], model_params["geometry"], sample)
+    reference, _ = solve_full_order(
+        contact_model["mesh"], material, model_params["geometry"], contact_model["fixed_dofs"],
+        contact_model["contact_forces"],
+    )
+    assert used_full_model and error_estimate == 0.0
+    np.testing.assert_array_equal(displacements, reference)
@@ -0,0 +1,44 @@
+import numpy as np
+
+from solver import compute_element_stress, element_stiffness_matrix, solve_fem
+
+
+def reference_solution(nodes, elements, material_properties, fixed_dofs, contact_forces):
+    # Element-by-element dense assembly with the per-element kernels
+    K = np.zeros((2 * len(nodes), 2 * len(nodes)))
+    dofs = [np.array([2 * n for n in element] + [2 * n + 1 for n in element]) for element in elements]
+    for element, element_dofs in zip(elements, dofs):
+        K[np.ix_(element_dofs, element_dofs)] += element_stiffness_matrix(nodes[element], material_properties[element])
+    F = contact_forces.copy()
+    K[fixed_dofs, :] = 0
+    K[:, fixed_dofs] = 0
+    K[fixed_dofs, fixed_dofs] = 1
+    F[fixed_dofs] = 0
+    displacements = np.linalg.solve(K, F)
+    stresses = np.array([
+        compute_element_stress(nodes[element], material_properties[element], displacements[element_dofs])
+        for element, element_dofs in zip(elements, dofs)
+    ])
+    return displacements, stresses
+
+
+def test_solve_fem_matches_the_element_by_element_assembly(contact_model):
+    args = [contact_model[name] for name in ("nodes", "elements", "material_properties", "fixed_dofs", "contact_forces")]
+    expected = reference_solution(*args)
+    displacements, stresses = solve_fem(*args, contact_model["params"]["solver"])
+
+    np.testing.assert_allclose(displacements, expected[0], rtol=0, atol=1e-10 * np.abs(expected[0]).max())
+    np.testing.assert_allclose(stresses, expected[1], rtol=0, atol=1e-10 * np.abs(expected[1]).max())
+    assert np.abs(displacements).max() > 0
+    assert np.all(displacements[contact_model["fixed_dofs"]] == 0)
+
+
+def test_singular_system_gives_zero_fields(contact_model):
+    void = contact_model["material_properties"].copy()
+    void[:, 0] = 0
+    displacements, stresses = solve_fem(
+        contact_model["nodes"], contact_model["elements"], void, contact_model["fixed_dofs"],
+        contact_model["contact_forces"], contact_model["params"]["solver"],
+    )
+    assert not displacements.any() and not stresses.any()
+    assert stresses.shape == (len(contact_model["elements"]), 3)
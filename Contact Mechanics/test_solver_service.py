@@ -0,0 +1,187 @@
+import asyncio
+import json
+import multiprocessing
+import os
+import socket
+import threading
+import time
+from multiprocessing import shared_memory
+
+import numpy as np
+import pytest
+
+import solver_service
+from parameters import params
+from solver import solve_fem
+from solver_service import (
+    SolverService, assemble_model, model_key, request_solution, resolve_parameters, solve_load_case,
+)
+
+RESTATED_DEFAULTS = {
+    "geometry": dict(params["geometry"]),
+    "material": {name: value for name, value in params["material"].items() if name != "inhomogeneity_constant"},
+    "mesh": dict(params["mesh"]),
+}
+
+
+def _solve(resolved, contact_model):
+    model = assemble_model(resolved, contact_model["nodes"], contact_model["elements"])
+    return solve_load_case(model, resolved["contact"])
+
+
+def test_default_and_restated_configs_give_the_same_model(contact_model):
+    default = resolve_parameters({})
+    restated = resolve_parameters(RESTATED_DEFAULTS)
+    assert model_key(default) == model_key(restated)
+    assert default["material"]["inhomogeneity_constant"] == params["material"]["inhomogeneity_constant"]
+
+    for result, expected in zip(_solve(default, contact_model), _solve(restated, contact_model)):
+        np.testing.assert_array_equal(result, expected)
+
+
+def test_resident_model_matches_solve_fem(contact_model):
+    displacements, stresses = _solve(resolve_parameters({}), contact_model)
+    expected = solve_fem(
+        contact_model["nodes"], contact_model["elements"], contact_model["material_properties"],
+        contact_model["fixed_dofs"], contact_model["contact_forces"], params["solver"],
+    )
+    np.testing.assert_allclose(displacements, expected[0], rtol=0, atol=1e-8 * np.abs(expected[0]).max())
+    np.testing.assert_allclose(stresses, expected[1], rtol=0, atol=1e-8 * np.abs(expected[1]).max())
+
+
+def test_inhomogeneity_constant_follows_the_overrides():
+    resolved = resolve_parameters({"material": {"shear_modulus_surface": 1e11}})
+    expected = np.log(1e11 / params["material"]["shear_modulus_substrate"]) / params["geometry"]["H_FGM"]
+    assert np.isclose(resolved["material"]["inhomogeneity_constant"], expected)
+
+    explicit = resolve_parameters({"material": {"shear_modulus_surface": 1e11, "inhomogeneity_constant": 1.0}})
+    assert explicit["material"]["inhomogeneity_constant"] == 1.0
+
+
+def test_scalar_entries_and_unknown_categories():
+    widened = resolve_parameters({"domain_scaling_factor": 20.0})
+    assert widened["domain_scaling_factor"] == 20.0
+    assert widened["geometry"]["W_FGM"] == 20.0 * params["geometry"]["indenter_width"]
+    assert model_key(widened) != model_key(resolve_parameters({}))
+
+    with pytest.raises(ValueError, match="Unknown parameter category"):
+        resolve_parameters({"materials": {"poisson_ratio": 0.25}})
+    with pytest.raises(ValueError, match="must be a dict"):
+        resolve_parameters({"material": 0.25})
+
+
+@pytest.fixture
+def service(monkeypatch, contact_model):
+    # Models on the structured test mesh; records how many builds overlap
+    builds = {"count": 0, "running": 0, "max_running": 0}
+    lock = threading.Lock()
+
+    def build_model(resolved):
+        with lock:
+            builds["count"] += 1
+            builds["running"] += 1
+            builds["max_running"] = max(builds["max_running"], builds["running"])
+        time.sleep(0.05)
+        try:
+            return assemble_model(resolved, contact_model["nodes"], contact_model["elements"])
+        finally:
+            with lock:
+                builds["running"] -= 1
+
+    monkeypatch.setattr(solver_service, "build_model", build_model)
+    service = SolverService()
+    service.builds = builds
+    return service
+
+
+def _exists(name):
+    try:
+        block = shared_memory.SharedMemory(name=name)
+    except FileNotFoundError:
+        return False
+    block.close()
+    return True
+
+
+def test_builds_are_serialized_and_timed_separately(service):
+    configs = [{}, {}, {"material": {"shear_modulus_surface": 1e11}}]
+
+    async def run():
+        return await asyncio.gather(*(service.handle_request({"config": config}) for config in configs))
+
+    responses = asyncio.run(run())
+    assert service.builds["count"] == 2
+    assert service.builds["max_running"] == 1
+    assert all(response["solve_time"] > 0 for response in responses)
+    assert sum(response["build_time"] > 0 for response in responses) == 2
+
+    repeated = asyncio.run(service.handle_request({"config": {}}))
+    assert repeated["build_time"] == 0.0
+    service.release_blocks(list(service.shared_blocks))
+
+
+def test_shared_blocks_are_released_or_expire(service, contact_model):
+    response = asyncio.run(service.handle_request({"config": {}}))
+    names = [response["displacements"]["name"], response["stresses"]["name"]]
+    displacements, _ = _solve(resolve_parameters({}), contact_model)
+    description = response["displacements"]
+    block, _ = service.shared_blocks[description["name"]]
+    shared = np.ndarray(description["shape"], dtype=description["dtype"], buffer=block.buf)
+    np.testing.assert_array_equal(shared, displacements)
+    del shared
+
+    asyncio.run(service.handle_request({"command": "release", "blocks": names}))
+    assert not service.shared_blocks
+    assert not any(_exists(name) for name in names)
+
+    service.shared_memory_timeout = 0.0
+    response = asyncio.run(service.handle_request({"config": {}}))
+    service.release_expired_blocks()
+    assert not service.shared_blocks
+    assert not _exists(response["displacements"]["name"])
+
+
+def _send(socket_path, request):
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as connection:
+        connection.connect(socket_path)
+        with connection.makefile("rwb") as stream:
+            stream.write(json.dumps(request).encode() + b"\n")
+            stream.flush()
+            return json.loads(stream.readline())
+
+
+def _serve(socket_path):
+    asyncio.run(SolverService().serve(socket_path=socket_path))
+
+
+def test_request_over_a_unix_socket(monkeypatch, contact_model, tmp_path):
+    # The service runs in its own (forked, so build_model stays patched) process, as in use
+    monkeypatch.setattr(
+        solver_service, "build_model",
+        lambda resolved: assemble_model(resolved, contact_model["nodes"], contact_model["elements"]),
+    )
+    socket_path = os.path.join(tmp_path, "solver.sock")
+    server = multiprocessing.get_context("fork").Process(target=_serve, args=(socket_path,))
+    server.start()
+    try:
+        deadline = time.monotonic() + 10
+        while not os.path.exists(socket_path):
+            assert time.monotonic() < deadline and server.is_alive(), "The service did not start"
+            time.sleep(0.01)
+
+        displacements, stresses = request_solution({"normal_force": 2e6}, socket_path=socket_path)
+        resolved = resolve_parameters({})
+        resolved["contact"]["normal_force"] = 2e6
+        expected = _solve(resolved, contact_model)
+        np.testing.assert_allclose(displacements, expected[0], rtol=0, atol=1e-12 * np.abs(expected[0]).max())
+        np.testing.assert_allclose(stresses, expected[1], rtol=0, atol=1e-12 * np.abs(expected[1]).max())
+
+        status = _send(socket_path, {"command": "status"})
+        assert len(status["models"]) == 1 and status["shared_blocks"] == 0
+        assert _send(socket_path, {"command": "solve", "config": {"materials": {}}})["status"] == "error"
+    finally:
+        if server.is_alive():
+            _send(socket_path, {"command": "shutdown"})
+        server.join(10)
+    assert server.exitcode == 0
+    assert not os.path.exists(socket_path)
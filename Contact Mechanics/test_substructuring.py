@@ -0,0 +1,40 @@
+import os
+
+import numpy as np
+
+from solver import solve_fem
+from substructuring import _superelement_cache, solve_fem_condensed
+
+
+def test_condensed_solve_matches_solve_fem(contact_model, tmp_path):
+    solver_params = dict(contact_model["params"]["solver"], superelement_cache_directory=str(tmp_path))
+    _superelement_cache.clear()
+
+    expected = solve_fem(
+        contact_model["nodes"], contact_model["elements"], contact_model["material_properties"],
+        contact_model["fixed_dofs"], contact_model["contact_forces"], solver_params,
+    )
+    condensed = solve_fem_condensed(
+        contact_model["mesh"], contact_model["material_properties"], contact_model["fixed_dofs"],
+        contact_model["contact_forces"], solver_params, contact_model["params"]["geometry"],
+    )
+
+    scale = np.abs(expected[0]).max()
+    np.testing.assert_allclose(condensed[0], expected[0], rtol=0, atol=1e-8 * scale)
+    np.testing.assert_allclose(condensed[1], expected[1], rtol=0, atol=1e-8 * np.abs(expected[1]).max())
+    assert len(os.listdir(tmp_path)) == 1
+
+
+def test_superelement_is_reused_across_fgm_variants(contact_model, tmp_path):
+    solver_params = dict(contact_model["params"]["solver"], superelement_cache_directory=str(tmp_path))
+    _superelement_cache.clear()
+    material_properties = contact_model["material_properties"]
+    stiffer = material_properties.copy()
+    stiffer[contact_model["nodes"][:, 1] >= contact_model["params"]["geometry"]["H_substrate"], 0] *= 2
+
+    for properties in (material_properties, stiffer):
+        solve_fem_condensed(
+            contact_model["mesh"], properties, contact_model["fixed_dofs"], contact_model["contact_forces"],
+            solver_params, contact_model["params"]["geometry"],
+        )
+    assert len(os.listdir(tmp_path)) == 1
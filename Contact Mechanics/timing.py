@@ -0,0 +1,27 @@
+import time
+from contextlib import contextmanager
+
+
+@contextmanager
+def timed_stage(name, timings):
+    """
+    Measures the wall-clock time of a pipeline stage.
+
+    Parameters:
+        name (str): Name of the stage.
+        timings (dict): Dictionary in which the elapsed time (s) is stored under `name`.
+    """
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        timings[name] = time.perf_counter() - start
+
+
+def print_timings(timings):
+    """Prints the duration of every stage and its share of the total."""
+    total = sum(timings.values())
+    print("=== STAGE TIMINGS ===")
+    for name, elapsed in timings.items():
+        print(f"{name}: {elapsed:.3f} s ({100 * elapsed / total:.1f}%)")
+    print(f"Total: {total:.3f} s")
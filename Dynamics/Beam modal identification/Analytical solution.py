@@ -1,25 +1,129 @@
+from functools import lru_cache
+
 import numpy as np
 
-# Material properties
-E = 69*1e9  # Young's modulus in Pa
-rho = 2770  # Density in kg/m^3
+# Boundary conditions: clamped-free (cantilever), pinned-pinned, clamped-clamped, free-free
+BOUNDARY_CONDITIONS = ("CF", "PP", "CC", "FF")
+
+def _characteristic_function(x, sign):
+    # cos(x) cosh(x) + sign = 0 divided by cosh(x), which keeps it O(1) for large roots:
+    # f = cos(x) + sign sech(x), with sign = +1 for CF and -1 for CC and FF
+    sech = 2 * np.exp(-x) / (1 + np.exp(-2 * x))  # 1 / cosh(x) without overflow
+    return np.cos(x) + sign * sech, -np.sin(x) - sign * sech * np.tanh(x)
+
+@lru_cache(maxsize=None)
+def _roots_table(boundary, n_roots, tolerance=1e-14, max_iterations=50):
+    # Roots beta_n L of the characteristic equation, computed once per (boundary, n_roots)
+    n = np.arange(1, n_roots + 1)
+    if boundary == "PP":
+        return tuple(n * np.pi)  # sin(x) = 0
+    sign = 1 if boundary == "CF" else -1
+    center = (2 * n - 1) * np.pi / 2 if boundary == "CF" else (2 * n + 1) * np.pi / 2
+
+    # The root is the only one in [center - pi/2, center + pi/2], where cos(x) changes sign;
+    # asymptotic guess: cos(center + d) + sign sech(center) = 0 for a small d
+    low, high = center - np.pi / 2, center + np.pi / 2
+    x = center + sign * 2 * np.exp(-center) / np.sin(center)
+    f_low, _ = _characteristic_function(low, sign)
+    for _ in range(max_iterations):
+        f, derivative = _characteristic_function(x, sign)
+        # Shrink the brackets, then take the Newton step, or bisect where it leaves them
+        below = np.sign(f) == np.sign(f_low)
+        low, f_low = np.where(below, x, low), np.where(below, f, f_low)
+        high = np.where(below, high, x)
+        step = x - f / derivative
+        step = np.where((step > low) & (step < high), step, (low + high) / 2)
+        converged = np.abs(step - x) <= tolerance * x
+        x = step
+        if converged.all():
+            return tuple(x)
+    raise RuntimeError(f"The {boundary} roots did not converge in {max_iterations} iterations")
+
+def characteristic_roots(boundary="CF", n_roots=3):
+    """
+    First n_roots roots beta_n L of the characteristic equation of an Euler-Bernoulli beam:
+
+        CF: cos(x) cosh(x) + 1 = 0
+        PP: sin(x) = 0
+        CC, FF: cos(x) cosh(x) - 1 = 0 (the rigid body modes of FF, x = 0, are left out)
+
+    All roots are found together by a bracketed Newton iteration started from the
+    asymptotic guesses, and the table is cached, so repeated calls cost nothing.
+    """
+    if boundary not in BOUNDARY_CONDITIONS:
+        raise ValueError(f"Unknown boundary conditions '{boundary}', expected one of {BOUNDARY_CONDITIONS}")
+    return np.array(_roots_table(boundary, int(n_roots)))
+
+def natural_frequencies(E, I, rho, A, length, n_modes=3, boundary="CF"):
+    """
+    Natural frequencies f_n = (beta_n L)^2 / (2 pi L^2) sqrt(E I / (rho A)) in Hz.
+
+    The properties broadcast against each other, so many designs are evaluated in one call.
+
+    Returns:
+        numpy.ndarray: Frequencies, shape (*design_shape, n_modes).
+    """
+    roots = characteristic_roots(boundary, n_modes)
+    stiffness = np.sqrt(np.asarray(E) * I / (np.asarray(rho) * A)) / np.asarray(length)**2
+    return roots**2 * stiffness[..., None] / (2 * np.pi)
+
+def mode_shapes(xi, n_modes=3, boundary="CF"):
+    """
+    Mode shapes at the relative positions xi = x / L, with the classical normalization:
+    for CF, CC and FF the integral of phi^2 over the beam is L, and PP is sin(n pi xi), whose
+    integral is L / 2. Divide by sqrt(rho A L) (PP: sqrt(rho A L / 2)) for mass-normalized modes.
+
+    The hyperbolic terms cosh(u) - sigma sinh(u), with u = beta x, are evaluated in a form
+    scaled by exp(-beta L), which avoids the cancellation of the textbook expression for
+    the higher modes.
+
+    Returns:
+        numpy.ndarray: Mode shapes, shape (*xi.shape, n_modes).
+    """
+    roots = characteristic_roots(boundary, n_modes)
+    u = np.asarray(xi, dtype=float)[..., None] * roots
+    if boundary == "PP":
+        return np.sin(u)
+
+    # sigma = N / D and (D cosh(u) - N sinh(u)) / D, all scaled by 2 exp(-beta L)
+    L = roots
+    sign = 1 if boundary == "CF" else -1
+    sin_L, cos_L = np.sin(L), np.cos(L)
+    D = 1 - np.exp(-2 * L) + 2 * sign * sin_L * np.exp(-L)
+    N = 1 + np.exp(-2 * L) + 2 * sign * cos_L * np.exp(-L)
+    sigma = N / D
+    c_plus, c_minus = np.exp(u - L) + np.exp(-u - L), np.exp(u - L) - np.exp(-u - L)
+    hyperbolic = (np.exp(-u) - np.exp(u - 2 * L) + sign * (sin_L * c_plus - cos_L * c_minus)) / D
+    if boundary == "FF":
+        return hyperbolic + np.cos(u) - sigma * np.sin(u)
+    return hyperbolic - np.cos(u) + sigma * np.sin(u)
+
+if __name__ == "__main__":
+    import time
 
-# Geometric properties
-width = 0.010  # Section width in meters
-height = 0.020  # Section height in meters
-length = 0.400  # Length of the beam in meters
-area = width * height  # Cross-sectional area in m^2
-I = (width * height**3) / 12  # Moment of inertia in m^4
+    # Material properties
+    E = 69*1e9  # Young's modulus in Pa
+    rho = 2770  # Density in kg/m^3
 
-# Cantilever beam roots
-beta = [1.8751, 4.6941, 7.8548]
+    # Geometric properties
+    width = 0.010  # Section width in meters
+    height = 0.020  # Section height in meters
+    length = 0.400  # Length of the beam in meters
+    area = width * height  # Cross-sectional area in m^2
+    I = (width * height**3) / 12  # Moment of inertia in m^4
 
-# Calculating first three eigenfrequencies
-frequencies = []
-for n in beta:
-    f_n = (n**2) * ((E * I)/(rho * area * length**4))**0.5 / (2 * np.pi)
-    frequencies.append(f_n)
+    # First three eigenfrequencies of the cantilever
+    print("Cantilever roots:", characteristic_roots("CF", 3))
+    print(natural_frequencies(E, I, rho, area, length, 3, "CF"))
 
-frequencies[:3]  # First three eigenfrequencies
+    for boundary in BOUNDARY_CONDITIONS:
+        print(f"{boundary}: {natural_frequencies(E, I, rho, area, length, 5, boundary)} Hz")
 
-print(frequencies)
\ No newline at end of file
+    # Many designs in one call: heights x lengths
+    heights = np.linspace(0.005, 0.030, 100)[:, None]
+    lengths = np.linspace(0.2, 0.6, 100)[None, :]
+    start = time.perf_counter()
+    table = natural_frequencies(E, width * heights**3 / 12, rho, width * heights, lengths, 10, "CF")
+    shapes = mode_shapes(np.linspace(0, 1, 201), 10, "CF")
+    elapsed = time.perf_counter() - start
+    print(f"{table.size} frequencies and {shapes.shape} mode shape values in {1e3 * elapsed:.2f} ms")
@@ -1,54 +1,90 @@
 import numpy as np
-from parametrizing import *
-
-# Initialize the global stiffness and mass matrices
-K_global = np.zeros((discretization_params["dof"], discretization_params["dof"]))
-M_global = np.zeros((discretization_params["dof"], discretization_params["dof"]))
-
-# Calculate the length of each element
-element_length = geometric_params["length"] / discretization_params["n_elements"]
+from scipy import sparse
+from parametrizing import rectangular_section
 
 # Define the local stiffness matrix for a beam element
+# Scalar arguments give one (4, 4) matrix, per-element arrays give (n_elements, 4, 4)
 def local_stiffness(E, I, element_length):
-    return (material_params["E"] * geometric_params["I"] / element_length**3) * np.array([
-        [ 12,  6*element_length, -12,  6*element_length],
-        [ 6*element_length,  4*element_length**2, -6*element_length,  2*element_length**2],
-        [-12, -6*element_length,  12, -6*element_length],
-        [ 6*element_length,  2*element_length**2, -6*element_length,  4*element_length**2]
+    L = np.asarray(element_length, dtype=float)
+    one = np.ones_like(L)
+    k = (E * I / L**3) * np.array([
+        [ 12*one,  6*L,      -12*one,  6*L],
+        [ 6*L,     4*L**2,   -6*L,     2*L**2],
+        [-12*one, -6*L,       12*one, -6*L],
+        [ 6*L,     2*L**2,   -6*L,     4*L**2]
     ])
+    return np.moveaxis(k, (0, 1), (-2, -1))
 
 # Define the consistent mass matrix for a beam element
 def local_mass(rho, A, element_length):
-    return (rho * A * element_length / 420) * np.array([
-        [156,  22*element_length,  54, -13*element_length],
-        [22*element_length, 4*element_length**2, 13*element_length, -3*element_length**2],
-        [ 54,  13*element_length, 156, -22*element_length],
-        [-13*element_length, -3*element_length**2, -22*element_length, 4*element_length**2]
+    L = np.asarray(element_length, dtype=float)
+    one = np.ones_like(L)
+    m = (rho * A * L / 420) * np.array([
+        [ 156*one,  22*L,     54*one,  -13*L],
+        [ 22*L,     4*L**2,   13*L,    -3*L**2],
+        [ 54*one,   13*L,     156*one, -22*L],
+        [-13*L,    -3*L**2,  -22*L,     4*L**2]
     ])
+    return np.moveaxis(m, (0, 1), (-2, -1))
+
+def assemble_global_matrices(E, I, rho, A, element_lengths, n_dof=2):
+    """
+    Assembles the global stiffness and mass matrices of an Euler-Bernoulli beam in sparse
+    (CSR) format in a single pass.
+
+    Parameters:
+        E, I, rho, A (float or numpy.ndarray): Young's modulus, second moment of area,
+            density and cross-sectional area, per element or uniform.
+        element_lengths (numpy.ndarray): Length of every element.
+        n_dof (int): Degrees of freedom per node (displacement and rotation).
 
-# Assemble the global stiffness and mass matrices
-for i in range(discretization_params["n_elements"]):
-    # Local matrices
-    k_local = local_stiffness(material_params["E"], geometric_params["I"], element_length)
-    m_local = local_mass(material_params["rho"], geometric_params["area"], element_length)
+    Returns:
+        tuple: (K_global, M_global)
+    """
+    element_lengths = np.asarray(element_lengths, dtype=float)
+    n_elements = len(element_lengths)
+    k_local = np.broadcast_to(local_stiffness(E, I, element_lengths), (n_elements, 4, 4))
+    m_local = np.broadcast_to(local_mass(rho, A, element_lengths), (n_elements, 4, 4))
 
-    # Assemble the global stiffness and mass matrices
-for element in range(discretization_params["n_elements"]):
-    # Define the starting index for the degrees of freedom for the current element
-    start_dof = element * discretization_params["n_dof"]
+    # Element e couples the DOFs 2e .. 2e+3 (displacement and rotation of its two nodes), so
+    # all local contributions are scattered at once from index arrays instead of entry by entry
+    element_dofs = n_dof * np.arange(n_elements)[:, None] + np.arange(2 * n_dof)
+    rows = np.repeat(element_dofs, 2 * n_dof, axis=1).ravel()
+    cols = np.tile(element_dofs, (1, 2 * n_dof)).ravel()
+    shape = (n_dof * (n_elements + 1),) * 2
+    K_global = sparse.coo_matrix((k_local.ravel(), (rows, cols)), shape=shape).tocsr()
+    M_global = sparse.coo_matrix((m_local.ravel(), (rows, cols)), shape=shape).tocsr()
+    return K_global, M_global
 
-    # Define the global DOF indices for the current element
-    # Each element has 2 nodes, and each node has 2 DOFs (displacement and rotation)
-    global_dof_indices = np.arange(start_dof, start_dof + discretization_params["n_dof"] * 2)
+def apply_clamped_end(K_global, M_global, n_dof=2):
+    # Apply boundary conditions (clamped end at node 0): remove the DOFs of the first node
+    K_reduced = K_global[n_dof:, n_dof:].tocsc()
+    M_reduced = M_global[n_dof:, n_dof:].tocsc()
+    return K_reduced, M_reduced
 
-    # Add local contributions to global matrices
-    for i_local, global_i in enumerate(global_dof_indices):
-        for j_local, global_j in enumerate(global_dof_indices):
-            K_global[global_i, global_j] += k_local[i_local, j_local]
-            M_global[global_i, global_j] += m_local[i_local, j_local]
+def cantilever_model(E, rho, width, height, length, n_elements, n_dof=2):
+    """
+    Builds the matrices of a cantilever with a rectangular section, clamped at x = 0.
 
-# Apply boundary conditions (clamped end at node 0)
-K_reduced = K_global[2:, 2:]  # Remove the first two rows and columns
-M_reduced = M_global[2:, 2:]  # Remove the first two rows and columns
+    Parameters:
+        E, rho (float or numpy.ndarray): Young's modulus (Pa) and density (kg/m^3), uniform
+            or per element.
+        width, height (float or numpy.ndarray): Section dimensions (m), uniform or per element.
+        length (float): Length of the beam (m).
+        n_elements (int): Number of (equal) elements.
 
-# Now, K_reduced and M_reduced are ready to be used for the eigenvalue problem to find the eigenfrequencies and eigenmodes.
+    Returns:
+        dict: "node_coords", "K_global", "M_global" and, clamped, "K_reduced" and "M_reduced"
+            (ready for the eigenvalue problem).
+    """
+    node_coords = np.linspace(0, length, n_elements + 1)
+    area, I = rectangular_section(width, height)
+    K_global, M_global = assemble_global_matrices(E, I, rho, area, np.diff(node_coords), n_dof)
+    K_reduced, M_reduced = apply_clamped_end(K_global, M_global, n_dof)
+    return {
+        "node_coords": node_coords,
+        "K_global": K_global,
+        "M_global": M_global,
+        "K_reduced": K_reduced,
+        "M_reduced": M_reduced,
+    }
@@ -0,0 +1,100 @@
+import numpy as np
+
+FRF_TYPES = ("receptance", "mobility", "accelerance")
+
+def displacement_dofs(nodes, n_dof=2):
+    # Free (reduced) DOF index of the transverse displacement of the given nodes; node 0 is
+    # clamped, so node n has its displacement at DOF n_dof * (n - 1)
+    nodes = np.atleast_1d(nodes)
+    if np.any(nodes < 1):
+        raise ValueError("Node 0 is clamped and has no free DOF")
+    return n_dof * (nodes - 1)
+
+def modal_damping_ratios(natural_frequencies, damping_ratio=None, rayleigh=None):
+    """
+    Damping ratio of every mode: constant (or per mode) modal damping, or Rayleigh damping
+    C = alpha M + beta K, for which zeta_r = alpha / (2 omega_r) + beta omega_r / 2.
+    """
+    omega = 2 * np.pi * np.asarray(natural_frequencies, dtype=float)
+    if rayleigh is not None:
+        if damping_ratio is not None:
+            raise ValueError("Give either damping_ratio or rayleigh, not both")
+        alpha, beta = rayleigh
+        return alpha / (2 * omega) + beta * omega / 2
+    return np.broadcast_to(np.asarray(0.0 if damping_ratio is None else damping_ratio, dtype=float), omega.shape)
+
+def frequency_response(frequencies, natural_frequencies, mode_shapes, output_dofs, input_dofs, damping_ratio=None,
+                       rayleigh=None, kind="receptance"):
+    """
+    Frequency response functions by modal superposition:
+
+        H_jk(omega) = sum_r phi_jr phi_kr / (omega_r^2 - omega^2 + 2 i zeta_r omega_r omega)
+
+    for mass-normalized modes. The modal constants phi_jr phi_kr of all output/input pairs
+    are formed once, so all frequency lines are evaluated in a single (n_frequencies,
+    n_modes) by (n_modes, n_outputs * n_inputs) matrix product.
+
+    Parameters:
+        frequencies (numpy.ndarray): Frequency lines in Hz.
+        natural_frequencies (numpy.ndarray): Natural frequencies in Hz, shape (n_modes,).
+        mode_shapes (numpy.ndarray): Mass-normalized mode shapes, shape (n_dofs, n_modes).
+        output_dofs, input_dofs (numpy.ndarray): Response and excitation DOFs (rows of mode_shapes).
+        damping_ratio (float or numpy.ndarray): Modal damping ratio, uniform or per mode.
+        rayleigh (tuple): Rayleigh damping coefficients (alpha, beta), instead of damping_ratio.
+        kind (str): "receptance" (displacement/force), "mobility" (velocity/force) or
+            "accelerance" (acceleration/force).
+
+    Returns:
+        numpy.ndarray: Complex FRF matrix, shape (n_frequencies, n_outputs, n_inputs).
+    """
+    if kind not in FRF_TYPES:
+        raise ValueError(f"Unknown FRF type '{kind}', expected one of {FRF_TYPES}")
+    omega = 2 * np.pi * np.asarray(frequencies, dtype=float)
+    omega_r = 2 * np.pi * np.asarray(natural_frequencies, dtype=float)
+    zeta = modal_damping_ratios(natural_frequencies, damping_ratio, rayleigh)
+
+    # Modal receptances, shape (n_frequencies, n_modes)
+    modal = 1 / (omega_r**2 - omega[:, None]**2 + 2j * (zeta * omega_r) * omega[:, None])
+    phi_out = mode_shapes[np.atleast_1d(output_dofs)]
+    phi_in = mode_shapes[np.atleast_1d(input_dofs)]
+    modal_constants = np.einsum("jr,kr->rjk", phi_out, phi_in).reshape(len(omega_r), -1)
+    H = (modal @ modal_constants).reshape(len(omega), len(phi_out), len(phi_in))
+
+    if kind == "mobility":
+        H *= 1j * omega[:, None, None]
+    elif kind == "accelerance":
+        H *= -omega[:, None, None]**2
+    return H
+
+if __name__ == "__main__":
+    import time
+    import matplotlib.pyplot as plt
+
+    from parametrizing import material_params, geometric_params
+    from solver import modal_analysis
+
+    n_elements = 200
+    result = modal_analysis(
+        material_params["E"], material_params["rho"], geometric_params["width"], geometric_params["height"],
+        geometric_params["length"], n_elements, n_modes=20,
+    )
+
+    # Accelerometers at every 20th node, impact hammer at the tip and at mid-span
+    sensors = displacement_dofs(np.arange(20, n_elements + 1, 20))
+    impacts = displacement_dofs([n_elements, n_elements // 2])
+    frequencies = np.linspace(1, 5000, 50000)
+
+    start = time.perf_counter()
+    H = frequency_response(frequencies, result["frequencies"], result["mode_shapes"], sensors, impacts,
+                           damping_ratio=0.01, kind="accelerance")
+    print(f"FRF matrix {H.shape} in {time.perf_counter() - start:.3f} s")
+
+    plt.figure()
+    plt.semilogy(frequencies, np.abs(H[:, -1, 0]), label="Tip / tip")
+    plt.semilogy(frequencies, np.abs(H[:, len(sensors) // 2 - 1, 0]), label="Mid-span / tip")
+    plt.title("Accelerance of the cantilever (1% modal damping)")
+    plt.xlabel("Frequency (Hz)")
+    plt.ylabel("|A| (m/s^2/N)")
+    plt.legend()
+    plt.grid(True)
+    plt.show()
@@ -0,0 +1,255 @@
+import numpy as np
+from scipy import signal
+
+def record_chunks(source, chunk_size=65536, channels=None):
+    """
+    Reads a multi-channel record (samples x channels) in blocks of chunk_size samples, so
+    records longer than the memory are processed piece by piece.
+
+    Parameters:
+        source (str or numpy.ndarray): A .npy file (memory-mapped), a .csv file (one column
+            per channel, read with pandas in chunks) or an array.
+        chunk_size (int): Number of samples per block.
+        channels (list): Columns to keep (defaults to all).
+
+    Yields:
+        numpy.ndarray: Blocks of shape (n_samples, n_channels).
+    """
+    columns = slice(None) if channels is None else list(channels)
+    if isinstance(source, str) and source.endswith(".csv"):
+        import pandas as pd  # Only needed for CSV records
+
+        for frame in pd.read_csv(source, chunksize=chunk_size):
+            yield frame.to_numpy(dtype=float)[:, columns]
+        return
+    record = np.load(source, mmap_mode="r") if isinstance(source, str) else source
+    for start in range(0, len(record), chunk_size):
+        yield np.asarray(record[start:start + chunk_size], dtype=float)[:, columns]
+
+class CrossSpectrumAccumulator:
+    """
+    Welch estimate of the one-sided cross-spectral density matrix, accumulated block by block.
+
+    Every call to update() processes the complete segments of the new samples (all of them at
+    once, as a strided view) and keeps only the samples the next segment still needs, so the
+    memory is one segment plus the (n_frequencies, n_channels, n_channels) sum whatever the
+    record length. The result equals scipy.signal.csd on the whole record with the same
+    segments (mean detrending, same window and overlap).
+    """
+
+    def __init__(self, fs, nperseg, noverlap=None, window="hann"):
+        self.fs = fs
+        self.nperseg = nperseg
+        self.noverlap = nperseg // 2 if noverlap is None else noverlap
+        if not 0 <= self.noverlap < nperseg:
+            raise ValueError("noverlap must be in [0, nperseg)")
+        self.window = signal.get_window(window, nperseg)
+        self.frequencies = np.fft.rfftfreq(nperseg, 1 / fs)
+        self.n_segments = 0
+        self._sum = None
+        self._tail = None
+
+    def update(self, chunk):
+        chunk = np.asarray(chunk, dtype=float)
+        if self._tail is None:
+            self._tail = np.empty((0, chunk.shape[1]))
+            self._sum = np.zeros((len(self.frequencies), chunk.shape[1], chunk.shape[1]), dtype=complex)
+        samples = np.concatenate([self._tail, chunk])
+        step = self.nperseg - self.noverlap
+        n_segments = 0 if len(samples) < self.nperseg else (len(samples) - self.nperseg) // step + 1
+        if n_segments:
+            # Segments (n_segments, n_channels, nperseg), detrended, windowed and transformed
+            segments = np.lib.stride_tricks.sliding_window_view(samples, self.nperseg, axis=0)[::step][:n_segments]
+            segments = (segments - segments.mean(axis=-1, keepdims=True)) * self.window
+            spectra = np.fft.rfft(segments, axis=-1)
+            self._sum += np.einsum("sif,sjf->fij", spectra.conj(), spectra)
+            self.n_segments += n_segments
+        self._tail = samples[n_segments * step:]
+
+    def csd(self):
+        # Averaged one-sided density G_ij(f) = E[conj(X_i) X_j], the convention of scipy.signal.csd
+        if not self.n_segments:
+            raise ValueError(f"Not enough samples for one segment of {self.nperseg}")
+        scale = 2 / (self.fs * np.sum(self.window**2) * self.n_segments)
+        G = self._sum * scale
+        G[0] /= 2
+        if self.nperseg % 2 == 0:
+            G[-1] /= 2
+        return G
+
+def frequency_domain_decomposition(G):
+    """
+    Singular values and first singular vectors of the spectral matrix at every line. G is
+    Hermitian positive semi-definite, so its SVD is the batched eigendecomposition.
+
+    Returns:
+        tuple: Singular values (n_frequencies, n_channels), in decreasing order, and the
+            first singular vectors (n_frequencies, n_channels).
+    """
+    eigenvalues, eigenvectors = np.linalg.eigh(G)
+    return eigenvalues[:, ::-1].clip(min=0), eigenvectors[:, :, -1]
+
+def mac(phi_a, phi_b):
+    # Modal assurance criterion between the columns of phi_a and phi_b (complex or real)
+    phi_a = np.asarray(phi_a).reshape(len(phi_a), -1)
+    phi_b = np.asarray(phi_b).reshape(len(phi_b), -1)
+    cross = np.abs(phi_a.conj().T @ phi_b)**2
+    return cross / np.outer(np.sum(np.abs(phi_a)**2, axis=0), np.sum(np.abs(phi_b)**2, axis=0))
+
+def pick_peaks(frequencies, singular_values, n_peaks=None, bands=None):
+    """
+    Line indices of the modal peaks of the first singular value: the largest maximum in each
+    frequency band (e.g. around the FE frequencies), or else the n_peaks most prominent maxima.
+    """
+    s1 = singular_values[:, 0]
+    if bands is not None:
+        peaks = []
+        for low, high in bands:
+            lines = np.flatnonzero((frequencies >= low) & (frequencies <= high))
+            peaks.append(lines[np.argmax(s1[lines])])
+        return np.array(peaks)
+    candidates, properties = signal.find_peaks(np.log(s1 + np.finfo(float).tiny), prominence=0)
+    strongest = np.argsort(properties["prominences"])[::-1][:n_peaks]
+    return np.sort(candidates[strongest])
+
+def _real_mode_shape(vector):
+    # Rotates a complex singular vector to its best real approximation, largest component = 1
+    vector = vector * np.exp(-1j * np.angle(vector[np.argmax(np.abs(vector))]))
+    return vector.real / vector.real[np.argmax(np.abs(vector.real))]
+
+def enhanced_fdd(frequencies, singular_values, singular_vectors, peak, mac_threshold=0.8,
+                 correlation_range=(0.85, 0.1)):
+    """
+    Frequency and damping of one mode by enhanced FDD. The SDOF bell around the peak (lines
+    whose singular vector has a MAC above mac_threshold with the peak's) is transformed back
+    to a free-decay correlation function: its zero crossings give the damped frequency and the
+    logarithmic decrement of its extrema, between correlation_range of the initial value,
+    gives the damping ratio.
+
+    Returns:
+        tuple: Natural frequency in Hz and damping ratio.
+    """
+    similarity = mac(singular_vectors.T, singular_vectors[peak][:, None])[:, 0]
+    inside = similarity >= mac_threshold
+    low, high = peak, peak
+    while low > 0 and inside[low - 1]:
+        low -= 1
+    while high < len(inside) - 1 and inside[high + 1]:
+        high += 1
+    bell = np.zeros(len(frequencies))
+    bell[low:high + 1] = singular_values[low:high + 1, 0]
+
+    correlation = np.fft.irfft(bell)
+    correlation = correlation[:len(correlation) // 2] / correlation[0]
+    dt = 1 / (2 * frequencies[-1])  # Sampling interval of the one-sided spectrum's correlation
+
+    # Extrema between the zero crossings, kept while they decay through correlation_range
+    crossings = np.flatnonzero(np.diff(np.sign(correlation)) != 0)
+    bounds = np.concatenate([[0], crossings + 1])
+    extrema = np.array([np.max(np.abs(correlation[a:b])) for a, b in zip(bounds[:-1], bounds[1:])])
+    upper, lower = correlation_range
+    first = np.argmax(extrema <= upper)
+    last = first + np.argmax(extrema[first:] < lower)
+    if last - first < 2:
+        raise ValueError(f"The correlation function at line {peak} decays too fast for a damping estimate")
+    used = np.arange(first, last)
+
+    # Half a period between crossings (linearly interpolated) and between extrema
+    times = (crossings + correlation[crossings] / (correlation[crossings] - correlation[crossings + 1])) * dt
+    damped_frequency = 1 / (2 * np.mean(np.diff(times[used[0]:used[-1] + 1])))
+    decrement = -2 * np.polyfit(used, np.log(extrema[used]), 1)[0]
+    damping = decrement / np.sqrt(4 * np.pi**2 + decrement**2)
+    return damped_frequency / np.sqrt(1 - damping**2), damping
+
+def operational_modal_analysis(chunks, fs, nperseg, n_modes=None, bands=None, noverlap=None, window="hann",
+                               mac_threshold=0.8):
+    """
+    Output-only modal identification of a long record: Welch CSDs accumulated chunk by
+    chunk, frequency-domain decomposition, peak picking and enhanced FDD.
+
+    Parameters:
+        chunks (iterable): Blocks of the record, shape (n_samples, n_channels) (e.g. from
+            record_chunks).
+        fs (float): Sampling frequency in Hz.
+        nperseg (int): Welch segment length (frequency resolution fs / nperseg).
+        n_modes (int): Number of peaks to pick, when no bands are given.
+        bands (list): (low, high) frequency bands in Hz with one mode each.
+        mac_threshold (float): MAC limit of the SDOF bell of every mode.
+
+    Returns:
+        dict: Results:
+            - "frequencies": Natural frequencies in Hz.
+            - "damping": Damping ratios.
+            - "mode_shapes": Real mode shapes, shape (n_channels, n_modes).
+            - "peak_frequencies": Frequencies of the picked lines.
+            - "spectrum_frequencies", "singular_values": The FDD spectrum.
+            - "n_segments": Number of averaged segments.
+    """
+    if (n_modes is None) == (bands is None):
+        raise ValueError("Give either n_modes or bands")
+    accumulator = CrossSpectrumAccumulator(fs, nperseg, noverlap, window)
+    for chunk in chunks:
+        accumulator.update(chunk)
+    frequencies = accumulator.frequencies
+    singular_values, singular_vectors = frequency_domain_decomposition(accumulator.csd())
+
+    peaks = pick_peaks(frequencies, singular_values, n_modes, bands)
+    identified = [enhanced_fdd(frequencies, singular_values, singular_vectors, peak, mac_threshold) for peak in peaks]
+    return {
+        "frequencies": np.array([frequency for frequency, _ in identified]),
+        "damping": np.array([damping for _, damping in identified]),
+        "mode_shapes": np.column_stack([_real_mode_shape(singular_vectors[peak]) for peak in peaks]),
+        "peak_frequencies": frequencies[peaks],
+        "spectrum_frequencies": frequencies,
+        "singular_values": singular_values,
+        "n_segments": accumulator.n_segments,
+    }
+
+if __name__ == "__main__":
+    import os
+    import time
+    import matplotlib.pyplot as plt
+
+    from frf import displacement_dofs, frequency_response
+    from parametrizing import material_params, geometric_params
+    from solver import modal_analysis
+
+    # Synthetic measurement: 8 accelerometers on the cantilever, white noise force at the tip,
+    # 2% modal damping, 2 minutes at 8192 Hz (made by FFT filtering, written to a .npy file)
+    n_elements, fs, duration = 50, 8192, 120
+    model = modal_analysis(
+        material_params["E"], material_params["rho"], geometric_params["width"], geometric_params["height"],
+        geometric_params["length"], n_elements, n_modes=10,
+    )
+    sensors = displacement_dofs(np.linspace(n_elements // 8, n_elements, 8).astype(int))
+    rng = np.random.default_rng(0)
+    n_samples = fs * duration
+    force = np.fft.rfft(rng.standard_normal(n_samples))
+    H = frequency_response(np.fft.rfftfreq(n_samples, 1 / fs), model["frequencies"], model["mode_shapes"],
+                           sensors, displacement_dofs([n_elements]), damping_ratio=0.02, kind="accelerance")
+    record = np.fft.irfft(H[:, :, 0] * force[:, None], n_samples, axis=0)
+    record += 0.05 * record.std(axis=0) * rng.standard_normal(record.shape)
+    os.makedirs("./output", exist_ok=True)
+    np.save("./output/beam_acceleration.npy", record)
+    del record, H
+
+    start = time.perf_counter()
+    result = operational_modal_analysis(record_chunks("./output/beam_acceleration.npy"), fs, nperseg=16384, n_modes=4)
+    print(f"OMA of {n_samples} samples x {len(sensors)} channels ({result['n_segments']} segments) "
+          f"in {time.perf_counter() - start:.2f} s")
+
+    fe_modes = model["mode_shapes"][sensors, :4]
+    correlation = mac(result["mode_shapes"], fe_modes)
+    for mode in range(4):
+        print(f"Mode {mode + 1}: {result['frequencies'][mode]:8.2f} Hz (FE {model['frequencies'][mode]:8.2f} Hz), "
+              f"damping {100 * result['damping'][mode]:.2f} %, MAC with FE mode {correlation[mode, mode]:.4f}")
+
+    plt.figure()
+    plt.semilogy(result["spectrum_frequencies"], result["singular_values"][:, :3])
+    plt.plot(result["peak_frequencies"], result["singular_values"][np.searchsorted(
+        result["spectrum_frequencies"], result["peak_frequencies"]), 0], "kv")
+    plt.title("Frequency domain decomposition")
+    plt.xlabel("Frequency (Hz)")
+    plt.ylabel("Singular values of the spectral matrix")
+    plt.grid(True)
+    plt.show()
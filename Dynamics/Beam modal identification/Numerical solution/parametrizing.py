@@ -1,5 +1,4 @@
 import numpy as np
-import matplotlib.pyplot as plt
 
 # Material properties
 material_params = {
@@ -14,8 +13,11 @@ geometric_params = {
     "length": 0.400,  # Length of the beam in meters
 }
 
-geometric_params["area"] = geometric_params["width"] * geometric_params["height"]  # Cross-sectional area in m^2
-geometric_params["I"] = (geometric_params["width"] * geometric_params["height"]**3) / 12  # Moment of inertia in m^4
+def rectangular_section(width, height):
+    # Cross-sectional area (m^2) and moment of inertia (m^4) of a rectangular section
+    return width * height, (width * height**3) / 12
+
+geometric_params["area"], geometric_params["I"] = rectangular_section(geometric_params["width"], geometric_params["height"])
 
 
 # Discretization (Define the number of elements)
@@ -32,10 +34,19 @@ node_coords = np.linspace(0, geometric_params["length"], discretization_params["
 # Boundary conditions
 fixed_node = 0  # Node at x=0 is clamped
 
-# For visualization, let's plot the layout of the beam
-plt.plot(node_coords, np.zeros_like(node_coords), 'bo-')  # Plot the nodes as blue dots and the beam as a line
-plt.title('1D Beam Layout')
-plt.xlabel('Length (m)')
-plt.ylabel('Position of Nodes')
-plt.grid(True)
-plt.show()
\ No newline at end of file
+def plot_beam_layout(node_coords):
+    # For visualization, plot the layout of the beam
+    import matplotlib.pyplot as plt  # Plotting is optional: importing the parameters does not load matplotlib
+
+    plt.figure()
+    plt.plot(node_coords, np.zeros_like(node_coords), 'bo-')  # Plot the nodes as blue dots and the beam as a line
+    plt.title('1D Beam Layout')
+    plt.xlabel('Length (m)')
+    plt.ylabel('Position of Nodes')
+    plt.grid(True)
+
+if __name__ == "__main__":
+    import matplotlib.pyplot as plt
+
+    plot_beam_layout(node_coords)
+    plt.show()
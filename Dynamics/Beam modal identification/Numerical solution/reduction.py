@@ -0,0 +1,120 @@
+import numpy as np
+from scipy import sparse
+from scipy.sparse.linalg import splu
+
+from solver import solve_modes
+
+def craig_bampton(K, M, boundary_dofs, n_modes=0):
+    """
+    Craig-Bampton reduction: the retained boundary DOFs plus n_modes fixed-interface modes.
+
+    The transformation u = T q, in the original DOF order, is
+
+        u_b = q_b,    u_i = Psi q_b + Phi q_m,    Psi = -K_ii^-1 K_ib
+
+    with the static constraint modes Psi (one sparse factorization of K_ii, solved for all
+    boundary DOFs at once) and the lowest mass-normalized modes Phi of the interior with the
+    boundary fixed. With n_modes = 0 it is the Guyan (static) condensation.
+
+    Parameters:
+        K, M (scipy.sparse matrix): Stiffness and mass matrices (e.g. K_reduced, M_reduced).
+        boundary_dofs (numpy.ndarray): Retained DOFs (interfaces, sensors, load points).
+        n_modes (int): Number of fixed-interface modes.
+
+    Returns:
+        dict: Reduced model:
+            - "K", "M": Reduced matrices, shape (n_boundary + n_modes,) * 2.
+            - "T": Transformation matrix, shape (n_dofs, n_boundary + n_modes).
+            - "boundary_dofs": The retained DOFs, in the order of the first reduced DOFs.
+            - "fixed_interface_frequencies": Frequencies in Hz of the retained interior modes.
+    """
+    K, M = sparse.csr_matrix(K), sparse.csr_matrix(M)
+    n = K.shape[0]
+    boundary = np.atleast_1d(boundary_dofs)
+    if len(np.unique(boundary)) != len(boundary) or boundary.min() < 0 or boundary.max() >= n:
+        raise ValueError("boundary_dofs must be distinct DOFs of the model")
+    interior = np.setdiff1d(np.arange(n), boundary)
+    if n_modes > len(interior):
+        raise ValueError(f"Only {len(interior)} interior DOFs for {n_modes} fixed-interface modes")
+
+    K_ii = K[interior][:, interior]
+    K_ib = K[interior][:, boundary]
+    constraint_modes = -splu(K_ii.tocsc()).solve(K_ib.toarray())
+
+    T = np.zeros((n, len(boundary) + n_modes))
+    T[boundary, np.arange(len(boundary))] = 1
+    T[interior, :len(boundary)] = constraint_modes
+    frequencies = np.empty(0)
+    if n_modes:
+        frequencies, T[interior, len(boundary):] = solve_modes(K_ii, M[interior][:, interior], n_modes)
+
+    # Projections; symmetrized against round-off
+    K_cb = T.T @ (K @ T)
+    M_cb = T.T @ (M @ T)
+    return {
+        "K": (K_cb + K_cb.T) / 2,
+        "M": (M_cb + M_cb.T) / 2,
+        "T": T,
+        "boundary_dofs": boundary,
+        "fixed_interface_frequencies": frequencies,
+    }
+
+def guyan_reduction(K, M, boundary_dofs):
+    # Static condensation onto the boundary DOFs (Craig-Bampton without interior modes)
+    return craig_bampton(K, M, boundary_dofs, n_modes=0)
+
+def reduced_modes(reduced, n_modes):
+    """
+    Lowest n_modes frequencies (Hz) of a reduced model, with the mode shapes expanded back
+    to all DOFs of the full model (phi = T q, mass-normalized with respect to the full M).
+    """
+    frequencies, modes = solve_modes(sparse.csr_matrix(reduced["K"]), sparse.csr_matrix(reduced["M"]), n_modes)
+    return frequencies, reduced["T"] @ modes
+
+def reduction_error(K, M, reduced, n_modes):
+    """
+    Compares the lowest n_modes frequencies of a reduced model with those of the full model.
+
+    Returns:
+        dict: "full" and "reduced" frequencies in Hz and the relative "error" of every mode
+            (reduction only stiffens the model, so the errors are positive down to the
+            round-off of the full eigensolution).
+    """
+    full, _ = solve_modes(K, M, n_modes)
+    approximate, _ = reduced_modes(reduced, n_modes)
+    return {"full": full, "reduced": approximate, "error": (approximate - full) / full}
+
+if __name__ == "__main__":
+    import time
+
+    from assembling import cantilever_model
+    from frf import displacement_dofs
+    from parametrizing import material_params, geometric_params
+
+    n_elements = 1000
+    model = cantilever_model(
+        material_params["E"], material_params["rho"], geometric_params["width"], geometric_params["height"],
+        geometric_params["length"], n_elements,
+    )
+    K, M = model["K_reduced"], model["M_reduced"]
+
+    # Interfaces at mid-span and at the tip (e.g. joints to other beams of an assembly)
+    boundary = np.concatenate([displacement_dofs([n_elements // 2, n_elements]),
+                               displacement_dofs([n_elements // 2, n_elements]) + 1])
+    n_compare = 6
+    for name, n_modes in (("Guyan", 0), ("Craig-Bampton", 4), ("Craig-Bampton", 10)):
+        start = time.perf_counter()
+        reduced = craig_bampton(K, M, boundary, n_modes)
+        elapsed = time.perf_counter() - start
+        comparison = reduction_error(K, M, reduced, min(n_compare, len(reduced["K"])))
+        print(f"{name}, {len(reduced['K'])} DOFs instead of {K.shape[0]} (reduced in {elapsed:.3f} s)")
+        for mode, (full, approximate, error) in enumerate(zip(*comparison.values()), start=1):
+            print(f"  mode {mode}: {full:10.2f} Hz full, {approximate:10.2f} Hz reduced, error {error:.2e}")
+
+    # A design iteration on the reduced model
+    start = time.perf_counter()
+    reduced_modes(reduced, n_compare)
+    print(f"Reduced eigensolution: {1e3 * (time.perf_counter() - start):.2f} ms")
+    start = time.perf_counter()
+    solve_modes(K, M, n_compare)
+    print(f"Full eigensolution: {1e3 * (time.perf_counter() - start):.2f} ms")
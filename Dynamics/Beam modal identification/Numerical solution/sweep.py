@@ -0,0 +1,74 @@
+import itertools
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from solver import modal_analysis
+
+DESIGN_PARAMETERS = ("E", "rho", "width", "height", "length")
+
+def design_grid(**values):
+    """
+    Full factorial design: every combination of the given parameter values.
+
+    Example:
+        design_grid(E=[69e9], rho=[2770], width=[0.01], height=[0.01, 0.02], length=[0.3, 0.4])
+    """
+    names = list(values)
+    return [dict(zip(names, combination)) for combination in itertools.product(*values.values())]
+
+def _design_frequencies(design, n_elements, n_modes):
+    # Runs in a worker process: one modal analysis per design
+    return modal_analysis(n_elements=n_elements, n_modes=n_modes, **design)["frequencies"]
+
+def design_sweep(designs, n_elements=20, n_modes=3, max_workers=None, chunksize=None):
+    """
+    Evaluates the natural frequencies of many cantilever designs in a process pool.
+
+    Parameters:
+        designs (list): Dicts with the design parameters (E, rho, width, height, length).
+        n_elements (int): Number of elements of every model.
+        n_modes (int): Number of frequencies per design.
+        max_workers (int): Number of worker processes (defaults to the number of CPUs).
+        chunksize (int): Designs sent to a worker at a time (defaults to about four chunks
+            per worker, so the per-task overhead stays small for cheap models).
+
+    Returns:
+        pandas.DataFrame: One row per design with its parameters and the frequencies
+            f1 .. f{n_modes} in Hz.
+    """
+    for design in designs:
+        missing = set(DESIGN_PARAMETERS) - set(design)
+        if missing:
+            raise ValueError(f"Design {design} is missing {sorted(missing)}")
+
+    workers = max_workers or os.cpu_count() or 1
+    if chunksize is None:
+        chunksize = max(1, len(designs) // (4 * workers))
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        frequencies = list(executor.map(
+            _design_frequencies, designs, itertools.repeat(n_elements), itertools.repeat(n_modes),
+            chunksize=chunksize,
+        ))
+
+    table = pd.DataFrame(designs)
+    table[[f"f{mode + 1}" for mode in range(n_modes)]] = np.array(frequencies).reshape(len(designs), n_modes)
+    return table
+
+if __name__ == "__main__":
+    import time
+
+    designs = design_grid(
+        E=[62e9, 69e9, 76e9],
+        rho=[2700, 2770],
+        width=[0.010, 0.015, 0.020],
+        height=np.linspace(0.010, 0.030, 15),
+        length=np.linspace(0.300, 0.500, 12),
+    )
+    start = time.perf_counter()
+    table = design_sweep(designs)
+    print(f"{len(table)} designs in {time.perf_counter() - start:.2f} s")
+    print(table.sort_values("f1").head(10).to_string(index=False))
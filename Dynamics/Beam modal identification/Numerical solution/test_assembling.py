@@ -0,0 +1,35 @@
+import numpy as np
+
+from assembling import assemble_global_matrices, cantilever_model, local_mass, local_stiffness
+
+def loop_assembly(E, I, rho, A, element_lengths):
+    # Reference: one scalar element matrix at a time, added entry by entry
+    n_dof = 2 * (len(element_lengths) + 1)
+    K, M = np.zeros((n_dof, n_dof)), np.zeros((n_dof, n_dof))
+    for e, L in enumerate(element_lengths):
+        dofs = slice(2 * e, 2 * e + 4)
+        K[dofs, dofs] += local_stiffness(E[e], I[e], L)
+        M[dofs, dofs] += local_mass(rho[e], A[e], L)
+    return K, M
+
+def test_per_element_properties_match_the_element_loop():
+    rng = np.random.default_rng(0)
+    n_elements = 12
+    E, I, rho, A = (value * (1 + 0.3 * rng.random(n_elements)) for value in (69e9, 6.7e-9, 2770, 2e-4))
+    element_lengths = 0.4 / n_elements * (1 + 0.5 * rng.random(n_elements))
+
+    K, M = assemble_global_matrices(E, I, rho, A, element_lengths)
+    K_loop, M_loop = loop_assembly(E, I, rho, A, element_lengths)
+    np.testing.assert_allclose(K.toarray(), K_loop, rtol=1e-14, atol=1e-14 * np.abs(K_loop).max())
+    np.testing.assert_allclose(M.toarray(), M_loop, rtol=1e-14, atol=1e-14 * np.abs(M_loop).max())
+
+def test_uniform_beam_moves_rigidly_without_strain_energy():
+    model = cantilever_model(69e9, 2770, 0.01, 0.02, 0.4, 10)
+    K, M = model["K_global"], model["M_global"]
+    x = model["node_coords"]
+    translation = np.column_stack([np.ones_like(x), np.zeros_like(x)]).ravel()
+    rotation = np.column_stack([x, np.ones_like(x)]).ravel()
+    for motion in (translation, rotation):
+        np.testing.assert_allclose(K @ motion, 0, atol=1e-9 * abs(K).max())
+    assert np.isclose(translation @ M @ translation, 2770 * 0.01 * 0.02 * 0.4)  # Total mass
+    assert model["K_reduced"].shape == model["M_reduced"].shape == (20, 20)
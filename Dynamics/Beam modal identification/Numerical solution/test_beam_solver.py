@@ -0,0 +1,60 @@
+import numpy as np
+import pytest
+from scipy.linalg import eigh
+
+from assembling import cantilever_model
+from parametrizing import material_params, geometric_params
+from solver import DENSE_SOLVER_DOFS, condition_estimate, modal_analysis, solve_modes
+
+# beta_n L of the first clamped-free bending modes
+CANTILEVER_ROOTS = np.array([1.875104069, 4.694091133, 7.854757438])
+
+def beam_model(n_elements):
+    return cantilever_model(
+        material_params["E"], material_params["rho"], geometric_params["width"], geometric_params["height"],
+        geometric_params["length"], n_elements,
+    )
+
+@pytest.mark.parametrize("n_elements", [50, 260])  # Dense and shift-invert Lanczos paths
+def test_modes_match_the_dense_generalized_problem(n_elements):
+    model = beam_model(n_elements)
+    K, M = model["K_reduced"], model["M_reduced"]
+    assert (K.shape[0] > DENSE_SOLVER_DOFS) == (n_elements == 260)
+
+    frequencies, mode_shapes = solve_modes(K, M, 4)
+    # Dense reference on the inverse problem M x = (1 / omega^2) K x, which stays accurate
+    # for fine meshes (eigh(K, M) factorizes the ill-conditioned M)
+    n = K.shape[0]
+    inverse_eigenvalues, expected_shapes = eigh(M.toarray(), K.toarray(), subset_by_index=[n - 4, n - 1])
+    eigenvalues = 1 / inverse_eigenvalues[::-1]
+    expected_shapes = expected_shapes[:, ::-1] * np.sqrt(eigenvalues)
+    np.testing.assert_allclose(frequencies, np.sqrt(eigenvalues) / (2 * np.pi), rtol=1e-6)  # Round-off of K
+    np.testing.assert_allclose(mode_shapes.T @ M @ mode_shapes, np.eye(4), atol=1e-8)
+    # Same shapes up to the sign of every mode
+    signs = np.sign(np.sum(mode_shapes * expected_shapes, axis=0))
+    np.testing.assert_allclose(mode_shapes * signs, expected_shapes, atol=1e-6 * np.abs(expected_shapes).max())
+
+def test_frequencies_converge_to_euler_bernoulli():
+    frequencies = modal_analysis(
+        material_params["E"], material_params["rho"], geometric_params["width"], geometric_params["height"],
+        geometric_params["length"], 40,
+    )["frequencies"]
+    EI_over_rhoA = material_params["E"] * geometric_params["I"] / (material_params["rho"] * geometric_params["area"])
+    expected = CANTILEVER_ROOTS**2 / geometric_params["length"]**2 * np.sqrt(EI_over_rhoA) / (2 * np.pi)
+    np.testing.assert_allclose(frequencies, expected, rtol=1e-5)
+
+def test_lost_modes_are_reported():
+    # Shifting K between the first two modes makes the lowest eigenvalue negative, as
+    # round-off does for very fine meshes
+    model = beam_model(260)
+    K, M = model["K_reduced"], model["M_reduced"]
+    first_two = solve_modes(K, M, 2)[0]
+    shift = (2 * np.pi * first_two.mean())**2
+    with pytest.warns(RuntimeWarning, match=r"Modes \[1\]"):
+        frequencies, _ = solve_modes((K - shift * M).tocsc(), M, 2)
+    assert np.isnan(frequencies[0]) and np.isfinite(frequencies[1])
+
+def test_condition_estimate_bounds_the_exact_one_norm_condition():
+    K = beam_model(30)["K_reduced"]
+    exact = np.linalg.cond(K.toarray(), 1)
+    assert exact / 3 <= condition_estimate(K) <= exact * (1 + 1e-9)
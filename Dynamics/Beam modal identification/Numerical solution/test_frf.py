@@ -0,0 +1,50 @@
+import numpy as np
+import pytest
+
+from assembling import cantilever_model
+from frf import displacement_dofs, frequency_response, modal_damping_ratios
+from solver import solve_modes
+
+N_ELEMENTS = 8
+RAYLEIGH = (5.0, 2e-6)
+
+@pytest.fixture(scope="module")
+def beam():
+    model = cantilever_model(69e9, 2770, 0.01, 0.02, 0.4, N_ELEMENTS)
+    K, M = model["K_reduced"].toarray(), model["M_reduced"].toarray()
+    natural_frequencies, mode_shapes = solve_modes(model["K_reduced"], model["M_reduced"], K.shape[0])  # Full basis
+    return K, M, natural_frequencies, mode_shapes
+
+def test_full_modal_basis_matches_the_direct_solve(beam):
+    K, M, natural_frequencies, mode_shapes = beam
+    frequencies = np.array([0.0, 37.0, 640.0, 4000.0])
+    outputs, inputs = displacement_dofs([4, N_ELEMENTS]), displacement_dofs([N_ELEMENTS, 2, 6])
+    H = frequency_response(frequencies, natural_frequencies, mode_shapes, outputs, inputs, rayleigh=RAYLEIGH)
+
+    C = RAYLEIGH[0] * M + RAYLEIGH[1] * K
+    for f, H_f in zip(frequencies, H):
+        omega = 2 * np.pi * f
+        expected = np.linalg.inv(K - omega**2 * M + 1j * omega * C)[np.ix_(outputs, inputs)]
+        np.testing.assert_allclose(H_f, expected, rtol=1e-8, atol=1e-8 * np.abs(expected).max())
+
+def test_mobility_and_accelerance_are_time_derivatives(beam):
+    _, _, natural_frequencies, mode_shapes = beam
+    frequencies = np.linspace(10, 3000, 7)
+    tip = displacement_dofs(N_ELEMENTS)
+    H = {kind: frequency_response(frequencies, natural_frequencies, mode_shapes, tip, tip, damping_ratio=0.02,
+                                  kind=kind)[:, 0, 0]
+         for kind in ("receptance", "mobility", "accelerance")}
+    omega = 2 * np.pi * frequencies
+    np.testing.assert_allclose(H["mobility"], 1j * omega * H["receptance"])
+    np.testing.assert_allclose(H["accelerance"], -omega**2 * H["receptance"])
+
+def test_damping_options():
+    natural_frequencies = np.array([10.0, 100.0])
+    omega = 2 * np.pi * natural_frequencies
+    np.testing.assert_allclose(modal_damping_ratios(natural_frequencies, rayleigh=RAYLEIGH),
+                               RAYLEIGH[0] / (2 * omega) + RAYLEIGH[1] * omega / 2)
+    np.testing.assert_array_equal(modal_damping_ratios(natural_frequencies), [0.0, 0.0])
+    with pytest.raises(ValueError):
+        modal_damping_ratios(natural_frequencies, 0.01, RAYLEIGH)
+    with pytest.raises(ValueError, match="clamped"):
+        displacement_dofs([0, 1])
@@ -0,0 +1,77 @@
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+from scipy import signal
+
+from frf import displacement_dofs, frequency_response
+from identification import CrossSpectrumAccumulator, mac, operational_modal_analysis, record_chunks
+from solver import modal_analysis
+
+N_ELEMENTS = 20
+FS = 4096
+DAMPING = 0.02
+
+@pytest.fixture(scope="module")
+def measurement():
+    # Accelerations at 4 sensors for a white noise force at the tip, made by FFT filtering
+    model = modal_analysis(69e9, 2770, 0.01, 0.02, 0.4, N_ELEMENTS, n_modes=6)
+    sensors = displacement_dofs([5, 10, 15, 20])
+    rng = np.random.default_rng(0)
+    n_samples = FS * 60
+    force = np.fft.rfft(rng.standard_normal(n_samples))
+    H = frequency_response(np.fft.rfftfreq(n_samples, 1 / FS), model["frequencies"], model["mode_shapes"],
+                           sensors, displacement_dofs([N_ELEMENTS]), damping_ratio=DAMPING, kind="accelerance")
+    record = np.fft.irfft(H[:, :, 0] * force[:, None], n_samples, axis=0)
+    return model, sensors, record
+
+def test_streamed_csd_matches_scipy(measurement):
+    _, _, record = measurement
+    record = record[:20000]
+    _, expected = signal.csd(record[:, :, None], record[:, None, :], fs=FS, nperseg=1024, axis=0)
+    for chunk_size in (333, 4096, len(record)):
+        accumulator = CrossSpectrumAccumulator(FS, 1024)
+        for chunk in record_chunks(record, chunk_size):
+            accumulator.update(chunk)
+        np.testing.assert_allclose(accumulator.csd(), expected, rtol=1e-9, atol=1e-12 * np.abs(expected).max())
+
+def test_record_sources(measurement, tmp_path):
+    _, _, record = measurement
+    record = record[:1000]
+    np.save(os.path.join(tmp_path, "record.npy"), record)
+    pd.DataFrame(record, columns=list("abcd")).to_csv(os.path.join(tmp_path, "record.csv"), index=False)
+    for source in ("record.npy", "record.csv"):
+        chunks = list(record_chunks(os.path.join(tmp_path, source), 300, channels=[1, 3]))
+        assert [len(chunk) for chunk in chunks] == [300, 300, 300, 100]
+        np.testing.assert_allclose(np.concatenate(chunks), record[:, [1, 3]], rtol=1e-15)
+
+def test_fdd_identifies_the_beam_modes(measurement):
+    model, sensors, record = measurement
+    result = operational_modal_analysis(record_chunks(record, 50000), FS, nperseg=8192, n_modes=3)
+
+    np.testing.assert_allclose(result["frequencies"], model["frequencies"][:3], rtol=5e-3)
+    # The third mode lies close to the Nyquist frequency, where its bell is cut off
+    np.testing.assert_allclose(result["damping"][:2], DAMPING, rtol=0.1)
+    correlation = mac(result["mode_shapes"], model["mode_shapes"][sensors, :3])
+    assert np.all(np.diag(correlation) > 0.99)
+
+    bands = [(f - 20, f + 20) for f in model["frequencies"][:2]]
+    by_band = operational_modal_analysis([record], FS, nperseg=8192, bands=bands)
+    np.testing.assert_allclose(by_band["peak_frequencies"], result["peak_frequencies"][:2])
+
+def test_mac_of_scaled_modes():
+    phi = np.array([[1.0, 0.0], [0.5, 1.0], [0.2, -1.0]])
+    correlation = mac(phi, -3 * phi)
+    np.testing.assert_allclose(np.diag(correlation), 1)
+    assert correlation[0, 1] < 1
+
+def test_invalid_arguments():
+    with pytest.raises(ValueError, match="noverlap"):
+        CrossSpectrumAccumulator(FS, 256, noverlap=256)
+    accumulator = CrossSpectrumAccumulator(FS, 256)
+    accumulator.update(np.zeros((100, 2)))
+    with pytest.raises(ValueError, match="Not enough samples"):
+        accumulator.csd()
+    with pytest.raises(ValueError, match="either"):
+        operational_modal_analysis([], FS, 256)
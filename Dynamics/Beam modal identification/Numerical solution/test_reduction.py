@@ -0,0 +1,53 @@
+import numpy as np
+import pytest
+from scipy.sparse.linalg import spsolve
+
+from assembling import cantilever_model
+from frf import displacement_dofs
+from reduction import craig_bampton, guyan_reduction, reduced_modes, reduction_error
+
+N_ELEMENTS = 20
+
+@pytest.fixture(scope="module")
+def beam():
+    model = cantilever_model(69e9, 2770, 0.01, 0.02, 0.4, N_ELEMENTS)
+    boundary = np.concatenate([displacement_dofs([10, N_ELEMENTS]), displacement_dofs([10, N_ELEMENTS]) + 1])
+    return model["K_reduced"], model["M_reduced"], boundary
+
+def test_guyan_is_exact_for_static_boundary_loads(beam):
+    K, M, boundary = beam
+    reduced = guyan_reduction(K, M, boundary)
+    f_boundary = np.array([10.0, -4.0, 0.5, 2.0])
+    f = np.zeros(K.shape[0])
+    f[boundary] = f_boundary
+
+    expected = spsolve(K.tocsc(), f)
+    np.testing.assert_allclose(np.linalg.solve(reduced["K"], f_boundary), expected[boundary], rtol=1e-9)
+    np.testing.assert_allclose(reduced["T"] @ np.linalg.solve(reduced["K"], f_boundary), expected, rtol=0,
+                               atol=1e-9 * np.abs(expected).max())
+
+def test_craig_bampton_frequencies_converge_from_above(beam):
+    K, M, boundary = beam
+    errors = [reduction_error(K, M, craig_bampton(K, M, boundary, n_modes), 4)["error"] for n_modes in (0, 4, 12)]
+    for error in errors:
+        assert np.all(error > -1e-10)
+    assert np.all(errors[1] < errors[0]) and np.all(errors[2] <= errors[1] + 1e-12)
+    assert errors[2].max() < 1e-3
+
+def test_all_interior_modes_give_the_full_model(beam):
+    K, M, boundary = beam
+    reduced = craig_bampton(K, M, boundary, K.shape[0] - len(boundary))
+    comparison = reduction_error(K, M, reduced, 6)
+    np.testing.assert_allclose(comparison["reduced"], comparison["full"], rtol=1e-8)
+
+    _, mode_shapes = reduced_modes(reduced, 6)
+    np.testing.assert_allclose(mode_shapes.T @ M @ mode_shapes, np.eye(6), atol=1e-8)
+
+def test_invalid_boundaries_are_rejected(beam):
+    K, M, boundary = beam
+    with pytest.raises(ValueError, match="distinct"):
+        craig_bampton(K, M, [0, 0])
+    with pytest.raises(ValueError, match="distinct"):
+        craig_bampton(K, M, [K.shape[0]])
+    with pytest.raises(ValueError, match="interior DOFs"):
+        craig_bampton(K, M, boundary, K.shape[0])
@@ -0,0 +1,24 @@
+import numpy as np
+import pytest
+
+from solver import modal_analysis
+from sweep import design_grid, design_sweep
+
+def test_grid_covers_every_combination():
+    designs = design_grid(E=[69e9], rho=[2770], width=[0.01], height=[0.01, 0.02], length=[0.3, 0.4])
+    assert len(designs) == 4
+    assert {(design["height"], design["length"]) for design in designs} == {
+        (0.01, 0.3), (0.01, 0.4), (0.02, 0.3), (0.02, 0.4),
+    }
+
+def test_sweep_matches_modal_analysis_in_design_order():
+    designs = design_grid(E=[62e9, 69e9], rho=[2770], width=[0.01], height=[0.01, 0.02], length=[0.3, 0.4])
+    table = design_sweep(designs, n_elements=10, n_modes=2, max_workers=2, chunksize=3)
+    assert list(table.columns) == ["E", "rho", "width", "height", "length", "f1", "f2"]
+    for design, (_, row) in zip(designs, table.iterrows()):
+        expected = modal_analysis(n_elements=10, n_modes=2, **design)["frequencies"]
+        np.testing.assert_allclose(row[["f1", "f2"]].to_numpy(dtype=float), expected, rtol=1e-12)
+
+def test_incomplete_designs_are_rejected():
+    with pytest.raises(ValueError, match="length"):
+        design_sweep([{"E": 69e9, "rho": 2770, "width": 0.01, "height": 0.02}])
@@ -0,0 +1,78 @@
+import os
+
+import numpy as np
+import pytest
+from scipy import sparse
+
+import transient
+from assembling import cantilever_model
+from frf import modal_damping_ratios
+from solver import solve_modes
+from transient import half_sine_pulse, newmark_parameters, run_modal_newmark, run_newmark
+
+N_ELEMENTS = 10
+RAYLEIGH = (5.0, 2e-6)
+TIP = 2 * (N_ELEMENTS - 1)
+
+@pytest.fixture(scope="module")
+def beam():
+    model = cantilever_model(69e9, 2770, 0.01, 0.02, 0.4, N_ELEMENTS)
+    K, M = model["K_reduced"], model["M_reduced"]
+    force_shape = np.zeros(K.shape[0])
+    force_shape[TIP] = 1.0
+    return K, M, force_shape
+
+def test_free_vibration_of_one_oscillator(tmp_path):
+    omega = 2 * np.pi * 10
+    result = run_newmark(np.array([omega**2]), np.array([1.0]), np.zeros(1), lambda t: np.zeros_like(t), 0.2, 1e-4,
+                         u0=[1.0], history_path=os.path.join(tmp_path, "oscillator.npy"))
+    u = result["history"][:, 0, 0]
+    # The trapezoidal rule keeps the amplitude and lags by a phase error of O((omega dt)^2)
+    np.testing.assert_allclose(u, np.cos(omega * result["times"]), atol=1e-3)
+    energy = result["history"][:, 1, 0]**2 + omega**2 * u**2
+    np.testing.assert_allclose(energy, omega**2, rtol=1e-10)
+
+def test_all_modes_reproduce_the_full_model(beam, tmp_path):
+    K, M, force_shape = beam
+    frequencies, mode_shapes = solve_modes(K, M, K.shape[0])
+    C = RAYLEIGH[0] * M + RAYLEIGH[1] * K
+    impact = half_sine_pulse(10.0, 5e-4)
+
+    full = run_newmark(K, M, force_shape, impact, 0.01, 1e-5, C=C, alpha=-0.1,
+                       output_matrix=sparse.eye(1, K.shape[0], TIP, format="csr"),
+                       history_path=os.path.join(tmp_path, "full.npy"))
+    modal = run_modal_newmark(frequencies, mode_shapes, force_shape, impact, 0.01, 1e-5, [TIP],
+                              damping_ratio=modal_damping_ratios(frequencies, rayleigh=RAYLEIGH), alpha=-0.1,
+                              history_path=os.path.join(tmp_path, "modal.npy"))
+
+    np.testing.assert_array_equal(full["times"], modal["times"])
+    for kind in range(3):  # Displacement, velocity and acceleration
+        expected = full["history"][:, kind]
+        np.testing.assert_allclose(modal["history"][:, kind], expected, rtol=0, atol=1e-7 * np.abs(expected).max())
+
+def test_banded_and_sparse_solvers_agree(beam, tmp_path, monkeypatch):
+    K, M, force_shape = beam
+    impact = half_sine_pulse(10.0, 5e-4)
+    banded = run_newmark(K, M, force_shape, impact, 2e-3, 1e-5, history_path=os.path.join(tmp_path, "banded.npy"))
+    monkeypatch.setattr(transient, "BANDED_SOLVER_BANDWIDTH", 0)
+    general = run_newmark(K, M, force_shape, impact, 2e-3, 1e-5, history_path=os.path.join(tmp_path, "lu.npy"))
+    np.testing.assert_allclose(banded["history"], general["history"], rtol=1e-9,
+                               atol=1e-9 * np.abs(general["history"]).max())
+
+def test_steps_end_at_t_end(beam, tmp_path, capsys):
+    K, M, force_shape = beam
+    no_load = lambda t: np.zeros_like(t)
+    result = run_newmark(K, M, force_shape, no_load, 0.3, 0.1, save_every=2, chunk_size=1,
+                         history_path=os.path.join(tmp_path, "even.npy"))
+    assert "1 factorization(s)" in capsys.readouterr().out  # 0.3 / 0.1 is not exactly 3
+    np.testing.assert_allclose(result["times"], [0.0, 0.2])
+    assert result["history"].shape == (2, 3, K.shape[0])
+
+    result = run_newmark(K, M, force_shape, no_load, 0.25, 0.1, history_path=os.path.join(tmp_path, "odd.npy"))
+    assert "2 factorization(s)" in capsys.readouterr().out
+    assert np.isclose(result["times"][-1], 0.25)
+
+def test_alpha_range():
+    assert newmark_parameters(0.0) == (0.25, 0.5)
+    with pytest.raises(ValueError):
+        newmark_parameters(-0.5)
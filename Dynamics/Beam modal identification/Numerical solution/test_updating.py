@@ -0,0 +1,73 @@
+import numpy as np
+import pytest
+
+from solver import solve_modes
+from updating import beam_matrices, eigenvalue_derivatives, eigenvector_derivatives, subspace_iteration, update_model
+
+N_ELEMENTS = 12
+I = 6.67e-9
+ELEMENT_LENGTHS = np.full(N_ELEMENTS, 0.4 / N_ELEMENTS)
+E = np.full(N_ELEMENTS, 69e9)
+RHO_A = np.full(N_ELEMENTS, 2770 * 2e-4)
+
+def modes(E_e, rho_A_e, n_modes=4):
+    K, M = beam_matrices(E_e, rho_A_e, I, ELEMENT_LENGTHS)
+    frequencies, mode_shapes = solve_modes(K, M, n_modes)
+    return (2 * np.pi * frequencies)**2, mode_shapes
+
+def perturbed(element, parameter, step):
+    # Element properties with one E or rho*A scaled by (1 + step)
+    properties = {"E": E.copy(), "rho_A": RHO_A.copy()}
+    properties[parameter][element] *= 1 + step
+    return properties["E"], properties["rho_A"]
+
+@pytest.mark.parametrize("parameter", ["E", "rho_A"])
+def test_eigenvalue_derivatives_match_finite_differences(parameter):
+    eigenvalues, mode_shapes = modes(E, RHO_A)
+    derivatives = eigenvalue_derivatives(eigenvalues, mode_shapes, I, ELEMENT_LENGTHS)[parameter]
+    nominal = {"E": E, "rho_A": RHO_A}[parameter]
+    for element in (0, 5, N_ELEMENTS - 1):
+        step = 1e-6
+        finite_difference = (modes(*perturbed(element, parameter, step))[0]
+                             - modes(*perturbed(element, parameter, -step))[0]) / (2 * step * nominal[element])
+        np.testing.assert_allclose(derivatives[:, element], finite_difference, rtol=1e-5,
+                                   atol=1e-6 * np.abs(derivatives).max())
+
+@pytest.mark.parametrize("parameter", ["E", "rho_A"])
+def test_eigenvector_derivatives_match_finite_differences(parameter):
+    eigenvalues, mode_shapes = modes(E, RHO_A)
+    K, M = beam_matrices(E, RHO_A, I, ELEMENT_LENGTHS)
+    mode = 1
+    derivatives = eigenvector_derivatives(K, M, eigenvalues[mode], mode_shapes[:, mode], I, ELEMENT_LENGTHS,
+                                          parameter)
+    nominal = {"E": E, "rho_A": RHO_A}[parameter]
+    for element in (0, 7):
+        step = 1e-6
+        shifted = [modes(*perturbed(element, parameter, sign * step))[1][:, mode] for sign in (1, -1)]
+        shifted = [shape * np.sign(shape @ mode_shapes[:, mode]) for shape in shifted]
+        finite_difference = (shifted[0] - shifted[1]) / (2 * step * nominal[element])
+        np.testing.assert_allclose(derivatives[:, element], finite_difference, rtol=0,
+                                   atol=1e-5 * np.abs(finite_difference).max())
+
+def test_subspace_iteration_converges_from_a_nearby_model():
+    _, start = modes(E, RHO_A, 6)
+    stiffer = E * np.linspace(1.0, 1.2, N_ELEMENTS)
+    K, M = beam_matrices(stiffer, RHO_A, I, ELEMENT_LENGTHS)
+    eigenvalues, mode_shapes = subspace_iteration(K, M, start, 4)
+    expected, _ = modes(stiffer, RHO_A, 4)
+    np.testing.assert_allclose(eigenvalues[:4], expected, rtol=1e-9)
+    np.testing.assert_allclose(mode_shapes.T @ M @ mode_shapes, np.eye(6), atol=1e-8)
+
+def test_update_recovers_a_stiffness_loss():
+    zones = np.arange(N_ELEMENTS) * 4 // N_ELEMENTS
+    damaged = E * np.where(zones == 2, 0.7, 1.0)
+    measured = np.sqrt(modes(damaged, RHO_A, 6)[0]) / (2 * np.pi)
+
+    result = update_model(measured, E, RHO_A, I, ELEMENT_LENGTHS, zones=zones, regularization=1e-12)
+    np.testing.assert_allclose(result["scale_factors"][0], [1.0, 1.0, 0.7, 1.0], rtol=1e-3)
+    np.testing.assert_allclose(result["frequencies"], measured, rtol=1e-6)
+    assert result["cost"][-1] < result["cost"][0]
+
+def test_unknown_parameters_are_rejected():
+    with pytest.raises(ValueError, match="Unknown parameter"):
+        update_model([10.0], E, RHO_A, I, ELEMENT_LENGTHS, parameters=("I",))
@@ -0,0 +1,235 @@
+import os
+
+import numpy as np
+from scipy import sparse
+from scipy.linalg import cho_solve_banded, cholesky_banded
+from scipy.sparse.linalg import splu
+
+def newmark_parameters(alpha=0.0):
+    """
+    Newmark beta and gamma of the HHT-alpha method. alpha = 0 is the average acceleration
+    (trapezoidal) rule; -1/3 <= alpha < 0 adds numerical damping of the high frequencies
+    while keeping second-order accuracy and unconditional stability.
+    """
+    if not -1 / 3 <= alpha <= 0:
+        raise ValueError("alpha must be in [-1/3, 0]")
+    return (1 - alpha)**2 / 4, 0.5 - alpha
+
+def half_sine_pulse(amplitude, duration, start=0.0):
+    # Impact (e.g. impact hammer) load history: one half sine of the given duration
+    def history(t):
+        t = np.asarray(t, dtype=float) - start
+        return amplitude * np.sin(np.pi * t / duration) * ((t >= 0) & (t <= duration))
+    return history
+
+def base_excitation_shape(M, n_dof=2):
+    """
+    Force shape of a base (support) acceleration a_g(t) in relative coordinates: the
+    equations M u'' + C u' + K u = -M r a_g(t) hold for the motion relative to the base,
+    with r = 1 on the transverse displacement DOFs (rigid body translation).
+    """
+    r = np.zeros(M.shape[0])
+    r[::n_dof] = 1
+    return -(M @ r)
+
+# Up to this bandwidth the effective matrix is factorized as a band matrix: the beam DOFs
+# [w, theta] numbered node by node give a bandwidth of 3, and the banded Cholesky solve is
+# several times faster than the general sparse LU one
+BANDED_SOLVER_BANDWIDTH = 32
+
+def _factorize(A):
+    # Solver of the symmetric positive definite effective matrix A
+    A = sparse.coo_matrix(A)
+    bandwidth = np.abs(A.col - A.row).max(initial=0)
+    if bandwidth > BANDED_SOLVER_BANDWIDTH:
+        return splu(A.tocsc()).solve
+
+    # Upper band storage: row bandwidth - k holds the k-th superdiagonal
+    A = A.tocsr()
+    band = np.zeros((bandwidth + 1, A.shape[0]))
+    for k in range(bandwidth + 1):
+        band[bandwidth - k, k:] = A.diagonal(k)
+    factor = (cholesky_banded(band), False)
+    return lambda b: cho_solve_banded(factor, b, check_finite=False)
+
+def _step_operators(M, C, K, dt, alpha, beta, gamma, factorizations):
+    # Solver of the effective matrix M + (1 + alpha) (gamma dt C + beta dt^2 K), set up once
+    # per time-step size and reused by all steps of that size (a plain division for
+    # diagonal, modal, systems)
+    if dt not in factorizations:
+        A = M + (1 + alpha) * (gamma * dt * C + beta * dt**2 * K)
+        factorizations[dt] = (lambda b, d=A: b / d) if np.ndim(A) == 1 else _factorize(A)
+    return factorizations[dt]
+
+def run_newmark(K, M, force_shape, load_history, t_end, dt, C=None, alpha=0.0, u0=None, v0=None,
+                output_matrix=None, save_every=1, history_path="./output/beam_response.npy", chunk_size=4096):
+    """
+    Time integration of M u'' + C u' + K u = f(t) = force_shape * load_history(t) with the
+    HHT-alpha method (Newmark for alpha = 0).
+
+        M a_n+1 + (1 + alpha) (C v_n+1 + K u_n+1) - alpha (C v_n + K u_n) = (1 + alpha) f_n+1 - alpha f_n
+
+    The effective matrix is factorized once per time-step size (a shorter final step adds
+    one factorization), so each step costs a few sparse products and one pair of banded or
+    sparse triangular solves. The load history is evaluated for a whole chunk of steps at
+    once, and every save_every-th output [u, v, a] is streamed to a .npy file in chunks of
+    chunk_size rows.
+
+    Parameters:
+        K, M (scipy.sparse matrix): Stiffness and mass matrices (e.g. K_reduced, M_reduced),
+            or 1-D arrays of their diagonals for uncoupled (modal) equations.
+        force_shape (numpy.ndarray): Spatial distribution of the load.
+        load_history (callable): Load amplitude g(t), vectorized over an array of times.
+        t_end (float): Simulated time (s).
+        dt (float): Time step (s).
+        C (scipy.sparse matrix): Damping matrix, a 1-D diagonal if K and M are diagonals
+            (defaults to no damping).
+        alpha (float): HHT parameter in [-1/3, 0].
+        u0, v0 (numpy.ndarray): Initial displacements and velocities (default zero).
+        output_matrix (numpy.ndarray or scipy.sparse matrix): Maps the DOFs to the stored
+            outputs, shape (n_outputs, n_dofs) (defaults to all DOFs).
+        save_every (int): Store the outputs every save_every steps.
+        history_path (str): Output .npy file.
+        chunk_size (int): Number of steps (and of stored rows) processed between writes.
+
+    Returns:
+        dict: Results:
+            - "times": Times of the stored outputs.
+            - "history": Memory-mapped outputs, shape (len(times), 3, n_outputs) with the
+              displacement, velocity and acceleration of every output.
+            - "state": Final (u, v, a).
+    """
+    n = K.shape[0]
+    if np.ndim(K) == 1:
+        # Diagonal system: element-wise products replace the sparse ones
+        K, M = np.asarray(K, dtype=float), np.asarray(M, dtype=float)
+        C = np.zeros(n) if C is None else np.asarray(C, dtype=float)
+        product = np.multiply
+    else:
+        K, M = sparse.csr_matrix(K), sparse.csr_matrix(M)
+        C = sparse.csr_matrix((n, n)) if C is None else sparse.csr_matrix(C)
+        product = sparse.csr_matrix.dot
+    output_matrix = sparse.identity(n, format="csr") if output_matrix is None else output_matrix
+    beta, gamma = newmark_parameters(alpha)
+
+    u = np.zeros(n) if u0 is None else np.array(u0, dtype=float)
+    v = np.zeros(n) if v0 is None else np.array(v0, dtype=float)
+    f_old = force_shape * load_history(0.0)
+    initial_force = f_old - product(C, v) - product(K, u)
+    a = initial_force / M if np.ndim(M) == 1 else splu(sparse.csc_matrix(M)).solve(initial_force)
+
+    num_steps = int(np.ceil(t_end / dt - 1e-9))
+    steps = np.full(num_steps, float(dt))
+    last_step = t_end - dt * (num_steps - 1)
+    if not np.isclose(last_step, dt):  # Keep round-off from adding a second factorization
+        steps[-1] = last_step
+    step_times = np.cumsum(steps)
+    saved = np.arange(0, num_steps + 1, save_every)
+    times = np.concatenate([[0.0], step_times])[saved]
+
+    os.makedirs(os.path.dirname(os.path.abspath(history_path)), exist_ok=True)
+    n_outputs = output_matrix.shape[0]
+    history = np.lib.format.open_memmap(history_path, mode="w+", dtype=np.float64, shape=(len(saved), 3, n_outputs))
+    buffer = np.empty((chunk_size, 3, n_outputs))
+    buffered, written = 1, 0
+    buffer[0] = [output_matrix @ u, output_matrix @ v, output_matrix @ a]
+
+    factorizations = {}
+    Ku, Cv = product(K, u), product(C, v)
+    for chunk_start in range(0, num_steps, chunk_size):
+        chunk = slice(chunk_start, min(chunk_start + chunk_size, num_steps))
+        loads = load_history(step_times[chunk])
+        for step, (h, g) in enumerate(zip(steps[chunk], loads), start=chunk_start + 1):
+            solve = _step_operators(M, C, K, h, alpha, beta, gamma, factorizations)
+            f_new = force_shape * g
+
+            # Predictors, then the new acceleration from the effective equation
+            u_predicted = u + h * v + h**2 * (0.5 - beta) * a
+            v_predicted = v + h * (1 - gamma) * a
+            rhs = ((1 + alpha) * f_new - alpha * f_old
+                   - (1 + alpha) * (product(K, u_predicted) + product(C, v_predicted)) + alpha * (Ku + Cv))
+            a = solve(rhs)
+            u = u_predicted + beta * h**2 * a
+            v = v_predicted + gamma * h * a
+            Ku, Cv = product(K, u), product(C, v)
+            f_old = f_new
+
+            if step % save_every == 0:
+                if buffered == chunk_size:
+                    history[written:written + buffered] = buffer
+                    written += buffered
+                    buffered = 0
+                buffer[buffered] = [output_matrix @ u, output_matrix @ v, output_matrix @ a]
+                buffered += 1
+
+    history[written:written + buffered] = buffer[:buffered]
+    history.flush()
+    print(f"{num_steps} steps, {len(factorizations)} factorization(s), {len(saved)} outputs written to {history_path}")
+    return {"times": times, "history": history, "state": (u, v, a)}
+
+def run_modal_newmark(natural_frequencies, mode_shapes, force_shape, load_history, t_end, dt, output_dofs,
+                      damping_ratio=0.0, alpha=0.0, **kwargs):
+    """
+    run_newmark on a truncated modal basis: with mass-normalized modes the modal equations
+    q'' + 2 zeta_r omega_r q' + omega_r^2 q = phi_r^T f are uncoupled, so the matrices are
+    diagonal and each step is a few element-wise operations on n_modes values. The outputs
+    are the physical responses at output_dofs, u = Phi q.
+
+    Parameters:
+        natural_frequencies (numpy.ndarray): Natural frequencies in Hz of the retained modes.
+        mode_shapes (numpy.ndarray): Mass-normalized mode shapes, shape (n_dofs, n_modes).
+        output_dofs (numpy.ndarray): Physical DOFs to store.
+        damping_ratio (float or numpy.ndarray): Modal damping ratio, uniform or per mode.
+        **kwargs: Further arguments of run_newmark (save_every, history_path, ...).
+    """
+    omega = 2 * np.pi * np.asarray(natural_frequencies, dtype=float)
+    zeta = np.broadcast_to(np.asarray(damping_ratio, dtype=float), omega.shape)
+    return run_newmark(
+        omega**2, np.ones_like(omega), mode_shapes.T @ force_shape, load_history, t_end, dt, C=2 * zeta * omega,
+        alpha=alpha, output_matrix=mode_shapes[np.atleast_1d(output_dofs)], **kwargs,
+    )
+
+if __name__ == "__main__":
+    import time
+    import matplotlib.pyplot as plt
+
+    from assembling import cantilever_model
+    from parametrizing import material_params, geometric_params
+    from solver import solve_modes
+
+    n_elements = 100
+    model = cantilever_model(
+        material_params["E"], material_params["rho"], geometric_params["width"], geometric_params["height"],
+        geometric_params["length"], n_elements,
+    )
+    K, M = model["K_reduced"], model["M_reduced"]
+    tip = 2 * (n_elements - 1)  # Transverse displacement of the tip
+
+    # 10 N impact at the tip, lasting 0.5 ms, with 1% damping on the first two modes (Rayleigh)
+    frequencies, mode_shapes = solve_modes(K, M, 10)
+    omega_1, omega_2 = 2 * np.pi * frequencies[:2]
+    beta_rayleigh = 2 * 0.01 / (omega_1 + omega_2)
+    C = beta_rayleigh * omega_1 * omega_2 * M + beta_rayleigh * K
+    impact_shape = np.zeros(K.shape[0])
+    impact_shape[tip] = 1.0
+    impact = half_sine_pulse(10.0, 5e-4)
+
+    start = time.perf_counter()
+    full = run_newmark(K, M, impact_shape, impact, 0.1, 1e-5, C=C, alpha=-0.05, output_matrix=sparse.eye(
+        1, K.shape[0], tip, format="csr"), history_path="./output/beam_impact_full.npy")
+    print(f"Full model: {time.perf_counter() - start:.2f} s")
+
+    start = time.perf_counter()
+    modal = run_modal_newmark(frequencies, mode_shapes, impact_shape, impact, 0.1, 1e-5, [tip], damping_ratio=0.01,
+                              alpha=-0.05, history_path="./output/beam_impact_modal.npy")
+    print(f"Modal model (10 modes): {time.perf_counter() - start:.2f} s")
+
+    plt.figure()
+    plt.plot(full["times"] * 1e3, full["history"][:, 0, 0] * 1e3, label="Full model (Rayleigh damping)")
+    plt.plot(modal["times"] * 1e3, modal["history"][:, 0, 0] * 1e3, "--", label="10 modes (1% modal damping)")
+    plt.title("Tip displacement after an impact at the tip")
+    plt.xlabel("Time (ms)")
+    plt.ylabel("Displacement (mm)")
+    plt.legend()
+    plt.grid(True)
+    plt.show()
@@ -0,0 +1,260 @@
+import numpy as np
+from scipy.linalg import eigh
+from scipy.sparse.linalg import splu
+
+from assembling import apply_clamped_end, assemble_global_matrices, local_mass, local_stiffness
+from solver import solve_modes
+
+UPDATING_PARAMETERS = ("E", "rho_A")
+
+def beam_matrices(E, rho_A, I, element_lengths, n_dof=2):
+    # Clamped K and M from per-element E and rho*A (rho*A is passed as the density of a unit area)
+    K_global, M_global = assemble_global_matrices(E, I, rho_A, 1.0, element_lengths, n_dof)
+    return apply_clamped_end(K_global, M_global, n_dof)
+
+def _element_modes(mode_shapes, n_elements, n_dof=2):
+    # Mode shapes on the DOFs of every element, shape (n_elements, 4, n_modes), with the
+    # clamped DOFs of node 0 set to zero
+    full = np.vstack([np.zeros((n_dof, mode_shapes.shape[1])), mode_shapes])
+    element_dofs = n_dof * np.arange(n_elements)[:, None] + np.arange(2 * n_dof)
+    return full[element_dofs]
+
+def eigenvalue_derivatives(eigenvalues, mode_shapes, I, element_lengths):
+    """
+    Derivatives of the eigenvalues with respect to the E and rho*A of every element.
+
+    For mass-normalized modes, d(lambda)/dp = phi^T (dK/dp - lambda dM/dp) phi, where dK/dE_e
+    and dM/d(rho A)_e are the unit element matrices, so all derivatives follow from one
+    contraction over the element DOFs.
+
+    Parameters:
+        eigenvalues (numpy.ndarray): Eigenvalues omega^2, shape (n_modes,).
+        mode_shapes (numpy.ndarray): Mass-normalized mode shapes on the free DOFs.
+        I (float or numpy.ndarray): Moment of inertia, uniform or per element.
+        element_lengths (numpy.ndarray): Length of every element.
+
+    Returns:
+        dict: {"E": (n_modes, n_elements), "rho_A": (n_modes, n_elements)} derivatives.
+    """
+    element_lengths = np.asarray(element_lengths, dtype=float)
+    phi = _element_modes(mode_shapes, len(element_lengths))
+    k_unit = np.broadcast_to(local_stiffness(1.0, I, element_lengths), (len(element_lengths), 4, 4))
+    m_unit = local_mass(1.0, 1.0, element_lengths)
+    return {
+        "E": np.einsum("eim,eij,ejm->me", phi, k_unit, phi),
+        "rho_A": -np.asarray(eigenvalues)[:, None] * np.einsum("eim,eij,ejm->me", phi, m_unit, phi),
+    }
+
+def eigenvector_derivatives(K_reduced, M_reduced, eigenvalue, mode_shape, I, element_lengths, parameter="E"):
+    """
+    Derivatives of one mass-normalized mode shape with respect to a property of every
+    element, by Nelson's method.
+
+    The singular system (K - lambda M) v = f is made regular by fixing the DOF where the
+    mode is largest, so it is factorized once and solved for all elements at once (one
+    right-hand side per element). The derivative is v + c phi, with c restoring the mass
+    normalization.
+
+    Parameters:
+        parameter (str): "E" or "rho_A".
+
+    Returns:
+        numpy.ndarray: d(phi)/dp_e for every element, shape (n_free_dofs, n_elements).
+    """
+    if parameter not in UPDATING_PARAMETERS:
+        raise ValueError(f"Unknown parameter '{parameter}', expected one of {UPDATING_PARAMETERS}")
+    element_lengths = np.asarray(element_lengths, dtype=float)
+    n_elements = len(element_lengths)
+    n_free = K_reduced.shape[0]
+    phi = _element_modes(mode_shape[:, None], n_elements)[:, :, 0]
+
+    if parameter == "E":
+        d_matrices = np.broadcast_to(local_stiffness(1.0, I, element_lengths), (n_elements, 4, 4))
+        d_mass = np.zeros(n_elements)
+    else:
+        d_matrices = -eigenvalue * local_mass(1.0, 1.0, element_lengths)
+        d_mass = np.einsum("ei,eij,ej->e", phi, local_mass(1.0, 1.0, element_lengths), phi)
+    d_eigenvalue = np.einsum("ei,eij,ej->e", phi, d_matrices, phi)
+
+    # Right-hand sides f_e = -(dK_e - lambda dM_e - d(lambda)_e M) phi, one column per element
+    # (rows 0 and 1 are the clamped DOFs and are dropped)
+    F = np.zeros((n_free + 2, n_elements))
+    element_dofs = 2 * np.arange(n_elements)[:, None] + np.arange(4)
+    F[element_dofs, np.arange(n_elements)[:, None]] -= np.einsum("eij,ej->ei", d_matrices, phi)
+    M_phi = M_reduced @ mode_shape
+    F = F[2:] + np.outer(M_phi, d_eigenvalue)
+
+    # Nelson: fix the DOF with the largest modal amplitude to make K - lambda M regular
+    fixed = np.argmax(np.abs(mode_shape))
+    A = (K_reduced - eigenvalue * M_reduced).tolil()
+    A[fixed, :] = 0
+    A[:, fixed] = 0
+    A[fixed, fixed] = 1
+    F[fixed] = 0
+    V = splu(A.tocsc()).solve(F)
+
+    c = -M_phi @ V - 0.5 * d_mass
+    return V + np.outer(mode_shape, c)
+
+def subspace_iteration(K, M, modes, n_modes, tolerance=1e-10, max_iterations=50):
+    """
+    Lowest n_modes eigenpairs of K x = lambda M x by block inverse iteration with
+    Rayleigh-Ritz projection, starting from the given modes.
+
+    Started from the modes of a nearby model (e.g. the previous model updating iteration)
+    it converges in a few iterations, each one a block solve with the sparse LU factors of
+    K. Extra columns in modes act as guard vectors and speed up the convergence of the
+    highest wanted mode.
+
+    Parameters:
+        tolerance (float): Convergence tolerance on the relative change of every wanted eigenvalue.
+
+    Returns:
+        tuple: (eigenvalues, modes) of the whole block, sorted, mass-normalized.
+    """
+    lu = splu(K.tocsc())
+    previous = None
+    for _ in range(max_iterations):
+        M_modes = M @ modes
+        modes = lu.solve(M_modes)
+        # Rayleigh-Ritz on the inverse problem, as in solve_modes, to avoid factorizing M. The
+        # projected stiffness Y^T K Y equals Y^T M X since K Y = M X, which avoids the
+        # cancellation of forming it with the ill-conditioned K
+        inverse_eigenvalues, Q = eigh(modes.T @ (M @ modes), modes.T @ M_modes)
+        eigenvalues = 1 / inverse_eigenvalues[::-1]
+        modes = modes @ (Q[:, ::-1] * np.sqrt(eigenvalues))
+        if previous is not None and np.all(np.abs(eigenvalues[:n_modes] - previous) <= tolerance * previous):
+            break
+        previous = eigenvalues[:n_modes]
+    return eigenvalues, modes
+
+def update_model(measured_frequencies, E, rho_A, I, element_lengths, zones=None, parameters=("E",),
+                 regularization=1e-8, max_iterations=50, tolerance=1e-8):
+    """
+    Updates the element E and/or rho*A of a cantilever so that its lowest natural frequencies
+    match measured ones, by a Levenberg-Marquardt method on analytic sensitivities.
+
+    The unknowns are the logarithms of zone scale factors (every element of a zone is scaled
+    by the same factor, which stays positive), regularized towards the initial model. Every
+    trial model is solved by subspace iteration starting from the modes of the current
+    model, so no eigenproblem is solved from scratch after the first one.
+
+    Parameters:
+        measured_frequencies (numpy.ndarray): Measured natural frequencies in Hz (lowest
+            modes, in order).
+        E, rho_A (numpy.ndarray): Initial per-element E and rho*A.
+        I (float or numpy.ndarray): Moment of inertia, uniform or per element.
+        element_lengths (numpy.ndarray): Length of every element.
+        zones (numpy.ndarray): Zone of every element (defaults to one zone per element).
+        parameters (tuple): Updated properties, "E" and/or "rho_A".
+        regularization (float): Weight of the penalty on the log scale factors.
+        max_iterations (int): Maximum number of iterations.
+        tolerance (float): Convergence tolerance on the relative change of the cost.
+
+    Returns:
+        dict: Results:
+            - "E", "rho_A": Updated element properties.
+            - "scale_factors": Scale factor of every zone and parameter, shape (n_parameters, n_zones).
+            - "frequencies": Natural frequencies of the updated model in Hz.
+            - "iterations": Number of iterations.
+            - "cost": Cost history.
+    """
+    measured_frequencies = np.asarray(measured_frequencies, dtype=float)
+    element_lengths = np.asarray(element_lengths, dtype=float)
+    n_elements = len(element_lengths)
+    E0 = np.broadcast_to(np.asarray(E, dtype=float), (n_elements,))
+    rho_A0 = np.broadcast_to(np.asarray(rho_A, dtype=float), (n_elements,))
+    zones = np.arange(n_elements) if zones is None else np.asarray(zones)
+    n_zones = zones.max() + 1
+    n_modes = len(measured_frequencies)
+    n_guard = max(2, n_modes // 2)  # Extra modes that speed up the subspace iteration
+    for parameter in parameters:
+        if parameter not in UPDATING_PARAMETERS:
+            raise ValueError(f"Unknown parameter '{parameter}', expected one of {UPDATING_PARAMETERS}")
+
+    # Zone-to-element summation, as a matrix acting on per-element sensitivities
+    zone_matrix = np.zeros((n_elements, n_zones))
+    zone_matrix[np.arange(n_elements), zones] = 1
+
+    def properties(theta):
+        factors = np.exp(theta.reshape(len(parameters), n_zones))
+        scale = {parameter: factors[i][zones] for i, parameter in enumerate(parameters)}
+        return E0 * scale.get("E", 1.0), rho_A0 * scale.get("rho_A", 1.0)
+
+    def evaluate(theta, modes):
+        E_e, rho_A_e = properties(theta)
+        K, M = beam_matrices(E_e, rho_A_e, I, element_lengths)
+        if modes is None:
+            _, modes = solve_modes(K, M, n_modes + n_guard)
+        eigenvalues, modes = subspace_iteration(K, M, modes, n_modes)
+        frequencies = np.sqrt(eigenvalues[:n_modes]) / (2 * np.pi)
+        residual = (frequencies - measured_frequencies) / measured_frequencies
+        cost = residual @ residual + regularization * theta @ theta
+        return {"E": E_e, "rho_A": rho_A_e, "eigenvalues": eigenvalues[:n_modes], "modes": modes,
+                "frequencies": frequencies, "residual": residual, "cost": cost}
+
+    def jacobian(state):
+        # d(residual)/d(theta): chain rule through f = sqrt(lambda) / 2 pi and p = p0 exp(theta)
+        derivatives = eigenvalue_derivatives(state["eigenvalues"], state["modes"][:, :n_modes], I, element_lengths)
+        d_frequency = 1 / (8 * np.pi**2 * state["frequencies"] * measured_frequencies)
+        blocks = [
+            d_frequency[:, None] * (derivatives[parameter] * state[parameter]) @ zone_matrix
+            for parameter in parameters
+        ]
+        return np.hstack(blocks)
+
+    theta = np.zeros(len(parameters) * n_zones)
+    state = evaluate(theta, None)
+    damping = 1e-3
+    costs = [state["cost"]]
+    for iteration in range(1, max_iterations + 1):
+        J = jacobian(state)
+        JtJ = J.T @ J
+        gradient = J.T @ state["residual"] + regularization * theta
+        while True:
+            # Levenberg-Marquardt step, with Marquardt scaling of the damping
+            A = JtJ + damping * np.diag(np.diag(JtJ) + 1e-12) + regularization * np.eye(len(theta))
+            step = -np.linalg.solve(A, gradient)
+            trial = evaluate(theta + step, state["modes"])
+            if trial["cost"] < state["cost"]:
+                theta, state = theta + step, trial
+                damping = max(damping / 3, 1e-9)
+                break
+            damping *= 4
+            if damping > 1e9:
+                break
+        costs.append(state["cost"])
+        if abs(costs[-2] - costs[-1]) <= tolerance * costs[-2] or damping > 1e9:
+            break
+
+    return {
+        "E": state["E"],
+        "rho_A": state["rho_A"],
+        "scale_factors": np.exp(theta.reshape(len(parameters), n_zones)),
+        "frequencies": state["frequencies"],
+        "iterations": iteration,
+        "cost": costs,
+    }
+
+if __name__ == "__main__":
+    import time
+
+    from parametrizing import material_params, geometric_params
+
+    n_elements = 1000
+    n_zones = 10
+    element_lengths = np.full(n_elements, geometric_params["length"] / n_elements)
+    E = np.full(n_elements, material_params["E"])
+    rho_A = np.full(n_elements, material_params["rho"] * geometric_params["area"])
+    zones = np.arange(n_elements) * n_zones // n_elements
+
+    # "Measured" frequencies: the same beam with 30% stiffness loss in the fourth zone
+    damaged_E = np.where(zones == 3, 0.7, 1.0) * E
+    K, M = beam_matrices(damaged_E, rho_A, geometric_params["I"], element_lengths)
+    measured, _ = solve_modes(K, M, 12)
+
+    start = time.perf_counter()
+    result = update_model(measured, E, rho_A, geometric_params["I"], element_lengths, zones=zones)
+    print(f"Updated in {time.perf_counter() - start:.2f} s ({result['iterations']} iterations)")
+    print("Identified stiffness factors per zone:", np.round(result["scale_factors"][0], 3))
+    print("Frequency errors (%):", np.round(100 * (result["frequencies"] - measured) / measured, 4))
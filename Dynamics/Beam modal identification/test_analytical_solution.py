@@ -0,0 +1,68 @@
+import importlib.util
+import os
+
+import numpy as np
+import pytest
+
+# The script name has a space, so it is loaded from its path
+_spec = importlib.util.spec_from_file_location(
+    "analytical_solution", os.path.join(os.path.dirname(os.path.abspath(__file__)), "Analytical solution.py")
+)
+analytical = importlib.util.module_from_spec(_spec)
+_spec.loader.exec_module(analytical)
+
+# Tabulated roots beta_n L (Blevins)
+KNOWN_ROOTS = {
+    "CF": [1.87510407, 4.69409113, 7.85475744, 10.99554073],
+    "PP": [np.pi, 2 * np.pi, 3 * np.pi, 4 * np.pi],
+    "CC": [4.73004074, 7.85320462, 10.99560784, 14.13716549],
+    "FF": [4.73004074, 7.85320462, 10.99560784, 14.13716549],
+}
+
+@pytest.mark.parametrize("boundary", analytical.BOUNDARY_CONDITIONS)
+def test_roots_match_the_tables_and_the_characteristic_equation(boundary):
+    roots = analytical.characteristic_roots(boundary, 40)
+    np.testing.assert_allclose(roots[:4], KNOWN_ROOTS[boundary], rtol=1e-8)
+    n = np.arange(1, 41)
+    asymptotes = {"CF": (2 * n - 1) * np.pi / 2, "PP": n * np.pi}.get(boundary, (2 * n + 1) * np.pi / 2)
+    np.testing.assert_allclose(roots[10:], asymptotes[10:], rtol=0, atol=1e-9)
+    if boundary != "PP":
+        sign = 1 if boundary == "CF" else -1
+        np.testing.assert_allclose(np.cos(roots) + sign / np.cosh(roots), 0, atol=1e-12)
+
+def test_frequencies_broadcast_over_designs():
+    E, rho, width = 69e9, 2770, 0.01
+    heights = np.array([0.01, 0.02])[:, None]
+    lengths = np.array([0.3, 0.4, 0.5])[None, :]
+    table = analytical.natural_frequencies(E, width * heights**3 / 12, rho, width * heights, lengths, 3)
+    assert table.shape == (2, 3, 3)
+    expected = KNOWN_ROOTS["CF"][0]**2 / (2 * np.pi * 0.4**2) * np.sqrt(E * 0.02**2 / (12 * rho))
+    assert np.isclose(table[1, 1, 0], expected)
+    with pytest.raises(ValueError):
+        analytical.characteristic_roots("CS")
+
+@pytest.mark.parametrize("boundary", analytical.BOUNDARY_CONDITIONS)
+def test_mode_shapes_are_orthonormal_and_meet_the_boundary_conditions(boundary):
+    n_modes = 12
+    xi = np.linspace(0, 1, 20001)
+    phi = analytical.mode_shapes(xi, n_modes, boundary)
+    weights = np.full(len(xi), xi[1])
+    weights[[0, -1]] /= 2  # Trapezoidal rule
+    gram = phi.T @ (weights[:, None] * phi)
+    np.testing.assert_allclose(gram, (0.5 if boundary == "PP" else 1.0) * np.eye(n_modes), atol=1e-6)
+
+    # Supported ends have no displacement and clamped ends no slope (one-sided differences,
+    # scaled by beta_n L, with an O(h beta_n L) error)
+    h = xi[1]
+    roots = analytical.characteristic_roots(boundary, n_modes)
+    left_slope, right_slope = (phi[1] - phi[0]) / (h * roots), (phi[-1] - phi[-2]) / (h * roots)
+    if boundary in ("CF", "CC", "PP"):
+        np.testing.assert_allclose(phi[0], 0, atol=1e-9)
+    if boundary in ("CC", "PP"):
+        np.testing.assert_allclose(phi[-1], 0, atol=1e-9)
+    if boundary in ("CF", "CC"):
+        assert np.all(np.abs(left_slope) < h * roots)
+    if boundary == "CC":
+        assert np.all(np.abs(right_slope) < h * roots)
+    if boundary in ("CF", "FF"):
+        assert np.all(np.abs(phi[-1]) > 1.9)  # Free tip: |phi(L)| = 2 for the classical normalization
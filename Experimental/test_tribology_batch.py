@@ -0,0 +1,75 @@
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from tribology_batch import _envelope, friction_coefficient, main, process_tests, summarize_test
+
+def write_tests(data_path, n_tests=3, n_samples=2000):
+    # Test exports with an unloaded pin over the first and last 100 samples
+    paths = []
+    for test in range(n_tests):
+        rng = np.random.default_rng(test)
+        Fn = np.full(n_samples, 10.0 + test)
+        Fn[:100] = Fn[-100:] = 0.01
+        data = pd.DataFrame({
+            "Time": np.arange(n_samples) / 100,
+            "Fn": Fn,
+            "Ft": (0.2 + 0.1 * test) * Fn + 0.01 * rng.standard_normal(n_samples),
+        })
+        paths.append(os.path.join(data_path, f"{test + 1}.csv"))
+        data.to_csv(paths[-1], index=False)
+    return paths
+
+def test_friction_coefficient_skips_the_unloaded_pin():
+    data = pd.DataFrame({"Fn": [0.0, 0.05, -0.2, 4.0], "Ft": [1.0, 1.0, 0.1, 1.0]})
+    np.testing.assert_allclose(friction_coefficient(data), [np.nan, np.nan, -0.5, 0.25])
+
+def test_envelope_keeps_the_extremes_of_every_bucket():
+    rng = np.random.default_rng(0)
+    time = np.arange(100001, dtype=float)
+    values = rng.standard_normal(len(time))
+    values[50000:51000] = np.nan
+    reduced_time, reduced = _envelope(time, values, max_points=1000)
+
+    assert len(reduced) <= 1000
+    assert np.all(np.diff(reduced_time) >= 0)  # An all-NaN bucket repeats its first sample
+    np.testing.assert_array_equal(values[reduced_time.astype(int)], reduced)
+    assert np.nanmax(reduced) == np.nanmax(values) and np.nanmin(reduced) == np.nanmin(values)
+    assert np.isnan(reduced).any()  # The unloaded gap stays visible
+
+    short = np.arange(10.0)
+    assert _envelope(short, short, max_points=1000)[1] is short
+
+def test_parallel_summary_matches_the_serial_computation(tmp_path):
+    data_path, output_dir = os.path.join(tmp_path, "data"), os.path.join(tmp_path, "results")
+    os.makedirs(data_path)
+    paths = write_tests(data_path)
+    summary = process_tests(paths, output_dir, max_workers=2, start_time=2.0, plots=False)
+
+    assert list(summary["test"]) == ["1", "2", "3"]
+    pd.testing.assert_frame_equal(pd.read_csv(os.path.join(output_dir, "summary.csv"), dtype={"test": str}), summary,
+                                  check_dtype=False)
+    for path, (_, row) in zip(paths, summary.iterrows()):
+        data = pd.read_csv(path).astype({"Fn": np.float32, "Ft": np.float32})
+        data = data[data["Time"] >= 2.0]
+        expected = summarize_test(data, friction_coefficient(data))
+        for name, value in expected.items():
+            assert np.isclose(row[name], value, rtol=1e-6)
+    np.testing.assert_allclose(summary["u_median"], [0.2, 0.3, 0.4], atol=1e-3)
+
+def test_command_line_writes_the_figures(tmp_path, capsys):
+    pytest.importorskip("matplotlib")
+    data_path, output_dir = os.path.join(tmp_path, "data"), os.path.join(tmp_path, "results")
+    os.makedirs(data_path)
+    write_tests(data_path, n_tests=2)
+    main([data_path, "-o", output_dir, "-j", "1"])
+
+    assert "u_mean" in capsys.readouterr().out
+    kinds = ("normal_force", "tangent_force", "friction_coefficient")
+    names = {f"{test}_{kind}.png" for test in (1, 2) for kind in kinds}
+    assert names | {"summary.csv"} == set(os.listdir(output_dir))
+    os.makedirs(os.path.join(tmp_path, "empty"))
+    with pytest.raises(SystemExit):
+        main([os.path.join(tmp_path, "empty")])
@@ -0,0 +1,96 @@
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from tribology_features import _band_energies, extract_features, merge_statistics, stream_features
+from tribology_io import MIN_NORMAL_FORCE
+
+SAMPLING_RATE = 200.0
+BANDS = (0, 5, 20, 50, None)
+
+def make_record(n_samples=5000, seed=0):
+    # Friction run with a 12 Hz stick-slip oscillation of Ft and an unloaded start and end
+    rng = np.random.default_rng(seed)
+    time = np.arange(n_samples) / SAMPLING_RATE
+    Fn = 10 + 0.1 * rng.standard_normal(n_samples)
+    Fn[:150] = Fn[-150:] = 0.01 * rng.standard_normal(150)
+    Ft = 0.3 * Fn + 0.5 * np.sin(2 * np.pi * 12 * time) + 0.05 * rng.standard_normal(n_samples)
+    return pd.DataFrame({"Time": time, "Fn": Fn, "Ft": Ft})
+
+def whole_record_features(record, window, hop):
+    # Reference: every window computed from the whole arrays at once
+    time, Fn, Ft = (record[name].to_numpy(dtype=float) for name in ("Time", "Fn", "Ft"))
+    u = np.where(np.abs(Fn) >= MIN_NORMAL_FORCE, Ft / Fn, np.nan)
+    increments = np.vstack([np.full(2, np.nan), np.diff(np.column_stack([Fn, Ft]), axis=0)])
+    rows = []
+    for start in range(0, (len(record) // hop) * hop - window + 1, hop):
+        samples = slice(start, start + window)
+        valid_u = u[samples][~np.isnan(u[samples])]
+        valid_increments = increments[samples][~np.isnan(increments[samples, 0])]
+        row = {
+            "t_start": time[start],
+            "t_end": time[start + window - 1],
+            "Fn_mean": Fn[samples].mean(),
+            "u_mean": valid_u.mean() if len(valid_u) else np.nan,
+            "u_std": valid_u.std(ddof=1) if len(valid_u) > 1 else np.nan,
+            "u_valid_fraction": len(valid_u) / window,
+            "dFn_rms": np.sqrt(np.mean(valid_increments[:, 0]**2)),
+            "dFt_rms": np.sqrt(np.mean(valid_increments[:, 1]**2)),
+            "dFn_max": np.abs(valid_increments[:, 0]).max(),
+            "dFt_max": np.abs(valid_increments[:, 1]).max(),
+        }
+        for name, values in (("Fn", Fn), ("Ft", Ft)):
+            energies = _band_energies(values[samples][None], SAMPLING_RATE, BANDS)
+            for (low, high), energy in zip(zip(BANDS[:-1], BANDS[1:]), energies):
+                row[f"{name}_band_{low}_{'nyquist' if high is None else high}Hz"] = energy[0]
+        rows.append(row)
+    return pd.DataFrame(rows)
+
+def chunked(record, chunk_size):
+    return (record.iloc[start:start + chunk_size] for start in range(0, len(record), chunk_size))
+
+@pytest.mark.parametrize("window, hop", [(200, 100), (200, 200), (300, 50)])
+@pytest.mark.parametrize("chunk_size", [37, 100, 1000, 5000])
+def test_streamed_windows_match_the_whole_record(window, hop, chunk_size):
+    record = make_record()
+    expected = whole_record_features(record, window, hop)
+    streamed = pd.concat(stream_features(chunked(record, chunk_size), SAMPLING_RATE, window, hop, BANDS),
+                         ignore_index=True)
+    assert list(streamed.columns) == list(expected.columns)
+    pd.testing.assert_frame_equal(streamed, expected, rtol=1e-9, atol=1e-12)
+
+def test_stick_slip_energy_is_in_its_band():
+    features = pd.concat(stream_features([make_record()], SAMPLING_RATE, 400, 200, BANDS), ignore_index=True)
+    loaded = features[features["u_valid_fraction"] == 1]
+    # Mean square of a 0.5 amplitude sine: 0.125, up to the noise and the window leakage
+    np.testing.assert_allclose(loaded["Ft_band_5_20Hz"], 0.125, rtol=0.1)
+    assert np.all(loaded["Ft_band_20_50Hz"] < 0.02 * loaded["Ft_band_5_20Hz"])
+    assert features["u_valid_fraction"].iloc[0] == 250 / 400  # Unloaded over the first 150 samples
+
+def test_extract_features_from_a_file(tmp_path):
+    record = make_record(2000)
+    file_path = os.path.join(tmp_path, "run.csv")
+    record.to_csv(file_path, index=False)
+    table = extract_features(file_path, window_seconds=1.0, hop_seconds=0.5, bands=BANDS,
+                             sampling_rate=SAMPLING_RATE, chunk_size=333)
+
+    # The loader stores the forces in float32
+    stored = record.astype({"Fn": np.float32, "Ft": np.float32})
+    pd.testing.assert_frame_equal(table, whole_record_features(stored, 200, 100), rtol=1e-9, atol=1e-12)
+
+def test_merged_statistics_match_numpy():
+    rng = np.random.default_rng(1)
+    groups = [rng.standard_normal(size) for size in (5, 1, 12, 7)]
+    count = np.array([len(group) for group in groups])
+    mean = np.array([group.mean() for group in groups])
+    m2 = np.array([((group - group.mean())**2).sum() for group in groups])
+    total, merged_mean, merged_m2 = merge_statistics(count, mean, m2)
+    values = np.concatenate(groups)
+    assert total == len(values)
+    assert np.isclose(merged_mean, values.mean()) and np.isclose(merged_m2 / (total - 1), values.var(ddof=1))
+
+def test_window_must_be_a_multiple_of_hop():
+    with pytest.raises(ValueError, match="multiple"):
+        next(stream_features([make_record()], SAMPLING_RATE, 150, 100))
@@ -0,0 +1,91 @@
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import tribology_io
+from tribology_io import COLUMNS, cache_file, iter_test_chunks, load_test, parse_test
+
+def write_test(file_path, n_samples=1000, seed=0):
+    # A tribometer export: Time, Fn and Ft plus a column the loader ignores
+    rng = np.random.default_rng(seed)
+    data = pd.DataFrame({
+        "Time": np.arange(n_samples) / 1000 + 3600.0,
+        "Fn": 10 + rng.standard_normal(n_samples),
+        "Ft": 2 + rng.standard_normal(n_samples),
+        "Temperature": np.full(n_samples, 21.5),
+    })
+    data.to_csv(file_path, index=False)
+    return data
+
+def assert_loaded(loaded, data):
+    assert list(loaded.columns) == list(COLUMNS)
+    assert dict(loaded.dtypes) == {name: np.dtype(dtype) for name, dtype in COLUMNS.items()}
+    np.testing.assert_array_equal(loaded["Time"], data["Time"])
+    np.testing.assert_allclose(loaded["Fn"], data["Fn"], rtol=1e-7)
+
+def test_repeated_headers_are_dropped(tmp_path):
+    file_path = os.path.join(tmp_path, "run.csv")
+    data = write_test(file_path, 10)
+    with open(file_path) as file:
+        lines = file.readlines()
+    with open(file_path, "w") as file:
+        file.writelines(lines[:5] + [lines[0]] + lines[5:])
+    assert_loaded(parse_test(file_path), data)
+
+def test_parquet_round_trip(tmp_path, monkeypatch):
+    pytest.importorskip("pyarrow")
+    file_path = os.path.join(tmp_path, "run.csv")
+    data = write_test(file_path)
+    assert_loaded(load_test(file_path), data)
+    assert os.path.exists(cache_file(file_path))
+
+    def no_parsing(file_path):
+        raise AssertionError("The cached test was parsed again")
+
+    monkeypatch.setattr(tribology_io, "parse_test", no_parsing)
+    assert_loaded(load_test(file_path), data)
+
+def test_updated_tests_replace_only_their_own_cache(tmp_path):
+    pytest.importorskip("pyarrow")
+    file_path, other_path = os.path.join(tmp_path, "run.csv"), os.path.join(tmp_path, "run-2.csv")
+    write_test(file_path)
+    write_test(other_path, seed=1)
+    load_test(file_path)
+    load_test(other_path)
+    stale_path, other_cache = cache_file(file_path), cache_file(other_path)
+
+    data = write_test(file_path, 1200, seed=2)
+    assert_loaded(load_test(file_path), data)
+    assert not os.path.exists(stale_path)
+    assert os.path.exists(other_cache)
+    assert sorted(os.listdir(os.path.dirname(stale_path))) == sorted(
+        os.path.basename(path) for path in (cache_file(file_path), other_cache)
+    )
+
+def test_chunks_write_and_then_read_the_cache(tmp_path):
+    pytest.importorskip("pyarrow")
+    file_path = os.path.join(tmp_path, "run.csv")
+    data = write_test(file_path)
+    for _ in range(2):  # From the CSV, then from the Parquet cache
+        chunks = list(iter_test_chunks(file_path, chunk_size=300))
+        assert [len(chunk) for chunk in chunks] == [300, 300, 300, 100]
+        assert_loaded(pd.concat(chunks, ignore_index=True), data)
+        assert os.path.exists(cache_file(file_path))
+
+def test_abandoned_chunks_leave_no_cache(tmp_path):
+    pytest.importorskip("pyarrow")
+    file_path = os.path.join(tmp_path, "run.csv")
+    write_test(file_path)
+    chunks = iter_test_chunks(file_path, chunk_size=300)
+    next(chunks)
+    chunks.close()
+    assert os.listdir(os.path.join(tmp_path, tribology_io.CACHE_DIR_NAME)) == []
+
+def test_without_cache(tmp_path):
+    file_path = os.path.join(tmp_path, "run.csv")
+    data = write_test(file_path)
+    assert_loaded(load_test(file_path, use_cache=False), data)
+    assert_loaded(pd.concat(iter_test_chunks(file_path, 400, use_cache=False), ignore_index=True), data)
+    assert os.listdir(tmp_path) == ["run.csv"]
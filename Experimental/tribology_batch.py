@@ -0,0 +1,129 @@
+import argparse
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from tribology_io import MIN_NORMAL_FORCE, list_test_files, load_test
+
+# Points per plotted curve: longer series are reduced to the min/max of equal buckets, which
+# keeps the peaks visible and the rendering time independent of the test duration
+MAX_PLOT_POINTS = 20000
+
+def friction_coefficient(data, min_normal_force=MIN_NORMAL_FORCE):
+    # u = Ft / Fn, NaN where the pin is unloaded
+    return (data["Ft"] / data["Fn"]).where(data["Fn"].abs() >= min_normal_force)
+
+def summarize_test(data, u):
+    # Summary statistics of one test (u ignores the unloaded samples)
+    return {
+        "samples": len(data),
+        "duration": data["Time"].iloc[-1] - data["Time"].iloc[0] if len(data) else np.nan,
+        "Fn_mean": data["Fn"].mean(),
+        "Ft_mean": data["Ft"].mean(),
+        "u_mean": u.mean(),
+        "u_std": u.std(),
+        "u_median": u.median(),
+        "u_p05": u.quantile(0.05),
+        "u_p95": u.quantile(0.95),
+        "u_max": u.max(),
+    }
+
+def _envelope(time, values, max_points=MAX_PLOT_POINTS):
+    # Min/max envelope of values in max_points / 2 buckets, interleaved in time order
+    n = len(values)
+    if n <= max_points:
+        return time, values
+    size = int(np.ceil(n / (max_points // 2)))
+    buckets = n // size
+    values = values[:buckets * size].reshape(buckets, size)
+    time = time[:buckets * size].reshape(buckets, size)
+    rows = np.arange(buckets)[:, None]
+    # NaN (unloaded) samples are skipped; an all-NaN bucket plots as a gap
+    missing = np.isnan(values)
+    lowest = np.argmin(np.where(missing, np.inf, values), axis=1)
+    highest = np.argmax(np.where(missing, -np.inf, values), axis=1)
+    order = np.sort(np.stack([lowest, highest], axis=1), axis=1)
+    return time[rows, order].ravel(), values[rows, order].ravel()
+
+def plot_test(data, u, sample_no, output_dir, title_suffix=""):
+    """Writes the normal force, tangent force and friction coefficient plots of a test."""
+    import matplotlib
+    matplotlib.use("Agg")  # Workers write files and never open windows
+    import matplotlib.pyplot as plt
+
+    time = data["Time"].to_numpy()
+    for name, values, ylabel, title in (
+        ("normal_force", data["Fn"].to_numpy(), "Force (N)", "Normal force"),
+        ("tangent_force", data["Ft"].to_numpy(), "Force (N)", "Tangent force"),
+        ("friction_coefficient", u.to_numpy(), "Friction Coefficient", "Friction Coefficient"),
+    ):
+        if np.all(np.isnan(values)):
+            continue
+        figure = plt.figure(figsize=(10, 5))
+        plt.plot(*_envelope(time, values), label=sample_no)
+        plt.xlabel('Time (s)')
+        plt.ylabel(ylabel)
+        plt.grid()
+        plt.title(f'Test {sample_no}: {title}{title_suffix}')
+        figure.savefig(os.path.join(output_dir, f"{sample_no}_{name}.png"), dpi=100)
+        plt.close(figure)
+
+def process_test(file_path, output_dir, start_time=None, stop_time=None, plots=True):
+    """
+    Runs in a worker process: loads one test, restricted to [start_time, stop_time] if
+    given, computes its friction coefficient and summary, and writes its figures.
+
+    Returns:
+        dict: One row of the summary table.
+    """
+    sample_no = os.path.splitext(os.path.basename(file_path))[0]
+    data = load_test(file_path)
+    title_suffix = ""
+    if start_time is not None or stop_time is not None:
+        low = -np.inf if start_time is None else start_time
+        high = np.inf if stop_time is None else stop_time
+        data = data[(data["Time"] >= low) & (data["Time"] <= high)]
+        title_suffix = f" ({start_time}s to {stop_time}s)"
+
+    u = friction_coefficient(data)
+    if plots:
+        plot_test(data, u, sample_no, output_dir, title_suffix)
+    return {"test": sample_no, **summarize_test(data, u)}
+
+def process_tests(file_paths, output_dir, max_workers=None, start_time=None, stop_time=None, plots=True):
+    """
+    Processes the tests in parallel, one task per test, and writes summary.csv to output_dir.
+
+    Returns:
+        pandas.DataFrame: One row per test, in the order of file_paths.
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    workers = min(max_workers or os.cpu_count() or 1, max(len(file_paths), 1))
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = [
+            executor.submit(process_test, path, output_dir, start_time, stop_time, plots) for path in file_paths
+        ]
+        summary = pd.DataFrame([future.result() for future in futures])
+    summary.to_csv(os.path.join(output_dir, "summary.csv"), index=False)
+    return summary
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Batch processing of the tribology tests of a directory.")
+    parser.add_argument("data_path", help="Directory with the test CSV files")
+    parser.add_argument("-o", "--output", default="tribology_results", help="Directory for the figures and summary.csv")
+    parser.add_argument("-j", "--workers", type=int, default=None, help="Worker processes (default: number of CPUs)")
+    parser.add_argument("--start", type=float, default=None, help="Start time (s) of the analysed interval")
+    parser.add_argument("--stop", type=float, default=None, help="Stop time (s) of the analysed interval")
+    parser.add_argument("--no-plots", action="store_true", help="Only compute the summary table")
+    args = parser.parse_args(argv)
+
+    file_paths = list_test_files(args.data_path)
+    if not file_paths:
+        parser.error(f"No .csv files in {args.data_path}")
+    summary = process_tests(file_paths, args.output, args.workers, args.start, args.stop, not args.no_plots)
+    print(summary.to_string(index=False))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,176 @@
+import numpy as np
+import pandas as pd
+
+from tribology_io import MIN_NORMAL_FORCE, iter_test_chunks
+
+# Edges (Hz) of the frequency bands of the force spectra; None is the Nyquist frequency
+DEFAULT_BANDS = (0, 5, 20, 50, None)
+
+def _block_statistics(values):
+    # Count, mean and sum of squared deviations (Welford's M2) of every row, ignoring NaN
+    valid = ~np.isnan(values)
+    count = valid.sum(axis=1)
+    mean = np.where(valid, values, 0).sum(axis=1) / np.maximum(count, 1)
+    m2 = np.where(valid, (values - mean[:, None])**2, 0).sum(axis=1)
+    return count, mean, m2
+
+def merge_statistics(count, mean, m2):
+    """
+    Chan's parallel form of Welford's update: merges groups of partial statistics along the
+    last axis into the count, mean and M2 of their union (M2 / (count - 1) is the variance).
+    """
+    total = count.sum(axis=-1)
+    merged_mean = (count * mean).sum(axis=-1) / np.maximum(total, 1)
+    merged_m2 = m2.sum(axis=-1) + (count * (mean - merged_mean[..., None])**2).sum(axis=-1)
+    return total, merged_mean, merged_m2
+
+def _band_energies(frames, sampling_rate, bands):
+    # Mean square of the detrended frames in every band: the Hann-windowed periodogram,
+    # one-sided and integrated over the band
+    window = np.hanning(frames.shape[-1])
+    spectra = np.fft.rfft((frames - frames.mean(axis=-1, keepdims=True)) * window, axis=-1)
+    power = np.abs(spectra)**2 * 2 / (sampling_rate * np.sum(window**2)) * (sampling_rate / frames.shape[-1])
+    frequencies = np.fft.rfftfreq(frames.shape[-1], 1 / sampling_rate)
+    edges = [sampling_rate / 2 if edge is None else edge for edge in bands]
+    return [
+        power[..., (frequencies >= low) & (frequencies < high)].sum(axis=-1) for low, high in zip(edges[:-1], edges[1:])
+    ]
+
+def _band_name(low, high):
+    return f"{low}_{'nyquist' if high is None else high}Hz"
+
+def stream_features(chunks, sampling_rate, window, hop, bands=DEFAULT_BANDS, min_normal_force=MIN_NORMAL_FORCE):
+    """
+    Sliding-window features of one test stream, computed in a single pass over its chunks.
+
+    The samples are grouped in blocks of hop samples. Every block is reduced once to its
+    count/mean/M2 of the friction coefficient u = Ft / Fn (NaN where the pin is unloaded),
+    the sums of squares and maxima of the force increments and the mean normal force; the
+    windows of window = k * hop samples merge k consecutive blocks with Chan's formula.
+    Only the last k - 1 blocks, the last window - hop samples (for the spectra) and an
+    incomplete block are carried between chunks, so the memory does not grow with the run.
+    The increments never cross the start of the stream, and a final incomplete block is
+    dropped.
+
+    Parameters:
+        chunks (iterable): Consecutive DataFrames with Time, Fn and Ft (e.g. iter_test_chunks).
+        sampling_rate (float): Sampling rate in Hz.
+        window, hop (int): Window length and hop in samples, window a multiple of hop.
+        bands (tuple): Band edges in Hz of the short-time spectra of Fn and Ft.
+        min_normal_force (float): Smallest |Fn| (N) with a friction coefficient.
+
+    Yields:
+        pandas.DataFrame: The windows completed by every chunk, one row each.
+    """
+    if window % hop:
+        raise ValueError("window must be a multiple of hop")
+    k = window // hop
+    pending = np.empty((0, 3))
+    previous = np.full(2, np.nan)
+    history = None
+    frame_tail = np.empty((0, 2))
+
+    for chunk in chunks:
+        samples = np.concatenate([pending, chunk[["Time", "Fn", "Ft"]].to_numpy(dtype=float)])
+        n_blocks = len(samples) // hop
+        pending = samples[n_blocks * hop:]
+        if not n_blocks:
+            continue
+        samples = samples[:n_blocks * hop]
+        time, forces = samples[:, 0], samples[:, 1:]
+
+        # Per-block statistics
+        u = forces[:, 1] / forces[:, 0]
+        u[np.abs(forces[:, 0]) < min_normal_force] = np.nan
+        increments = np.diff(np.vstack([previous, forces]), axis=0)
+        previous = forces[-1]
+        increment_count = (~np.isnan(increments[:, 0])).reshape(n_blocks, hop).sum(axis=1)
+        increment_squares = np.nan_to_num(increments**2).reshape(n_blocks, hop, 2).sum(axis=1)
+        increment_max = np.nan_to_num(np.abs(increments)).reshape(n_blocks, hop, 2).max(axis=1)
+        blocks = {
+            "start": time[::hop],
+            "end": time[hop - 1::hop],
+            "u": np.stack(_block_statistics(u.reshape(n_blocks, hop)), axis=-1),
+            "increment_count": increment_count,
+            "increment_squares": increment_squares,
+            "increment_max": increment_max,
+            "Fn_sum": forces[:, 0].reshape(n_blocks, hop).sum(axis=1),
+        }
+        blocks = blocks if history is None else {name: np.concatenate([history[name], blocks[name]]) for name in blocks}
+        history = {name: values[max(len(values) - (k - 1), 0):] for name, values in blocks.items()}
+
+        # Short-time spectra of the frames ending at the new blocks
+        signal = np.concatenate([frame_tail, forces])
+        frame_tail = signal[max(len(signal) - (window - hop), 0):]
+        if len(blocks["start"]) < k:
+            continue
+        frames = np.lib.stride_tricks.sliding_window_view(signal, window, axis=0)[::hop]
+
+        # Windows: k consecutive blocks
+        def windows(values):
+            return np.lib.stride_tricks.sliding_window_view(values, k, axis=0)
+
+        count, mean, m2 = merge_statistics(*np.moveaxis(windows(blocks["u"]), 1, 0))
+        n_increments = windows(blocks["increment_count"]).sum(axis=-1)
+        rms = np.sqrt(windows(blocks["increment_squares"]).sum(axis=-1) / np.maximum(n_increments, 1)[:, None])
+        features = {
+            "t_start": windows(blocks["start"])[:, 0],
+            "t_end": windows(blocks["end"])[:, -1],
+            "Fn_mean": windows(blocks["Fn_sum"]).sum(axis=-1) / window,
+            "u_mean": np.where(count > 0, mean, np.nan),
+            "u_std": np.sqrt(m2 / np.where(count > 1, count - 1, np.nan)),
+            "u_valid_fraction": count / window,
+            "dFn_rms": rms[:, 0],
+            "dFt_rms": rms[:, 1],
+            "dFn_max": windows(blocks["increment_max"]).max(axis=-1)[:, 0],
+            "dFt_max": windows(blocks["increment_max"]).max(axis=-1)[:, 1],
+        }
+        for column, name in enumerate(("Fn", "Ft")):
+            energies = _band_energies(frames[:, column], sampling_rate, bands)
+            for (low, high), energy in zip(zip(bands[:-1], bands[1:]), energies):
+                features[f"{name}_band_{_band_name(low, high)}"] = energy
+        yield pd.DataFrame(features)
+
+def extract_features(file_path, window_seconds=1.0, hop_seconds=0.5, bands=DEFAULT_BANDS, sampling_rate=None,
+                     chunk_size=1_000_000):
+    """
+    Per-window feature table of one test, streamed through iter_test_chunks.
+
+    Parameters:
+        file_path (str): Path of the test CSV.
+        window_seconds, hop_seconds (float): Window length and hop (the window is rounded to a
+            whole number of hops).
+        bands (tuple): Band edges in Hz of the force spectra.
+        sampling_rate (float): Sampling rate in Hz (defaults to the median time step of the
+            first chunk).
+        chunk_size (int): Rows read at a time.
+
+    Returns:
+        pandas.DataFrame: One row per window (see stream_features).
+    """
+    chunks = iter_test_chunks(file_path, chunk_size)
+    first = next(chunks, None)
+    if first is None:
+        return pd.DataFrame()
+    if sampling_rate is None:
+        sampling_rate = 1 / np.median(np.diff(first["Time"].to_numpy()))
+    hop = max(1, int(round(hop_seconds * sampling_rate)))
+    window = hop * max(1, int(round(window_seconds / hop_seconds)))
+
+    def all_chunks():
+        yield first
+        yield from chunks
+
+    frames = list(stream_features(all_chunks(), sampling_rate, window, hop, bands))
+    return pd.concat(frames, ignore_index=True) if frames else pd.DataFrame()
+
+if __name__ == "__main__":
+    import sys
+    import time
+
+    # Usage: python tribology_features.py <test CSV> [<test CSV> ...]
+    for path in sys.argv[1:]:
+        start = time.perf_counter()
+        table = extract_features(path)
+        print(f"{path}: {len(table)} windows in {time.perf_counter() - start:.2f} s")
+        print(table.head().to_string(index=False))
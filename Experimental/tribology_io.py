@@ -0,0 +1,167 @@
+import glob
+import os
+import re
+
+import numpy as np
+import pandas as pd
+
+# Columns of the tribometer exports and their types: the forces in float32 (half the memory,
+# still far below the resolution of the load cells), the time in float64, whose increments
+# would be rounded in float32 after a few hours at high sampling rates
+COLUMNS = {"Time": np.float64, "Fn": np.float32, "Ft": np.float32}
+
+# Name of the cache directory, created next to the CSV files
+CACHE_DIR_NAME = "parquet_cache"
+
+# Samples with a smaller normal force (N) have no meaningful friction coefficient (unloaded
+# pin at the start and end of a test)
+MIN_NORMAL_FORCE = 0.1
+
+def _parquet_available():
+    try:
+        import pyarrow  # noqa: F401 (pandas' Parquet engine)
+    except ImportError:
+        return False
+    return True
+
+def list_test_files(data_path):
+    # Every test export (.csv) of a directory, in name order
+    return sorted(glob.glob(os.path.join(data_path, "*.csv")))
+
+def _coerce(data):
+    # Non-numeric entries (e.g. a repeated header) become NaN and their rows are dropped
+    data = data.apply(pd.to_numeric, errors="coerce").dropna().reset_index(drop=True)
+    return data.astype(COLUMNS)
+
+def parse_test(file_path):
+    """
+    Parses one tribometer CSV with explicit column types. Files with non-numeric entries
+    (e.g. a repeated header) are parsed as text, coerced, and the incomplete rows dropped.
+    """
+    try:
+        return pd.read_csv(file_path, usecols=list(COLUMNS), dtype=COLUMNS)
+    except ValueError:
+        return _coerce(pd.read_csv(file_path, usecols=list(COLUMNS), dtype=str))
+
+def cache_file(file_path, cache_dir=None):
+    # Cache file of a CSV, keyed on its size and modification time: editing or replacing the
+    # CSV changes the name, so a stale cache is never read
+    stat = os.stat(file_path)
+    cache_dir = cache_dir or os.path.join(os.path.dirname(os.path.abspath(file_path)), CACHE_DIR_NAME)
+    name = os.path.splitext(os.path.basename(file_path))[0]
+    return os.path.join(cache_dir, f"{name}-{stat.st_size}-{stat.st_mtime_ns}.parquet")
+
+def _prepare_cache(cached_path):
+    # Creates the cache directory and removes the caches of older versions of the same file.
+    # Only "<stem>-<size>-<mtime>.parquet" matches, so the caches of "run-2.csv" survive an
+    # update of "run.csv"
+    cache_dir = os.path.dirname(cached_path)
+    os.makedirs(cache_dir, exist_ok=True)
+    stem = os.path.basename(cached_path).rsplit("-", 2)[0]
+    pattern = re.compile(rf"^{re.escape(stem)}-\d+-\d+\.parquet$")
+    for name in os.listdir(cache_dir):
+        if pattern.match(name):
+            os.remove(os.path.join(cache_dir, name))
+
+def load_test(file_path, cache_dir=None, use_cache=True):
+    """
+    Time, Fn and Ft of one tribology test.
+
+    The first call parses the CSV and writes a zstd-compressed Parquet copy; later calls read
+    the columnar copy directly, which is typed already and several times faster than parsing
+    the text. Without pyarrow the CSV is parsed every time.
+
+    Parameters:
+        file_path (str): Path of the test CSV.
+        cache_dir (str): Cache directory (defaults to parquet_cache next to the CSV).
+        use_cache (bool): Read and write the Parquet cache.
+
+    Returns:
+        pandas.DataFrame: Columns Time (float64), Fn and Ft (float32).
+    """
+    if not (use_cache and _parquet_available()):
+        return parse_test(file_path)
+
+    cached_path = cache_file(file_path, cache_dir)
+    if os.path.exists(cached_path):
+        return pd.read_parquet(cached_path)
+
+    data = parse_test(file_path)
+    _prepare_cache(cached_path)
+
+    # Written under a temporary name and renamed, so an interrupted run leaves no partial cache
+    temporary_path = f"{cached_path}.{os.getpid()}.tmp"
+    data.to_parquet(temporary_path, engine="pyarrow", compression="zstd", index=False)
+    os.replace(temporary_path, cached_path)
+    return data
+
+def iter_test_chunks(file_path, chunk_size=1_000_000, cache_dir=None, use_cache=True):
+    """
+    Streams one test in blocks of at most chunk_size rows, with the types of load_test, so
+    runs of any length are processed in bounded memory.
+
+    A cached test is read batch by batch from its Parquet file. Otherwise the CSV is parsed
+    chunk by chunk, and (with pyarrow) every chunk is also appended to a new Parquet cache,
+    which is only published once the whole file has been read.
+
+    Yields:
+        pandas.DataFrame: Consecutive blocks with the columns Time, Fn and Ft.
+    """
+    parquet = use_cache and _parquet_available()
+    cached_path = cache_file(file_path, cache_dir) if parquet else None
+    if parquet and os.path.exists(cached_path):
+        import pyarrow.parquet as pq
+
+        for batch in pq.ParquetFile(cached_path).iter_batches(batch_size=chunk_size):
+            yield batch.to_pandas()
+        return
+
+    writer = None
+    if parquet:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        _prepare_cache(cached_path)
+        temporary_path = f"{cached_path}.{os.getpid()}.tmp"
+        schema = pa.schema([(name, pa.from_numpy_dtype(dtype)) for name, dtype in COLUMNS.items()])
+        writer = pq.ParquetWriter(temporary_path, schema, compression="zstd")
+    try:
+        for chunk in pd.read_csv(file_path, usecols=list(COLUMNS), chunksize=chunk_size):
+            chunk = _coerce(chunk)
+            if writer is not None:
+                writer.write_table(pa.Table.from_pandas(chunk, schema=schema, preserve_index=False))
+            yield chunk
+    except BaseException:
+        # Interrupted (or abandoned by the consumer): no partial cache is left behind
+        if writer is not None:
+            writer.close()
+            os.remove(temporary_path)
+        raise
+    if writer is not None:
+        writer.close()
+        os.replace(temporary_path, cached_path)
+
+def load_tests(data_path, files_names=None, cache_dir=None):
+    """
+    Loads several tests (by default every CSV of data_path).
+
+    Returns:
+        dict: Test name (file name without .csv) -> DataFrame, in the order of files_names.
+    """
+    if files_names is None:
+        paths = list_test_files(data_path)
+    else:
+        paths = [os.path.join(data_path, name) for name in files_names]
+    return {os.path.splitext(os.path.basename(path))[0]: load_test(path, cache_dir) for path in paths}
+
+if __name__ == "__main__":
+    import sys
+    import time
+
+    # Usage: python tribology_io.py <directory with the test CSVs>
+    data_path = sys.argv[1] if len(sys.argv) > 1 else "."
+    for path in list_test_files(data_path):
+        start = time.perf_counter()
+        data = load_test(path)
+        print(f"{os.path.basename(path)}: {len(data)} rows, {data.memory_usage(deep=True).sum() / 1e6:.1f} MB "
+              f"in {time.perf_counter() - start:.3f} s")
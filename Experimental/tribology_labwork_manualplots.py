@@ -1,6 +1,7 @@
 import os
 import matplotlib.pyplot as plt
-import pandas as pd
+
+from tribology_io import load_test
 
 # Define the base data path
 data_path = r'F:\Documents\Personal development\Master\Courses\Experimental mechanics\Labwork\Tribology tests\Data\csv'
@@ -13,8 +14,8 @@ for file_name in files_names:
     # Construct the full path to the file
     file_path = os.path.join(data_path, file_name)
 
-    # Read the CSV file into a DataFrame
-    data_pd = pd.read_csv(file_path)
+    # Read the test (parsed once with explicit types, then from the Parquet cache)
+    data_pd = load_test(file_path)
 
     # Get the sample number from the file name
     sample_no = file_name.replace('.csv', '')
@@ -0,0 +1,310 @@
+"""
+Reader for Gmsh MSH 4.1 files (ASCII and binary) that does not need the gmsh runtime.
+
+Sections are read in bulk: ASCII sections are split once and converted with a single
+NumPy call, and binary files are memory-mapped, so node and element blocks become array
+views instead of being parsed line by line.
+
+Usage:
+    msh = read_msh("solar_panel.msh")
+    msh["physical_groups"][(2, 1)][2]   # Triangles (type 2) of physical surface 1, as node tags
+    mesh = to_triangle_mesh(msh)        # TriangleMesh with the physical surface of every element
+"""
+import mmap
+import os
+import sys
+
+import numpy as np
+
+# Number of nodes of the Gmsh element types
+NODES_PER_ELEMENT = {
+    1: 2,    # 2-node line
+    2: 3,    # 3-node triangle
+    3: 4,    # 4-node quadrangle
+    4: 4,    # 4-node tetrahedron
+    5: 8,    # 8-node hexahedron
+    6: 6,    # 6-node prism
+    7: 5,    # 5-node pyramid
+    8: 3,    # 3-node line
+    9: 6,    # 6-node triangle
+    10: 9,   # 9-node quadrangle
+    11: 10,  # 10-node tetrahedron
+    15: 1,   # 1-node point
+    16: 8,   # 8-node quadrangle
+    17: 20,  # 20-node hexahedron
+}
+
+
+class _Buffer:
+    # Sequential reader over the file contents (bytes or a read-only mmap)
+
+    def __init__(self, data):
+        self.data = data
+        self.position = 0
+
+    def line(self):
+        end = self.data.find(b"\n", self.position)
+        end = len(self.data) if end < 0 else end
+        text = bytes(self.data[self.position:end]).decode().strip()
+        self.position = end + 1
+        return text
+
+    def section_text(self, name):
+        # Text up to the end marker of an ASCII section
+        end = self.data.find(b"$End" + name.encode(), self.position)
+        if end < 0:
+            raise ValueError(f"Section ${name} is not terminated")
+        text = bytes(self.data[self.position:end])
+        self.position = end
+        return text
+
+    def array(self, dtype, count):
+        values = np.frombuffer(self.data, dtype=dtype, count=count, offset=self.position)
+        self.position += values.nbytes
+        return values
+
+    def skip_to_end(self, name):
+        end = self.data.find(b"$End" + name.encode(), self.position)
+        if end < 0:
+            raise ValueError(f"Section ${name} is not terminated")
+        self.position = end
+        self.line()
+
+
+def _read_physical_names(buffer):
+    # Always ASCII: count, then "dim tag "name"" lines
+    names = {}
+    for _ in range(int(buffer.line())):
+        dim, tag, name = buffer.line().split(maxsplit=2)
+        names[(int(dim), int(tag))] = name.strip('"')
+    return names
+
+
+def _read_entities_ascii(buffer):
+    tokens = buffer.section_text("Entities").split()
+    position = 4
+    counts = [int(token) for token in tokens[:4]]
+    entity_physical_tags = {}
+    for dim, count in enumerate(counts):
+        for _ in range(count):
+            tag = int(tokens[position])
+            position += 4 if dim == 0 else 7  # Point coordinates or bounding box
+            num_physical = int(tokens[position])
+            entity_physical_tags[(dim, tag)] = [int(t) for t in tokens[position + 1:position + 1 + num_physical]]
+            position += 1 + num_physical
+            if dim > 0:
+                position += 1 + int(tokens[position])  # Bounding entities
+    return entity_physical_tags
+
+
+def _read_entities_binary(buffer, size_t):
+    counts = buffer.array(size_t, 4)
+    entity_physical_tags = {}
+    for dim, count in enumerate(counts):
+        for _ in range(int(count)):
+            tag = int(buffer.array("<i4", 1)[0])
+            buffer.array("<f8", 3 if dim == 0 else 6)
+            num_physical = int(buffer.array(size_t, 1)[0])
+            entity_physical_tags[(dim, tag)] = buffer.array("<i4", num_physical).tolist()
+            if dim > 0:
+                buffer.array("<i4", int(buffer.array(size_t, 1)[0]))
+    return entity_physical_tags
+
+
+def _read_nodes_ascii(buffer):
+    values = np.array(buffer.section_text("Nodes").split(), dtype=np.float64)
+    num_blocks, num_nodes = int(values[0]), int(values[1])
+    node_tags = np.empty(num_nodes, dtype=np.int64)
+    coordinates = np.empty((num_nodes, 3))
+    position, start = 4, 0
+    for _ in range(num_blocks):
+        dim, parametric, count = int(values[position]), int(values[position + 2]), int(values[position + 3])
+        position += 4
+        node_tags[start:start + count] = values[position:position + count]
+        position += count
+        width = 3 + (dim if parametric else 0)
+        coordinates[start:start + count] = values[position:position + count * width].reshape(count, width)[:, :3]
+        position += count * width
+        start += count
+    return node_tags, coordinates
+
+
+def _read_nodes_binary(buffer, size_t):
+    num_blocks, num_nodes, _, _ = (int(value) for value in buffer.array(size_t, 4))
+    node_tags = np.empty(num_nodes, dtype=np.int64)
+    coordinates = np.empty((num_nodes, 3))
+    start = 0
+    for _ in range(num_blocks):
+        dim, _, parametric = buffer.array("<i4", 3)
+        count = int(buffer.array(size_t, 1)[0])
+        node_tags[start:start + count] = buffer.array(size_t, count)
+        width = 3 + (int(dim) if parametric else 0)
+        coordinates[start:start + count] = buffer.array("<f8", count * width).reshape(count, width)[:, :3]
+        start += count
+    return node_tags, coordinates
+
+
+def _element_block(dim, entity_tag, element_type, data):
+    if element_type not in NODES_PER_ELEMENT:
+        raise ValueError(f"Unsupported element type {element_type}")
+    data = data.reshape(-1, 1 + NODES_PER_ELEMENT[element_type])
+    return {
+        "dim": dim,
+        "entity_tag": entity_tag,
+        "element_type": element_type,
+        "element_tags": data[:, 0],
+        "node_tags": data[:, 1:],
+    }
+
+
+def _read_elements_ascii(buffer):
+    values = np.array(buffer.section_text("Elements").split(), dtype=np.int64)
+    blocks = []
+    position = 4
+    for _ in range(int(values[0])):
+        dim, entity_tag, element_type, count = (int(value) for value in values[position:position + 4])
+        position += 4
+        size = count * (1 + NODES_PER_ELEMENT.get(element_type, 0))
+        blocks.append(_element_block(dim, entity_tag, element_type, values[position:position + size]))
+        position += size
+    return blocks
+
+
+def _read_elements_binary(buffer, size_t):
+    num_blocks = int(buffer.array(size_t, 4)[0])
+    blocks = []
+    for _ in range(num_blocks):
+        dim, entity_tag, element_type = (int(value) for value in buffer.array("<i4", 3))
+        count = int(buffer.array(size_t, 1)[0])
+        size = count * (1 + NODES_PER_ELEMENT.get(element_type, 0))
+        blocks.append(_element_block(dim, entity_tag, element_type, buffer.array(size_t, size)))
+    return blocks
+
+
+def _group_by_physical_tag(blocks, entity_physical_tags):
+    # {(dim, physical_tag): {element_type: node tags}}, concatenating the entity blocks
+    parts = {}
+    for block in blocks:
+        for physical_tag in entity_physical_tags.get((block["dim"], block["entity_tag"]), []):
+            key = (block["dim"], physical_tag)
+            parts.setdefault(key, {}).setdefault(block["element_type"], []).append(block["node_tags"])
+    return {
+        key: {element_type: np.concatenate(arrays).astype(np.int64) for element_type, arrays in types.items()}
+        for key, types in parts.items()
+    }
+
+
+def read_msh(file_path, memory_map=True):
+    """
+    Reads a Gmsh MSH 4.1 file.
+
+    Parameters:
+        file_path (str): Path to the .msh file (ASCII or binary, version 4.1).
+        memory_map (bool): If True, binary files are memory-mapped and node/element blocks
+            are read as views of the mapping; otherwise the file is read into memory.
+
+    Returns:
+        dict: Mesh data:
+            - "node_tags": Tag of every node, shape (num_nodes,).
+            - "coordinates": Node coordinates [x, y, z], shape (num_nodes, 3).
+            - "element_blocks": One dict per element block with "dim", "entity_tag",
+              "element_type", "element_tags" and "node_tags" (num_elements, nodes per element).
+            - "physical_names": Name of every physical group, keyed by (dim, tag).
+            - "entity_physical_tags": Physical tags of every entity, keyed by (dim, tag).
+            - "physical_groups": Element node tags of every physical group, keyed by
+              (dim, physical_tag) and then by element type.
+    """
+    with open(file_path, "rb") as file:
+        if memory_map:
+            data = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        else:
+            data = file.read()
+
+    buffer = _Buffer(data)
+    if buffer.line() != "$MeshFormat":
+        raise ValueError(f"{file_path} is not a Gmsh mesh file")
+    version, file_type, data_size = buffer.line().split()
+    if not version.startswith("4.1"):
+        raise ValueError(f"Unsupported MSH version {version} (expected 4.1)")
+    binary = file_type == "1"
+    size_t = {4: "<u4", 8: "<u8"}[int(data_size)]
+    if binary:
+        if buffer.array("<i4", 1)[0] != 1:
+            raise ValueError("Big-endian binary MSH files are not supported")
+        buffer.line()
+    buffer.skip_to_end("MeshFormat")
+
+    msh = {
+        "node_tags": np.empty(0, dtype=np.int64),
+        "coordinates": np.empty((0, 3)),
+        "element_blocks": [],
+        "physical_names": {},
+        "entity_physical_tags": {},
+    }
+    while buffer.position < len(data):
+        header = buffer.line()
+        if not header.startswith("$"):
+            continue
+        name = header[1:]
+        if name == "PhysicalNames":
+            msh["physical_names"] = _read_physical_names(buffer)
+        elif name == "Entities":
+            msh["entity_physical_tags"] = (
+                _read_entities_binary(buffer, size_t) if binary else _read_entities_ascii(buffer)
+            )
+        elif name == "Nodes":
+            msh["node_tags"], msh["coordinates"] = (
+                _read_nodes_binary(buffer, size_t) if binary else _read_nodes_ascii(buffer)
+            )
+        elif name == "Elements":
+            msh["element_blocks"] = _read_elements_binary(buffer, size_t) if binary else _read_elements_ascii(buffer)
+        buffer.skip_to_end(name)
+
+    msh["physical_groups"] = _group_by_physical_tag(msh["element_blocks"], msh["entity_physical_tags"])
+    return msh
+
+
+def to_triangle_mesh(msh, physical_tags=None):
+    """
+    Builds a TriangleMesh from the 3-node triangles of the physical surfaces.
+
+    Parameters:
+        msh (dict): Mesh data from read_msh.
+        physical_tags (list): Physical surfaces to include (defaults to all of them). Without
+            physical groups in the file, all triangles are used and no tags are stored.
+
+    Returns:
+        TriangleMesh: Mesh with 0-based connectivity and the physical tag of every element.
+    """
+    from fem_mesh import TriangleMesh  # Shared with Contact Mechanics, on the path of the entry scripts
+
+    groups = msh["physical_groups"]
+    if physical_tags is None:
+        physical_tags = sorted(tag for dim, tag in groups if dim == 2)
+
+    if not physical_tags:
+        triangles = [block["node_tags"] for block in msh["element_blocks"] if block["element_type"] == 2]
+        return TriangleMesh.from_tags(msh["node_tags"], msh["coordinates"], np.concatenate(triangles))
+
+    triangles = [groups.get((2, tag), {}).get(2, np.empty((0, 3), dtype=np.int64)) for tag in physical_tags]
+    return TriangleMesh.from_tags(
+        msh["node_tags"],
+        msh["coordinates"],
+        np.concatenate(triangles),
+        np.repeat(physical_tags, [len(elements) for elements in triangles]),
+    )
+
+
+if __name__ == "__main__":
+    import time
+
+    default_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "solar_panel.msh")
+    file_path = sys.argv[1] if len(sys.argv) > 1 else default_path
+    start = time.perf_counter()
+    msh = read_msh(file_path)
+    print(f"Read {file_path} in {time.perf_counter() - start:.3f} s: {len(msh['node_tags'])} nodes, "
+          f"{sum(len(block['element_tags']) for block in msh['element_blocks'])} elements")
+    for (dim, tag), types in sorted(msh["physical_groups"].items()):
+        name = msh["physical_names"].get((dim, tag), "")
+        counts = ", ".join(f"{len(nodes)} of type {element_type}" for element_type, nodes in types.items())
+        print(f"Physical group ({dim}, {tag}) {name}: {counts}")
@@ -1,32 +1,34 @@
-import gmsh
-import numpy as np
-
-# Initialize Gmsh and load the mesh
-gmsh.initialize()
-gmsh.open("solar_panel.msh")
-
-# Get all nodes
-node_tags, node_coords, _ = gmsh.model.mesh.getNodes()
-node_coords = np.array(node_coords).reshape(-1, 3)
-
-print("Nodes = ", node_coords.shape)
-
-# Function to get elements of a physical group
-def get_elements_of_physical_group(dim, tag):
-    entity_tags = gmsh.model.getEntitiesForPhysicalGroup(dim, tag)
-    all_elements = []
-    for entity_tag in entity_tags:
-        element_types, element_tags, node_tags = gmsh.model.mesh.getElements(dim, entity_tag)
-        for i in range(len(element_types)):
-            all_elements.append(np.array(node_tags[i]).reshape(-1, 3))
-    return np.concatenate(all_elements) if all_elements else np.array([])
+import os
 
-# Get elements for each physical surface
-elements_surface_1 = get_elements_of_physical_group(2, 1)
-elements_surface_2 = get_elements_of_physical_group(2, 2)
-elements_surface_3 = get_elements_of_physical_group(2, 3)
-
-print(elements_surface_1.shape, elements_surface_2.shape, elements_surface_3.shape)
+import numpy as np
+from scipy import sparse
+from scipy.sparse.linalg import spsolve
+
+from msh_reader import read_msh, to_triangle_mesh
+
+# Thermal conductivity of every physical surface
+CONDUCTIVITIES = {
+  1: 1.0,   # Aluminium support
+  2: 0.1,   # Cells
+  3: 0.01,  # Glass cover
+}
+THICKNESS = 1.0  # Out-of-plane thickness of the 2D model
+
+# Boundary conditions of the panel
+T_SUPPORT = 20.0      # Temperature of the mounting surface (bottom edge)
+IRRADIANCE = 800.0    # Absorbed solar flux on the glass cover
+H_CONVECTION = 10.0   # Convection coefficient of the top surface
+T_AMBIENT = 25.0      # Ambient air temperature
+
+def load_mesh(file_path, physical_tags=tuple(CONDUCTIVITIES)):
+  """
+  Loads a triangle mesh and returns it with the physical surface of every element.
+
+  The surfaces of solar_panel.msh are meshed from duplicated interface curves, so the
+  coincident interface nodes are merged to connect the materials.
+  """
+  mesh = to_triangle_mesh(read_msh(file_path), list(physical_tags))
+  return mesh.merge_coincident_nodes()
 
 def jacobian(coord):
   # compute the jacobian value for a triangle
@@ -77,66 +79,167 @@ def compute_b_matrix(coord):
   B[1,1] = coord[0,0] - coord[0,2]
   B[1,2] = coord[0,1] - coord[0,0]
 
-  B /= (2*jacobian(coord))
+  B /= jacobian(coord)  # the jacobian is already twice the element area
 
   return B
 
-def compute_q(coord):
-  T= np.array([[2], [3], [4]])
+def compute_q(coord, T, conductivity):
+  # Fourier's law q = -k B T for one element, T holds its three nodal temperatures
+  # (element_heat_flux computes it for all elements at once)
   B = compute_b_matrix(coord)
-  q= np.dot(B,T)
+  q = -conductivity * np.dot(B, T)
   return q
 
-def CST(coord, conductivity):
+def CST(coord, conductivity, thickness=THICKNESS):
   B = compute_b_matrix(coord)
 # compute the transpose(B).B, check that size is 3x3
 # use numpy.transpose and numpy.dot
 # multiply by the conductivity value and by the area of the element and also by the thickness!
   s = np.dot(np.transpose(B), B)
-  s *= conductivity
+  s *= conductivity * thickness * abs(jacobian(coord)) / 2
 
+  # Boundary loads are applied on boundary edges (apply_heat_flux, apply_convection and the
+  # nonlinear boundaries of solarpanel_nonlinear.py), so the element load vector stays zero
   p =np.zeros((3))
- # coord is a (2x3) array
- # [[x1 x2 x3]
- #   y1 y2 y3]]
-  if np.any(coord == 0.2, axis=0)[1]: # check whether one node is on the top layer
-
-    print('Found node on the top edge, coordinates are = ', coord)
-
 
   return s,p
 
-# Here we start with the FE process
-# In hands we have:
-# the nodes coordinates: node_coords
-# the connectivity for each material: elements_surface_1, elements_surface_2, elements_surface_3
-
-# Remove all third coordinates (should be zero's!)
-nodes = np.delete(node_coords, 2, 1)
-print("Nodes = ", nodes.shape)
-
-print("Aluminium support = ", elements_surface_1.shape)
-print("Cells = ", elements_surface_2.shape)
-print("Glass cover = ", elements_surface_3.shape)
-
-
-# STEP 1: loop over all the elements and compute the elementary quantities using the "CST" function
-# remark : we do three separate loops (one for each material)
-for element in elements_surface_1:
-  coord = np.transpose(np.vstack((nodes[element[0]], nodes[element[1]], nodes[element[2]])))
-  s, p = CST(coord = coord, conductivity = 1.0)
-  print('elementary stiffness matrix = ', s)
-  break
-
-for element in elements_surface_2:
-  coord = np.transpose(np.vstack((nodes[element[0]], nodes[element[1]], nodes[element[2]])))
-  s, p = CST(coord = coord, conductivity = 0.1)
-  print('elementary stiffness matrix = ', s)
-  break
-
-for element in elements_surface_3:
-  coord = np.transpose(np.vstack((nodes[element[0]], nodes[element[1]], nodes[element[2]])))
-  s, p = CST(coord = coord, conductivity = 0.01)
+def element_conductivities(mesh, conductivities=CONDUCTIVITIES):
+  # Conductivity of every element from its physical surface
+  k = np.zeros(mesh.num_elements)
+  for tag, conductivity in conductivities.items():
+    k[mesh.group(tag)] = conductivity
+  return k
+
+def CST_batch(mesh, conductivities=CONDUCTIVITIES, thickness=THICKNESS):
+  # Vectorized CST: s_e = k_e * t * A_e * B_e^T B_e for all elements at once, shape (n, 3, 3)
+  B = mesh.gradient_matrices
+  k = element_conductivities(mesh, conductivities)
+  return (k * thickness * mesh.areas)[:, None, None] * np.einsum("eki,ekj->eij", B, B)
+
+def assemble_conductance(mesh, conductivities=CONDUCTIVITIES, thickness=THICKNESS):
+  """
+  Assembles the global conductance matrix in sparse (CSR) format.
+  """
+  s = CST_batch(mesh, conductivities, thickness)
+  rows = np.repeat(mesh.connectivity, 3, axis=1).ravel()
+  cols = np.tile(mesh.connectivity, (1, 3)).ravel()
+  return sparse.coo_matrix((s.ravel(), (rows, cols)), shape=(mesh.num_nodes, mesh.num_nodes)).tocsr()
+
+def select_boundary_edges(mesh, predicate, physical_tag=None):
+  """
+  Returns the boundary edges whose midpoint satisfies predicate(x, y), optionally only
+  those of elements in one physical surface.
+  """
+  midpoints = mesh.coordinates[mesh.boundary_edges].mean(axis=1)
+  selected = predicate(midpoints[:, 0], midpoints[:, 1])
+  if physical_tag is not None:
+    selected &= mesh.physical_tags[mesh.boundary_edge_elements] == physical_tag
+  return mesh.boundary_edges[selected]
+
+def edge_lengths(mesh, edges):
+  vectors = mesh.coordinates[edges[:, 1]] - mesh.coordinates[edges[:, 0]]
+  return np.hypot(vectors[:, 0], vectors[:, 1])
+
+def apply_heat_flux(p, mesh, edges, flux, thickness=THICKNESS):
+  # Neumann boundary: an inward flux spread evenly over the two nodes of every edge
+  np.add.at(p, edges, (0.5 * flux * thickness * edge_lengths(mesh, edges))[:, None])
+  return p
+
+def apply_convection(K, p, mesh, edges, h, T_ambient, thickness=THICKNESS):
+  """
+  Convective (Robin) boundary -k dT/dn = h (T - T_ambient) on the given edges.
+
+  Adds the consistent edge matrices h t L / 6 [[2, 1], [1, 2]] to K and h t L T_ambient / 2
+  to both nodes of p. Returns the updated matrix.
+  """
+  hL = h * thickness * edge_lengths(mesh, edges)
+  local = hL[:, None, None] / 6 * np.array([[2.0, 1.0], [1.0, 2.0]])
+  rows = np.repeat(edges, 2, axis=1).ravel()
+  cols = np.tile(edges, (1, 2)).ravel()
+  K = K + sparse.coo_matrix((local.ravel(), (rows, cols)), shape=K.shape).tocsr()
+  np.add.at(p, edges, (0.5 * hL * T_ambient)[:, None])
+  return K, p
+
+def solve_temperature(K, p, fixed_nodes, fixed_values):
+  """
+  Solves K T = p with prescribed temperatures (Dirichlet boundary) at fixed_nodes.
+  """
+  T = np.zeros(K.shape[0])
+  T[fixed_nodes] = fixed_values
+  free = np.ones(K.shape[0], dtype=bool)
+  free[fixed_nodes] = False
+
+  K_free = K[free][:, free].tocsc()
+  # Symmetric fill-reducing ordering: K is symmetric positive definite once T is fixed somewhere
+  T[free] = spsolve(K_free, p[free] - K[free][:, ~free] @ T[~free], permc_spec="MMD_AT_PLUS_A")
+  return T
+
+def element_heat_flux(mesh, T, conductivities=CONDUCTIVITIES):
+  # Fourier's law q = -k B T in every element, shape (num_elements, 2)
+  k = element_conductivities(mesh, conductivities)
+  return -k[:, None] * np.einsum("eij,ej->ei", mesh.gradient_matrices, T[mesh.connectivity])
+
+def panel_system(mesh, conductivities=CONDUCTIVITIES, thickness=THICKNESS):
+  """
+  Conduction system of the panel before the fixed temperatures are applied.
+
+  Boundaries: fixed temperature T_SUPPORT on the bottom edge, absorbed IRRADIANCE on the
+  glass cover top and convection to T_AMBIENT over the whole top surface; the side edges
+  are insulated.
+
+  Returns:
+    tuple: (K, p, fixed_nodes) conductance matrix with the convection term, nodal heat
+      loads and the nodes held at T_SUPPORT.
+  """
+  y = mesh.coordinates[:, 1]
+  y_bottom, y_top = y.min(), y.max()
+
+  def on_top(x, y):
+    return np.isclose(y, y_top)
+
+  K = assemble_conductance(mesh, conductivities, thickness)
+  p = np.zeros(mesh.num_nodes)
+  apply_heat_flux(p, mesh, select_boundary_edges(mesh, on_top, physical_tag=3), IRRADIANCE, thickness)
+  K, p = apply_convection(K, p, mesh, select_boundary_edges(mesh, on_top), H_CONVECTION, T_AMBIENT, thickness)
+  return K, p, np.flatnonzero(np.isclose(y, y_bottom))
+
+def solve_steady_state(mesh, conductivities=CONDUCTIVITIES, thickness=THICKNESS):
+  """
+  Steady-state conduction in the panel, with the boundaries of panel_system.
+
+  Returns:
+    tuple: (T, q) nodal temperatures and element heat fluxes [q_x, q_y].
+  """
+  K, p, fixed_nodes = panel_system(mesh, conductivities, thickness)
+  T = solve_temperature(K, p, fixed_nodes, T_SUPPORT)
+  return T, element_heat_flux(mesh, T, conductivities)
+
+if __name__ == "__main__":
+  import sys
+  import time
+
+  sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))  # fem_mesh.py
+
+  mesh = load_mesh(os.path.join(os.path.dirname(os.path.abspath(__file__)), "solar_panel.msh"))
+  # In hands we have:
+  # the mesh: mesh.coordinates (x, y only) and mesh.connectivity (0-based node indices)
+  # the elements of each material: mesh.group(1), mesh.group(2), mesh.group(3)
+  print("Nodes = ", mesh.coordinates.shape)
+  print("Aluminium support = ", mesh.group(1).shape)
+  print("Cells = ", mesh.group(2).shape)
+  print("Glass cover = ", mesh.group(3).shape)
+
+  # Check the vectorized elementary matrices against CST
+  first = mesh.group(1)[0]
+  s, p = CST(coord = np.transpose(mesh.coordinates[mesh.connectivity[first]]), conductivity = 1.0)
   print('elementary stiffness matrix = ', s)
-  print('nodal flux = ', p)
-  break
+  print('matches CST_batch: ', np.allclose(s, CST_batch(mesh)[first]))
+
+  start = time.perf_counter()
+  T, q = solve_steady_state(mesh)
+  print(f"Steady state solved in {time.perf_counter() - start:.3f} s")
+  print(f"Temperature range = {T.min():.2f} .. {T.max():.2f}")
+  for tag, name in [(1, "Aluminium support"), (2, "Cells"), (3, "Glass cover")]:
+    elements = mesh.group(tag)
+    print(f"{name}: max |q| = {np.hypot(*q[elements].T).max():.2f}")
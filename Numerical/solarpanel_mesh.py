@@ -1,136 +1,239 @@
-import gmsh
-
-# Initialize Gmsh
-gmsh.initialize()
-
-# Create a new model
-gmsh.model.add("model")
-
-######## GEOMETRY DEFINITION
-#
-#    3**4                            9
-#    *  *                            *
-#    *  5                            8
-#    *  *                            *
-#    *  6****************************7
-#    2*******************************1
-
-lc1 = 0.01
-lc2 = 0.02  # characteristic lengths
-
-# Define points
-gmsh.model.geo.addPoint(0.2, 0, 0, lc2, 1)
-gmsh.model.geo.addPoint(0, 0, 0, lc2, 2)
-gmsh.model.geo.addPoint(0, 0.08, 0, lc2, 3)
-gmsh.model.geo.addPoint(0.05, 0.08, 0, lc2, 4)
-gmsh.model.geo.addPoint(0.05, 0.06, 0, lc1, 5)
-gmsh.model.geo.addPoint(0.05, 0.04, 0, lc1, 6)
-gmsh.model.geo.addPoint(0.2, 0.04, 0, lc1, 7)
-gmsh.model.geo.addPoint(0.2, 0.06, 0, lc1, 8)
-gmsh.model.geo.addPoint(0.2, 0.08, 0, lc1, 9)
-
-
-# Define lines:
-# Lines first surface (aluminium base)
-gmsh.model.geo.addLine(1, 2, 1)
-gmsh.model.geo.addLine(2, 3, 2)
-gmsh.model.geo.addLine(3, 4, 3)
-gmsh.model.geo.addLine(4, 6, 4)
-gmsh.model.geo.addLine(6, 7, 5)
-gmsh.model.geo.addLine(7, 1, 6)
-
-#Lines second surface (cells)
-gmsh.model.geo.addLine(6, 7, 7)
-gmsh.model.geo.addLine(7, 8, 8)
-gmsh.model.geo.addLine(8, 5, 9)
-gmsh.model.geo.addLine(5, 6, 10)
-
-#Lines third surface (cover)
-gmsh.model.geo.addLine(5, 8, 11)
-gmsh.model.geo.addLine(8, 9, 12)
-gmsh.model.geo.addLine(9, 4, 13)
-gmsh.model.geo.addLine(4, 5, 14)
-
-# Define the loop and surface for aluminium panel
-gmsh.model.geo.addCurveLoop([1, 2, 3, 4, 5, 6], 1)
-gmsh.model.geo.addPlaneSurface([1], 1)
-
-# Define the loop and surface for cells
-gmsh.model.geo.addCurveLoop([7, 8, 9, 10], 2)
-gmsh.model.geo.addPlaneSurface([2], 2)
-
-# Define the loop and surface for cover
-gmsh.model.geo.addCurveLoop([11, 12, 13, 14], 3)
-gmsh.model.geo.addPlaneSurface([3], 3)
-
-# Synchronize the CAD kernel with the Gmsh model
-gmsh.model.geo.synchronize()
-
-# Define two physical surfaces
-gmsh.model.addPhysicalGroup(2, [1], 1)
-gmsh.model.setPhysicalName(2, 1, "Physical Surface 1")
-
-gmsh.model.addPhysicalGroup(2, [2], 2)
-gmsh.model.setPhysicalName(2, 2, "Physical Surface 2")
-
-gmsh.model.addPhysicalGroup(2, [3], 3)
-gmsh.model.setPhysicalName(2, 3, "Physical Surface 3")
-
-# Generate the mesh
-gmsh.model.mesh.generate(2)
-
-# Save and close
-gmsh.write("solar_panel.msh")
-gmsh.finalize()
-
-import gmsh
-import numpy as np
-import matplotlib.pyplot as plt
-
-# Initialize Gmsh and load the mesh
-gmsh.initialize()
-gmsh.open("solar_panel.msh")
-
-# Get all nodes
-node_tags, node_coords, _ = gmsh.model.mesh.getNodes()
-node_coords = np.array(node_coords).reshape(-1, 3)
-
-# Function to get elements of a physical group
-def get_elements_of_physical_group(dim, tag):
-    entity_tags = gmsh.model.getEntitiesForPhysicalGroup(dim, tag)
-    all_elements = []
-    for entity_tag in entity_tags:
-        element_types, element_tags, node_tags = gmsh.model.mesh.getElements(dim, entity_tag)
-        for i in range(len(element_types)):
-            all_elements.append(np.array(node_tags[i]).reshape(-1, 3))
-    return np.concatenate(all_elements) if all_elements else np.array([])
-
-# Get elements for each physical surface
-elements_surface_1 = get_elements_of_physical_group(2, 1)
-elements_surface_2 = get_elements_of_physical_group(2, 2)
-elements_surface_3 = get_elements_of_physical_group(2, 3)
-
-# Plot the mesh for each physical surface separately
-plt.figure(figsize=(8, 8))
-
-# Plot for Physical Surface 1
-if elements_surface_1.size > 0:
-    plt.triplot(node_coords[:, 0], node_coords[:, 1], elements_surface_1 - 1, color='blue', label='Aluminium support')
-
-# Plot for Physical Surface 2
-if elements_surface_2.size > 0:
-    plt.triplot(node_coords[:, 0], node_coords[:, 1], elements_surface_2 - 1, color='red', label='Cells')
-
-# Plot for Physical Surface 3
-if elements_surface_3.size > 0:
-    plt.triplot(node_coords[:, 0], node_coords[:, 1], elements_surface_3 - 1, color='green', label='Glass cover')
-
-plt.gca().set_aspect('equal')
-plt.title('Solar panel mesh with three physical surfaces')
-plt.xlabel('X')
-plt.ylabel('Y')
-plt.legend()
-plt.show()
-
-# Finalize Gmsh
-gmsh.finalize()
\ No newline at end of file
+import hashlib
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+from msh_reader import read_msh, to_triangle_mesh
+
+# Default panel: 0.2 wide with a 0.05 aluminium frame on the left, 0.04 of aluminium
+# support under 0.02 of cells and 0.02 of glass cover
+DEFAULT_PANEL = {
+    "panel_width": 0.2,
+    "frame_width": 0.05,
+    "aluminium_thickness": 0.04,
+    "cell_thickness": 0.02,
+    "glass_thickness": 0.02,
+    "lc_fine": 0.01,    # Mesh size around the cells and the cover
+    "lc_coarse": 0.02,  # Mesh size at the outer corners of the support
+}
+
+CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "output", "mesh_cache")
+
+# Bump when the geometry below changes, so cached meshes of the old geometry are not reused
+GEOMETRY_VERSION = 1
+
+
+def panel_parameters(**overrides):
+    """Returns the panel parameters: DEFAULT_PANEL updated with the given values."""
+    unknown = set(overrides) - set(DEFAULT_PANEL)
+    if unknown:
+        raise ValueError(f"Unknown panel parameters: {sorted(unknown)}")
+    parameters = {name: float(value) for name, value in {**DEFAULT_PANEL, **overrides}.items()}
+    if min(parameters.values()) <= 0:
+        raise ValueError("Panel dimensions and mesh sizes must be positive")
+    if parameters["frame_width"] >= parameters["panel_width"]:
+        raise ValueError("The frame must be narrower than the panel")
+    return parameters
+
+
+def panel_key(parameters):
+    """Hashes the panel parameters into a cache key."""
+    key = {"geometry_version": GEOMETRY_VERSION, **parameters}
+    return hashlib.sha1(json.dumps(key, sort_keys=True).encode()).hexdigest()
+
+
+def _build_panel_geometry(gmsh, parameters):
+    #    3**4                            9
+    #    *  *          glass             *
+    #    *  5****************************8
+    #    *  *          cells             *
+    #    *  6****************************7
+    #    *          aluminium            *
+    #    2*******************************1
+    #
+    # The interfaces (lines 4, 5, 6 and 9) are shared by the surfaces on both sides, so
+    # the materials are meshed conformingly without duplicated nodes.
+    width, frame = parameters["panel_width"], parameters["frame_width"]
+    y_cells = parameters["aluminium_thickness"]
+    y_glass = y_cells + parameters["cell_thickness"]
+    y_top = y_glass + parameters["glass_thickness"]
+    lc1, lc2 = parameters["lc_fine"], parameters["lc_coarse"]
+
+    geo = gmsh.model.geo
+    geo.addPoint(width, 0, 0, lc2, 1)
+    geo.addPoint(0, 0, 0, lc2, 2)
+    geo.addPoint(0, y_top, 0, lc2, 3)
+    geo.addPoint(frame, y_top, 0, lc2, 4)
+    geo.addPoint(frame, y_glass, 0, lc1, 5)
+    geo.addPoint(frame, y_cells, 0, lc1, 6)
+    geo.addPoint(width, y_cells, 0, lc1, 7)
+    geo.addPoint(width, y_glass, 0, lc1, 8)
+    geo.addPoint(width, y_top, 0, lc1, 9)
+
+    geo.addLine(1, 2, 1)
+    geo.addLine(2, 3, 2)
+    geo.addLine(3, 4, 3)
+    geo.addLine(4, 5, 4)    # Frame / glass
+    geo.addLine(5, 6, 5)    # Frame / cells
+    geo.addLine(6, 7, 6)    # Support / cells
+    geo.addLine(7, 1, 7)
+    geo.addLine(7, 8, 8)
+    geo.addLine(8, 5, 9)    # Cells / glass
+    geo.addLine(8, 9, 10)
+    geo.addLine(9, 4, 11)
+
+    geo.addCurveLoop([1, 2, 3, 4, 5, 6, 7], 1)
+    geo.addPlaneSurface([1], 1)
+    geo.addCurveLoop([6, 8, 9, 5], 2)
+    geo.addPlaneSurface([2], 2)
+    geo.addCurveLoop([-9, 10, 11, 4], 3)
+    geo.addPlaneSurface([3], 3)
+    geo.synchronize()
+
+    for tag in (1, 2, 3):
+        gmsh.model.addPhysicalGroup(2, [tag], tag)
+        gmsh.model.setPhysicalName(2, tag, f"Physical Surface {tag}")
+
+
+def _write_panel_msh(parameters, file_path):
+    # Meshes one panel with the gmsh instance of the calling process. The file is written
+    # under a temporary name and renamed, so concurrent workers never expose a partial file.
+    import gmsh  # Only cache misses pay for the gmsh import
+
+    started = not gmsh.isInitialized()
+    if started:
+        gmsh.initialize()
+        gmsh.option.setNumber("General.Terminal", 0)
+    try:
+        gmsh.clear()
+        gmsh.model.add("solar_panel")
+        _build_panel_geometry(gmsh, parameters)
+        gmsh.model.mesh.generate(2)
+        gmsh.option.setNumber("Mesh.MshFileVersion", 4.1)
+        gmsh.option.setNumber("Mesh.Binary", 1)
+        temporary_path = f"{file_path}.{os.getpid()}.tmp"
+        gmsh.write(temporary_path)
+        os.replace(temporary_path, file_path)
+    finally:
+        if started:
+            gmsh.finalize()
+    return file_path
+
+
+def _start_worker():
+    # One gmsh instance per worker process, kept for all the panels the worker meshes
+    import atexit
+    import gmsh
+
+    gmsh.initialize()
+    gmsh.option.setNumber("General.Terminal", 0)
+    atexit.register(gmsh.finalize)
+
+
+def panel_mesh_file(cache_dir=CACHE_DIR, **parameters):
+    """
+    Returns the path of the cached .msh file of a panel, meshing it with gmsh on a cache miss.
+
+    Parameters:
+        cache_dir (str): Directory of the cached meshes.
+        **parameters: Panel parameters overriding DEFAULT_PANEL.
+    """
+    parameters = panel_parameters(**parameters)
+    file_path = os.path.join(cache_dir, f"panel_{panel_key(parameters)}.msh")
+    if not os.path.exists(file_path):
+        os.makedirs(cache_dir, exist_ok=True)
+        _write_panel_msh(parameters, file_path)
+    return file_path
+
+
+def generate_panel_mesh(cache_dir=CACHE_DIR, **parameters):
+    """
+    Meshes a solar panel (aluminium support and frame, cells and glass cover).
+
+    Meshes are cached on disk under the hash of their parameters, so a panel is meshed
+    once and later calls only read the cached file (no gmsh runtime needed).
+
+    Parameters:
+        cache_dir (str): Directory of the cached meshes.
+        **parameters: Panel parameters overriding DEFAULT_PANEL (panel_width, frame_width,
+            aluminium_thickness, cell_thickness, glass_thickness, lc_fine, lc_coarse).
+
+    Returns:
+        TriangleMesh: Conforming panel mesh with physical tags 1 (aluminium), 2 (cells)
+            and 3 (glass).
+    """
+    return to_triangle_mesh(read_msh(panel_mesh_file(cache_dir, **parameters)), [1, 2, 3])
+
+
+def generate_panel_meshes(variants, max_workers=None, cache_dir=CACHE_DIR):
+    """
+    Meshes many panel variants in parallel worker processes.
+
+    Every worker runs its own gmsh instance (gmsh keeps one global model per process), so
+    the variants missing from the cache are meshed concurrently instead of one after the
+    other. Cached variants and repeated parameter sets are not meshed again.
+
+    Parameters:
+        variants (list): Parameter overrides (dicts) of every panel.
+        max_workers (int): Number of worker processes (defaults to the number of CPUs).
+        cache_dir (str): Directory of the cached meshes.
+
+    Returns:
+        list: TriangleMesh of every variant, in the order of variants.
+    """
+    resolved = [panel_parameters(**variant) for variant in variants]
+    file_paths = [os.path.join(cache_dir, f"panel_{panel_key(parameters)}.msh") for parameters in resolved]
+    missing = {
+        file_path: parameters
+        for file_path, parameters in zip(file_paths, resolved)
+        if not os.path.exists(file_path)
+    }
+
+    if missing:
+        os.makedirs(cache_dir, exist_ok=True)
+        with ProcessPoolExecutor(max_workers=max_workers, initializer=_start_worker) as executor:
+            list(executor.map(_write_panel_msh, missing.values(), missing.keys()))
+
+    return [to_triangle_mesh(read_msh(file_path), [1, 2, 3]) for file_path in file_paths]
+
+
+if __name__ == "__main__":
+    import shutil
+    import sys
+    import time
+
+    import matplotlib.pyplot as plt
+
+    sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))  # fem_mesh.py
+
+    # Default panel, also written next to the scripts as solar_panel.msh
+    file_path = panel_mesh_file()
+    shutil.copyfile(file_path, os.path.join(os.path.dirname(os.path.abspath(__file__)), "solar_panel.msh"))
+    mesh = to_triangle_mesh(read_msh(file_path), [1, 2, 3])
+    x, y = mesh.coordinates[:, 0], mesh.coordinates[:, 1]
+
+    # Sweep of glass thicknesses and mesh sizes, meshed in parallel
+    variants = [
+        {"glass_thickness": glass, "lc_fine": lc / 2, "lc_coarse": lc}
+        for glass in (0.01, 0.02, 0.03, 0.04)
+        for lc in (0.02, 0.01, 0.005)
+    ]
+    start = time.perf_counter()
+    meshes = generate_panel_meshes(variants)
+    print(f"{len(meshes)} panel variants in {time.perf_counter() - start:.2f} s: "
+          + ", ".join(str(variant_mesh.num_elements) for variant_mesh in meshes) + " elements")
+
+    # Plot the mesh for each physical surface separately
+    plt.figure(figsize=(8, 8))
+
+    for tag, color, label in [(1, 'blue', 'Aluminium support'), (2, 'red', 'Cells'), (3, 'green', 'Glass cover')]:
+        elements = mesh.group(tag)
+        if elements.size > 0:
+            plt.triplot(x, y, mesh.connectivity[elements], color=color, label=label)
+
+    plt.gca().set_aspect('equal')
+    plt.title('Solar panel mesh with three physical surfaces')
+    plt.xlabel('X')
+    plt.ylabel('Y')
+    plt.legend()
+    plt.show()
@@ -0,0 +1,164 @@
+import os
+
+import numpy as np
+from scipy import sparse
+from scipy.sparse.linalg import LinearOperator, cg, spsolve_triangular, splu
+
+from solarpanel_FEA import CONDUCTIVITIES, THICKNESS, T_SUPPORT, load_mesh, panel_system, solve_temperature
+
+def prolongation(coarse_mesh):
+  """
+  Linear interpolation from a mesh to its uniform refinement (TriangleMesh.refine) in
+  sparse (CSR) format: the coarse nodes keep their values and every edge midpoint takes
+  the mean of its two end nodes.
+  """
+  num_edges = len(coarse_mesh.edges)
+  rows = np.concatenate([np.arange(coarse_mesh.num_nodes), np.repeat(coarse_mesh.num_nodes + np.arange(num_edges), 2)])
+  cols = np.concatenate([np.arange(coarse_mesh.num_nodes), coarse_mesh.edges.ravel()])
+  values = np.concatenate([np.ones(coarse_mesh.num_nodes), np.full(2 * num_edges, 0.5)])
+  return sparse.csr_matrix((values, (rows, cols)), shape=(coarse_mesh.num_nodes + num_edges, coarse_mesh.num_nodes))
+
+def build_hierarchy(mesh, refinements, conductivities=CONDUCTIVITIES, thickness=THICKNESS):
+  """
+  Refines the panel mesh uniformly and builds the multigrid levels.
+
+  The levels come from TriangleMesh.refine rather than gmsh's own refinement: its fine
+  nodes are the coarse nodes followed by one midpoint per coarse edge, so the levels are
+  nested by construction, prolongation() needs only the coarse mesh, and the hierarchy
+  is built without the gmsh runtime.
+
+  The finest system is assembled with panel_system; the coarser operators are the
+  Galerkin products A_c = P^T A P on the free nodes, so they carry the conductivity jumps
+  and the convection boundary of the fine level exactly, whatever the coarse mesh resolves.
+
+  Parameters:
+    mesh (TriangleMesh): Coarsest panel mesh (with merged interface nodes).
+    refinements (int): Number of uniform refinements to the finest level.
+
+  Returns:
+    tuple: (levels, fine_mesh, K, p, fixed_nodes)
+      - levels: One dict per level, finest first, with the free-node operator "A" and
+        the prolongation "P" from the next coarser level (None on the coarsest).
+      - fine_mesh: Finest mesh.
+      - K, p, fixed_nodes: Finest system, as returned by panel_system.
+  """
+  meshes = [mesh]
+  for _ in range(refinements):
+    meshes.append(meshes[-1].refine())
+
+  # The bottom edge is fixed on every level (its midpoints stay on the bottom)
+  frees = [~np.isclose(m.coordinates[:, 1], m.coordinates[:, 1].min()) for m in meshes]
+
+  K, p, fixed_nodes = panel_system(meshes[-1], conductivities, thickness)
+  levels = [{"A": K[frees[-1]][:, frees[-1]].tocsr()}]
+  for level in range(refinements - 1, -1, -1):
+    P = prolongation(meshes[level])[frees[level + 1]][:, frees[level]].tocsr()
+    levels[-1]["P"] = P
+    levels.append({"A": (P.T @ levels[-1]["A"] @ P).tocsr()})
+  levels[-1]["P"] = None
+  return levels, meshes[-1], K, p, fixed_nodes
+
+def _prepare_smoothers(levels, smoother, jacobi_weight):
+  # Coefficient-aware smoothing: both smoothers scale by the actual matrix entries, so
+  # the aluminium and glass nodes are relaxed with their own conductivities
+  for level in levels[:-1]:
+    A = level["A"]
+    level["diagonal"] = A.diagonal()
+    if smoother == "gauss_seidel":
+      level["lower"] = sparse.tril(A, format="csr")
+      level["upper"] = sparse.triu(A, format="csr")
+    elif smoother == "jacobi":
+      level["inverse_diagonal"] = jacobi_weight / level["diagonal"]
+    else:
+      raise ValueError(f"Unknown smoother '{smoother}'")
+  levels[-1]["lu"] = splu(levels[-1]["A"].tocsc(), permc_spec="MMD_AT_PLUS_A")
+
+def _smooth(level, x, b, sweeps, forward):
+  A = level["A"]
+  for _ in range(sweeps):
+    if "inverse_diagonal" in level:
+      x += level["inverse_diagonal"] * (b - A @ x)
+    elif forward:
+      x += spsolve_triangular(level["lower"], b - A @ x, lower=True)
+    else:
+      x += spsolve_triangular(level["upper"], b - A @ x, lower=False)
+  return x
+
+def v_cycle(levels, b, sweeps=1, index=0):
+  """
+  One V-cycle for A x = b on levels[index:], starting from x = 0. Pre- and post-smoothing
+  are mirrored (forward and backward Gauss-Seidel), so the cycle is a symmetric
+  preconditioner for conjugate gradients.
+  """
+  level = levels[index]
+  if level["P"] is None:
+    return level["lu"].solve(b)
+  x = _smooth(level, np.zeros(len(b)), b, sweeps, forward=True)
+  residual = b - level["A"] @ x
+  x += level["P"] @ v_cycle(levels, level["P"].T @ residual, sweeps, index + 1)
+  return _smooth(level, x, b, sweeps, forward=False)
+
+def solve_multigrid(mesh, refinements, tolerance=1e-8, max_iterations=100, smoother="gauss_seidel", sweeps=1,
+                    jacobi_weight=0.8, conductivities=CONDUCTIVITIES, thickness=THICKNESS):
+  """
+  Steady-state conduction (boundaries of panel_system) on the mesh refined `refinements`
+  times, by conjugate gradients preconditioned with a geometric multigrid V-cycle.
+
+  The number of iterations does not grow with the refinement, so the solve time grows
+  linearly with the number of unknowns.
+
+  Parameters:
+    mesh (TriangleMesh): Coarsest panel mesh (with merged interface nodes).
+    refinements (int): Number of uniform refinements to the finest level.
+    tolerance (float): Relative residual tolerance of conjugate gradients.
+    max_iterations (int): Maximum number of iterations.
+    smoother (str): "gauss_seidel" (symmetric) or "jacobi" (weighted).
+    sweeps (int): Smoothing sweeps before and after the coarse correction.
+    jacobi_weight (float): Damping of the Jacobi smoother.
+
+  Returns:
+    tuple: (T, info)
+      - T: Nodal temperatures on the finest mesh.
+      - info: Dict with the "mesh" (finest), "iterations", "levels" and "unknowns".
+  """
+  levels, fine_mesh, K, p, fixed_nodes = build_hierarchy(mesh, refinements, conductivities, thickness)
+  _prepare_smoothers(levels, smoother, jacobi_weight)
+
+  free = np.ones(fine_mesh.num_nodes, dtype=bool)
+  free[fixed_nodes] = False
+  T = np.zeros(fine_mesh.num_nodes)
+  T[fixed_nodes] = T_SUPPORT
+  load = p[free] - K[free][:, ~free] @ T[~free]
+
+  A = levels[0]["A"]
+  preconditioner = LinearOperator(A.shape, matvec=lambda b: v_cycle(levels, b, sweeps), dtype=np.float64)
+  count = [0]
+  T[free], status = cg(A, load, rtol=tolerance, maxiter=max_iterations, M=preconditioner,
+                       callback=lambda _: count.__setitem__(0, count[0] + 1))
+  if status != 0:
+    print(f"Warning: no convergence after {max_iterations} iterations")
+  return T, {"mesh": fine_mesh, "iterations": count[0], "levels": len(levels), "unknowns": len(load)}
+
+if __name__ == "__main__":
+  import sys
+  import time
+
+  sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))  # fem_mesh.py
+
+  mesh = load_mesh(os.path.join(os.path.dirname(os.path.abspath(__file__)), "solar_panel.msh"))
+
+  # Multigrid iterations stay constant under refinement; the direct solve is only run on
+  # the coarser levels, where its fill-in is still affordable
+  print(f"{'levels':>6} {'unknowns':>9} {'iterations':>10} {'time (s)':>9} {'direct (s)':>10} {'max diff':>9}")
+  for refinements in range(6):
+    start = time.perf_counter()
+    T, info = solve_multigrid(mesh, refinements)
+    elapsed = time.perf_counter() - start
+    line = f"{info['levels']:>6} {info['unknowns']:>9} {info['iterations']:>10} {elapsed:>9.3f}"
+
+    if refinements <= 3:
+      start = time.perf_counter()
+      K, p, fixed_nodes = panel_system(info["mesh"])
+      T_direct = solve_temperature(K, p, fixed_nodes, T_SUPPORT)
+      line += f" {time.perf_counter() - start:>10.3f} {np.abs(T - T_direct).max():>9.1e}"
+    print(line)
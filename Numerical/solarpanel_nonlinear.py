@@ -0,0 +1,204 @@
+import os
+
+import numpy as np
+from scipy.sparse.linalg import LinearOperator, cg, splu
+
+from solarpanel_FEA import (
+  CONDUCTIVITIES, THICKNESS, T_SUPPORT, IRRADIANCE, T_AMBIENT,
+  load_mesh, assemble_conductance, select_boundary_edges, edge_lengths, apply_heat_flux,
+)
+
+STEFAN_BOLTZMANN = 5.670374419e-8
+KELVIN = 273.15
+
+# Nonlinear boundaries of the panel top surface
+T_SKY = 10.0                  # Effective sky temperature for radiation
+EMISSIVITY_GLASS = 0.9
+EMISSIVITY_ALUMINIUM = 0.2
+NATURAL_CONVECTION = 1.52     # C in h = C * |T - T_ambient|^(1/3) (heated plate facing up)
+
+def boundary_group(mesh, edges, h=0.0, natural_convection=0.0, T_ambient=T_AMBIENT, emissivity=0.0,
+                   T_radiation=T_SKY, thickness=THICKNESS):
+  """
+  Nonlinear Robin/radiation boundary on a set of boundary edges. The outward flux is
+
+      q(T) = (h + C |T - T_ambient|^(1/3)) (T - T_ambient) + eps sigma (T_K^4 - T_radiation,K^4)
+
+  and is integrated with nodal (trapezoidal) quadrature, so every node carries the weight
+  t * L / 2 of each adjacent edge and the boundary Jacobian is diagonal.
+  """
+  weights = np.zeros(mesh.num_nodes)
+  np.add.at(weights, edges, (0.5 * thickness * edge_lengths(mesh, edges))[:, None])
+  nodes = np.flatnonzero(weights)
+  return {
+    "nodes": nodes,
+    "weights": weights[nodes],
+    "h": h,
+    "natural_convection": natural_convection,
+    "T_ambient": T_ambient,
+    "emissivity": emissivity,
+    "T_radiation": T_radiation,
+  }
+
+def boundary_flux(group, T):
+  """
+  Returns the outward boundary heat flow at the nodes of a group and its derivative.
+  """
+  difference = T - group["T_ambient"]
+  cube_root = np.cbrt(np.abs(difference))
+  T_kelvin = T + KELVIN
+  radiation = group["emissivity"] * STEFAN_BOLTZMANN
+  flux = (
+    (group["h"] + group["natural_convection"] * cube_root) * difference
+    + radiation * (T_kelvin**4 - (group["T_radiation"] + KELVIN)**4)
+  )
+  derivative = group["h"] + 4 / 3 * group["natural_convection"] * cube_root + 4 * radiation * T_kelvin**3
+  return group["weights"] * flux, group["weights"] * derivative
+
+def solve_nonlinear(mesh, boundary_groups, p, fixed_nodes, fixed_values, T_initial=None, tolerance=1e-8,
+                    max_iterations=30, quasi_newton=False, conductivities=CONDUCTIVITIES, thickness=THICKNESS):
+  """
+  Solves K T + b(T) = p with nonlinear boundary heat losses b(T) by Newton's method.
+
+  The Jacobian K + diag(b'(T)) differs from K only on the diagonal of the boundary nodes,
+  so its sparsity pattern is built once and each iteration only rewrites those entries.
+  Full Newton factorizes the updated Jacobian every iteration. In quasi-Newton mode the
+  first factorization is kept and the Newton systems are solved by conjugate gradients
+  preconditioned with it: the Jacobian only changes by a boundary diagonal term, so a few
+  triangular solves per iteration recover Newton's convergence without refactorizing.
+
+  Parameters:
+    mesh (TriangleMesh): Panel mesh with physical surface tags.
+    boundary_groups (list): Groups from boundary_group.
+    p (numpy.ndarray): Imposed nodal heat loads (e.g. absorbed irradiance).
+    fixed_nodes (numpy.ndarray): Nodes with a prescribed temperature.
+    fixed_values (float or numpy.ndarray): Prescribed temperatures.
+    T_initial (numpy.ndarray): Initial guess (defaults to the solution with the boundary
+      losses linearized at the ambient temperature).
+    tolerance (float): Convergence tolerance on the largest temperature correction.
+    max_iterations (int): Maximum number of iterations.
+    quasi_newton (bool): If True, reuse the first factorized Jacobian as a preconditioner.
+
+  Returns:
+    tuple: (T, info)
+      - T: Nodal temperatures.
+      - info: Dict with "iterations", "factorizations", "solves" (triangular solve pairs)
+        and the "corrections" history.
+  """
+  free = np.ones(mesh.num_nodes, dtype=bool)
+  free[fixed_nodes] = False
+  local = np.full(mesh.num_nodes, -1)
+  local[free] = np.arange(free.sum())
+
+  K = assemble_conductance(mesh, conductivities, thickness)
+  K_free = K[free][:, free].tocsc()
+  K_free.sort_indices()
+  T = np.zeros(mesh.num_nodes)
+  T[fixed_nodes] = fixed_values
+  load = p[free] - K[free][:, ~free] @ T[~free]
+
+  # Fixed Jacobian pattern: positions of the diagonal entries in K_free.data
+  columns = np.repeat(np.arange(K_free.shape[1]), np.diff(K_free.indptr))
+  diagonal = np.empty(K_free.shape[0], dtype=np.int64)
+  on_diagonal = columns == K_free.indices
+  diagonal[columns[on_diagonal]] = np.flatnonzero(on_diagonal)
+
+  groups = [dict(group, local_nodes=local[group["nodes"]]) for group in boundary_groups]
+  for group in groups:
+    group["on_free"] = group["local_nodes"] >= 0
+
+  def residual_and_derivative(T):
+    residual = K_free @ T[free] - load
+    derivative = np.zeros(len(residual))
+    for group in groups:
+      flux, slope = boundary_flux(group, T[group["nodes"]])
+      nodes, on_free = group["local_nodes"], group["on_free"]
+      np.add.at(residual, nodes[on_free], flux[on_free])
+      np.add.at(derivative, nodes[on_free], slope[on_free])
+    return residual, derivative
+
+  J = K_free.copy()
+
+  def factorize(derivative):
+    J.data[:] = K_free.data
+    J.data[diagonal] += derivative
+    return splu(J, permc_spec="MMD_AT_PLUS_A")
+
+  if T_initial is None:
+    # Linearized start: boundary losses replaced by their tangent at the ambient temperature
+    T[free] = T_AMBIENT
+    residual, derivative = residual_and_derivative(T)
+    T[free] -= factorize(derivative).solve(residual)
+  else:
+    T[free] = np.asarray(T_initial)[free]
+
+  lu = None
+  factorizations = 1 if T_initial is None else 0
+  solves = factorizations
+  corrections = []
+  for iteration in range(1, max_iterations + 1):
+    residual, derivative = residual_and_derivative(T)
+    if quasi_newton and lu is not None:
+      J.data[:] = K_free.data
+      J.data[diagonal] += derivative
+      preconditioner = LinearOperator(J.shape, matvec=lu.solve)
+      count = [0]
+      correction, status = cg(J, -residual, rtol=1e-6, M=preconditioner,
+                              callback=lambda _: count.__setitem__(0, count[0] + 1))
+      solves += count[0] + 1
+      if status != 0:
+        lu = None  # The frozen factorization no longer preconditions well: refactorize
+    if lu is None or not quasi_newton:
+      lu = factorize(derivative)
+      factorizations += 1
+      correction = lu.solve(-residual)
+      solves += 1
+    T[free] += correction
+    corrections.append(np.abs(correction).max())
+    if corrections[-1] <= tolerance:
+      break
+  else:
+    print(f"Warning: no convergence after {max_iterations} iterations (last correction {corrections[-1]:.2e})")
+
+  print(f"{'Quasi-Newton' if quasi_newton else 'Newton'}: {iteration} iterations, {factorizations} factorizations, "
+        f"{solves} solves")
+  return T, {"iterations": iteration, "factorizations": factorizations, "solves": solves, "corrections": corrections}
+
+def panel_boundary_groups(mesh, thickness=THICKNESS):
+  """
+  Radiation and natural convection from the top surface: the glass cover and the exposed
+  top of the aluminium frame.
+  """
+  y_top = mesh.coordinates[:, 1].max()
+
+  def on_top(x, y):
+    return np.isclose(y, y_top)
+
+  return [
+    boundary_group(mesh, select_boundary_edges(mesh, on_top, physical_tag=3), natural_convection=NATURAL_CONVECTION,
+                   emissivity=EMISSIVITY_GLASS, thickness=thickness),
+    boundary_group(mesh, select_boundary_edges(mesh, on_top, physical_tag=1), natural_convection=NATURAL_CONVECTION,
+                   emissivity=EMISSIVITY_ALUMINIUM, thickness=thickness),
+  ]
+
+if __name__ == "__main__":
+  import sys
+  import time
+
+  sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))  # fem_mesh.py
+
+  mesh = load_mesh(os.path.join(os.path.dirname(os.path.abspath(__file__)), "solar_panel.msh"))
+  y = mesh.coordinates[:, 1]
+
+  y_top = y.max()
+  glass_top = select_boundary_edges(mesh, lambda x, y: np.isclose(y, y_top), physical_tag=3)
+  p = apply_heat_flux(np.zeros(mesh.num_nodes), mesh, glass_top, IRRADIANCE)
+  fixed_nodes = np.flatnonzero(np.isclose(y, y.min()))
+  groups = panel_boundary_groups(mesh)
+
+  for quasi_newton in (False, True):
+    start = time.perf_counter()
+    T, info = solve_nonlinear(mesh, groups, p, fixed_nodes, T_SUPPORT, quasi_newton=quasi_newton)
+    print(f"  solved in {time.perf_counter() - start:.4f} s, corrections: "
+          + ", ".join(f"{c:.1e}" for c in info["corrections"]))
+  print(f"Temperature range = {T.min():.2f} .. {T.max():.2f}")
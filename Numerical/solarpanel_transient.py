@@ -0,0 +1,182 @@
+import os
+
+import numpy as np
+from scipy import sparse
+from scipy.sparse.linalg import splu
+
+from solarpanel_FEA import (
+  CONDUCTIVITIES, THICKNESS, T_SUPPORT, IRRADIANCE, H_CONVECTION, T_AMBIENT,
+  load_mesh, assemble_conductance, select_boundary_edges, apply_heat_flux, apply_convection,
+)
+
+# Volumetric heat capacity (density * specific heat) of every physical surface
+HEAT_CAPACITIES = {
+  1: 2700.0 * 900.0,  # Aluminium support
+  2: 2330.0 * 700.0,  # Cells
+  3: 2500.0 * 840.0,  # Glass cover
+}
+
+# Day/night cycle of the irradiance on the glass cover
+DAY_LENGTH = 24 * 3600.0
+SUNRISE = 6 * 3600.0
+SUNSET = 18 * 3600.0
+
+def capacity_matrix(mesh, capacities=HEAT_CAPACITIES, thickness=THICKNESS, lumped=False):
+  """
+  Assembles the heat capacity matrix C in sparse (CSR) format.
+
+  The consistent element matrix is rho*c * t * A / 12 * [[2, 1, 1], [1, 2, 1], [1, 1, 2]];
+  the lumped one puts rho*c * t * A / 3 on the diagonal (row sums of the consistent one).
+  """
+  rho_c = np.zeros(mesh.num_elements)
+  for tag, capacity in capacities.items():
+    rho_c[mesh.group(tag)] = capacity
+  weights = rho_c * thickness * mesh.areas
+
+  if lumped:
+    diagonal = np.zeros(mesh.num_nodes)
+    np.add.at(diagonal, mesh.connectivity, (weights / 3)[:, None])
+    return sparse.diags(diagonal, format="csr")
+
+  c = weights[:, None, None] / 12 * (np.ones((3, 3)) + np.eye(3))
+  rows = np.repeat(mesh.connectivity, 3, axis=1).ravel()
+  cols = np.tile(mesh.connectivity, (1, 3)).ravel()
+  return sparse.coo_matrix((c.ravel(), (rows, cols)), shape=(mesh.num_nodes, mesh.num_nodes)).tocsr()
+
+def irradiance(t):
+  # Half-sine irradiance between sunrise and sunset, zero at night
+  t_day = np.mod(t, DAY_LENGTH)
+  return IRRADIANCE * np.sin(np.pi * (t_day - SUNRISE) / (SUNSET - SUNRISE)) * ((t_day > SUNRISE) & (t_day < SUNSET))
+
+def _step_operators(C, K, T, dt, theta, free, factorizations):
+  # Operators of one time-step size, computed once and reused by all steps of that size:
+  # the LU of C + theta dt K on the free nodes, the explicit operator C - (1 - theta) dt K
+  # and the (constant) load of the fixed temperatures on the free nodes
+  if dt not in factorizations:
+    A = (C + theta * dt * K)[free]
+    factorizations[dt] = (
+      splu(A[:, free].tocsc(), permc_spec="MMD_AT_PLUS_A"),
+      (C - (1 - theta) * dt * K)[free].tocsr(),
+      A[:, ~free] @ T[~free],
+    )
+  return factorizations[dt]
+
+def run_transient(mesh, t_end, dt, theta=0.5, lumped=False, T_initial=T_SUPPORT, save_every=1,
+                  history_path="./output/temperature_history.npy", chunk_size=1024,
+                  conductivities=CONDUCTIVITIES, capacities=HEAT_CAPACITIES, thickness=THICKNESS):
+  """
+  Transient conduction in the panel with theta-method time stepping.
+
+      (C + theta dt K) T_n+1 = (C - (1 - theta) dt K) T_n + dt (theta p_n+1 + (1 - theta) p_n)
+
+  theta = 1 is backward Euler and theta = 0.5 Crank-Nicolson. The boundaries are those of
+  solve_steady_state, with the glass cover irradiance following the day/night cycle. The
+  system matrix is factorized once per time-step size (a shorter final step adds one
+  factorization) and every save_every-th temperature field is streamed to a .npy file in
+  chunks of chunk_size rows, so the history never has to fit in memory.
+
+  Parameters:
+    mesh (TriangleMesh): Panel mesh with physical surface tags.
+    t_end (float): Simulated time (s).
+    dt (float): Time step (s).
+    theta (float): Implicitness of the time integration (0.5 <= theta <= 1).
+    lumped (bool): If True, use the lumped (diagonal) capacity matrix.
+    T_initial (float): Uniform initial temperature.
+    save_every (int): Store one temperature field every save_every steps.
+    history_path (str): Output .npy file for the stored temperature fields.
+    chunk_size (int): Number of stored fields buffered in memory between writes.
+
+  Returns:
+    dict: Results:
+      - "times": Times of the stored fields.
+      - "history": Memory-mapped temperature history, shape (len(times), num_nodes).
+      - "temperature": Final temperature field.
+  """
+  K = assemble_conductance(mesh, conductivities, thickness)
+  C = capacity_matrix(mesh, capacities, thickness, lumped)
+
+  # Constant convection load, and the load of a unit irradiance on the glass cover
+  y = mesh.coordinates[:, 1]
+  y_top = y.max()
+
+  def on_top(x, y):
+    return np.isclose(y, y_top)
+
+  p_convection = np.zeros(mesh.num_nodes)
+  K, p_convection = apply_convection(
+    K, p_convection, mesh, select_boundary_edges(mesh, on_top), H_CONVECTION, T_AMBIENT, thickness
+  )
+  glass_top = select_boundary_edges(mesh, on_top, physical_tag=3)
+  p_sun = apply_heat_flux(np.zeros(mesh.num_nodes), mesh, glass_top, 1.0, thickness)
+
+  fixed = np.isclose(y, y.min())
+  free = ~fixed
+  T = np.full(mesh.num_nodes, float(T_initial))
+  T[fixed] = T_SUPPORT
+
+  num_steps = int(np.ceil(t_end / dt - 1e-9))
+  steps = np.full(num_steps, float(dt))
+  last_step = t_end - dt * (num_steps - 1)
+  if not np.isclose(last_step, dt):  # A round-off remainder must not cost a second factorization
+    steps[-1] = last_step
+  saved = np.arange(0, num_steps + 1, save_every)
+  times = np.concatenate([[0.0], np.cumsum(steps)])[saved]
+
+  os.makedirs(os.path.dirname(os.path.abspath(history_path)), exist_ok=True)
+  history = np.lib.format.open_memmap(history_path, mode="w+", dtype=np.float64, shape=(len(saved), mesh.num_nodes))
+  buffer = np.empty((chunk_size, mesh.num_nodes))
+  buffered, written = 1, 0
+  buffer[0] = T
+
+  factorizations = {}
+  p_convection, p_sun = p_convection[free], p_sun[free]
+  t = 0.0
+  q_old = irradiance(t)
+  for step, h in enumerate(steps, start=1):
+    lu, explicit, fixed_load = _step_operators(C, K, T, h, theta, free, factorizations)
+    q_new = irradiance(t + h)
+    load = p_convection + (theta * q_new + (1 - theta) * q_old) * p_sun
+    T[free] = lu.solve(explicit @ T + h * load - fixed_load)
+    t += h
+    q_old = q_new
+
+    if step % save_every == 0:
+      if buffered == chunk_size:
+        history[written:written + buffered] = buffer
+        written += buffered
+        buffered = 0
+      buffer[buffered] = T
+      buffered += 1
+
+  history[written:written + buffered] = buffer[:buffered]
+  history.flush()
+  print(f"{num_steps} steps, {len(factorizations)} factorization(s), {len(saved)} fields written to {history_path}")
+  return {"times": times, "history": history, "temperature": T.copy()}
+
+if __name__ == "__main__":
+  import sys
+  import time
+  import matplotlib.pyplot as plt
+
+  sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))  # fem_mesh.py
+
+  mesh = load_mesh(os.path.join(os.path.dirname(os.path.abspath(__file__)), "solar_panel.msh"))
+
+  # One day at one-second steps, storing one field per minute
+  start = time.perf_counter()
+  results = run_transient(mesh, DAY_LENGTH, 1.0, theta=0.5, lumped=True, save_every=60)
+  print(f"24 h simulated in {time.perf_counter() - start:.2f} s")
+
+  # Temperature of the hottest node of the glass cover over the day
+  glass_nodes = np.unique(mesh.connectivity[mesh.group(3)])
+  hottest = glass_nodes[np.argmax(results["history"][:, glass_nodes].max(axis=0))]
+  plt.figure()
+  plt.plot(results["times"] / 3600, results["history"][:, hottest], label="Glass cover (hottest node)")
+  plt.plot(results["times"] / 3600, irradiance(results["times"]) / IRRADIANCE * 10 + T_SUPPORT, "--",
+           label="Irradiance (scaled)")
+  plt.title("Solar panel temperature over one day")
+  plt.xlabel("Time (h)")
+  plt.ylabel("Temperature")
+  plt.legend()
+  plt.grid()
+  plt.show()
@@ -0,0 +1,90 @@
+import os
+
+import numpy as np
+import pytest
+
+from msh_reader import read_msh, to_triangle_mesh
+
+MESH_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "solar_panel.msh")
+
+# Unit square of two triangles on surface 1, in one node block
+NODE_TAGS = np.array([3, 5, 8, 9])
+COORDINATES = np.array([[0.0, 0.0, 0.0], [1.0, 0.0, 0.0], [1.0, 1.0, 0.0], [0.0, 1.0, 0.0]])
+ELEMENT_TAGS = np.array([1, 2])
+TRIANGLES = np.array([[3, 5, 8], [3, 8, 9]])
+
+
+def write_ascii(file_path):
+    lines = ["$MeshFormat", "4.1 0 8", "$EndMeshFormat", "$Nodes", "1 4 3 9", "2 1 0 4"]
+    lines += [str(tag) for tag in NODE_TAGS]
+    lines += [" ".join(str(float(value)) for value in point) for point in COORDINATES]
+    lines += ["$EndNodes", "$Elements", "1 2 1 2", "2 1 2 2"]
+    lines += [" ".join(str(value) for value in row) for row in np.column_stack([ELEMENT_TAGS, TRIANGLES])]
+    lines += ["$EndElements"]
+    with open(file_path, "w") as file:
+        file.write("\n".join(lines) + "\n")
+
+
+def write_binary(file_path):
+    with open(file_path, "wb") as file:
+        file.write(b"$MeshFormat\n4.1 1 8\n" + np.array([1], "<i4").tobytes() + b"\n$EndMeshFormat\n")
+        file.write(b"$Nodes\n" + np.array([1, 4, 3, 9], "<u8").tobytes())
+        file.write(np.array([2, 1, 0], "<i4").tobytes() + np.array([4], "<u8").tobytes())
+        file.write(NODE_TAGS.astype("<u8").tobytes() + COORDINATES.astype("<f8").tobytes() + b"\n$EndNodes\n")
+        file.write(b"$Elements\n" + np.array([1, 2, 1, 2], "<u8").tobytes())
+        file.write(np.array([2, 1, 2], "<i4").tobytes() + np.array([2], "<u8").tobytes())
+        file.write(np.column_stack([ELEMENT_TAGS, TRIANGLES]).astype("<u8").tobytes() + b"\n$EndElements\n")
+
+
+@pytest.mark.parametrize("writer", [write_ascii, write_binary])
+@pytest.mark.parametrize("memory_map", [True, False])
+def test_ascii_and_binary_files(tmp_path, writer, memory_map):
+    file_path = os.path.join(tmp_path, "square.msh")
+    writer(file_path)
+    msh = read_msh(file_path, memory_map=memory_map)
+
+    np.testing.assert_array_equal(msh["node_tags"], NODE_TAGS)
+    np.testing.assert_array_equal(msh["coordinates"], COORDINATES)
+    (block,) = msh["element_blocks"]
+    assert (block["dim"], block["entity_tag"], block["element_type"]) == (2, 1, 2)
+    np.testing.assert_array_equal(block["element_tags"], ELEMENT_TAGS)
+    np.testing.assert_array_equal(block["node_tags"], TRIANGLES)
+
+    mesh = to_triangle_mesh(msh)
+    assert mesh.physical_tags is None
+    np.testing.assert_array_equal(mesh.connectivity, [[0, 1, 2], [0, 2, 3]])
+
+
+def test_solar_panel_groups():
+    msh = read_msh(MESH_FILE)
+    assert sorted(msh["physical_groups"]) == [(2, 1), (2, 2), (2, 3)]
+    mesh = to_triangle_mesh(msh)
+    assert mesh.num_elements == sum(len(msh["physical_groups"][(2, tag)][2]) for tag in (1, 2, 3))
+    assert np.all(mesh.connectivity >= 0)
+    assert np.isclose(mesh.areas.sum(), 0.2 * 0.08)  # Support, frame, cells and glass fill the panel
+
+
+def test_solar_panel_matches_gmsh():
+    try:
+        import gmsh
+    except (ImportError, OSError) as error:  # Installed without its system libraries
+        pytest.skip(f"gmsh is not available: {error}")
+
+    msh = read_msh(MESH_FILE)
+    gmsh.initialize()
+    try:
+        gmsh.open(MESH_FILE)
+        node_tags, coordinates, _ = gmsh.model.mesh.getNodes()
+        order = np.argsort(node_tags)
+        np.testing.assert_array_equal(np.sort(msh["node_tags"]), node_tags[order])
+        np.testing.assert_array_equal(
+            msh["coordinates"][np.argsort(msh["node_tags"])], coordinates.reshape(-1, 3)[order]
+        )
+        for (dim, tag), types in msh["physical_groups"].items():
+            expected = np.concatenate([
+                gmsh.model.mesh.getElementsByType(2, entity)[1]
+                for entity in gmsh.model.getEntitiesForPhysicalGroup(dim, tag)
+            ])
+            np.testing.assert_array_equal(types[2].ravel(), expected)
+    finally:
+        gmsh.finalize()
@@ -0,0 +1,44 @@
+import os
+
+import numpy as np
+import pytest
+
+from solarpanel_FEA import (
+  CONDUCTIVITIES, CST, CST_batch, T_SUPPORT, assemble_conductance, element_conductivities, element_heat_flux,
+  compute_q, load_mesh, panel_system, solve_steady_state,
+)
+
+MESH_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "solar_panel.msh")
+
+@pytest.fixture(scope="module")
+def mesh():
+  return load_mesh(MESH_FILE)
+
+def test_batch_matches_per_element_CST(mesh):
+  s = CST_batch(mesh)
+  k = element_conductivities(mesh)
+  assert set(np.unique(k)) == set(CONDUCTIVITIES.values())
+  for e in range(0, mesh.num_elements, 7):
+    expected, p = CST(mesh.coordinates[mesh.connectivity[e]].T, k[e])
+    np.testing.assert_allclose(s[e], expected, rtol=1e-12, atol=1e-12 * np.abs(expected).max())
+    assert not p.any()
+
+def test_conductance_is_symmetric_and_conserves_constants(mesh):
+  K = assemble_conductance(mesh)
+  assert abs(K - K.T).max() < 1e-12 * abs(K).max()
+  np.testing.assert_allclose(K @ np.ones(mesh.num_nodes), 0, atol=1e-12 * abs(K).max())
+
+def test_steady_state_balances_the_boundary_loads(mesh):
+  T, q = solve_steady_state(mesh)
+  K, p, fixed_nodes = panel_system(mesh)
+  residual = K @ T - p
+  free = np.setdiff1d(np.arange(mesh.num_nodes), fixed_nodes)
+  assert np.abs(residual[free]).max() < 1e-9 * np.abs(p).max()
+  np.testing.assert_array_equal(T[fixed_nodes], T_SUPPORT)
+
+  for e in range(0, mesh.num_elements, 11):
+    element = mesh.connectivity[e]
+    np.testing.assert_allclose(
+      q[e], compute_q(mesh.coordinates[element].T, T[element], element_conductivities(mesh)[e]), rtol=1e-10, atol=1e-10
+    )
+  np.testing.assert_array_equal(element_heat_flux(mesh, T), q)
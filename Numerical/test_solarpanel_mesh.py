@@ -0,0 +1,67 @@
+import os
+import shutil
+
+import numpy as np
+import pytest
+
+from msh_reader import read_msh, to_triangle_mesh
+from solarpanel_mesh import (
+    DEFAULT_PANEL, generate_panel_mesh, generate_panel_meshes, panel_key, panel_mesh_file, panel_parameters,
+)
+
+MESH_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "solar_panel.msh")
+
+
+def cache_panel(cache_dir, **parameters):
+    # Places the shipped default mesh in the cache under the key of the given parameters
+    file_path = os.path.join(cache_dir, f"panel_{panel_key(panel_parameters(**parameters))}.msh")
+    shutil.copyfile(MESH_FILE, file_path)
+    return file_path
+
+
+def test_parameters_are_validated():
+    assert panel_parameters() == DEFAULT_PANEL
+    assert panel_parameters(panel_width=1)["panel_width"] == 1.0
+    with pytest.raises(ValueError, match="Unknown"):
+        panel_parameters(width=0.3)
+    with pytest.raises(ValueError, match="positive"):
+        panel_parameters(glass_thickness=0)
+    with pytest.raises(ValueError, match="narrower"):
+        panel_parameters(frame_width=0.2)
+
+
+def test_key_depends_on_the_values_only():
+    assert panel_key(panel_parameters()) == panel_key(panel_parameters(panel_width=0.2, lc_fine=0.01))
+    assert panel_key(panel_parameters()) != panel_key(panel_parameters(lc_fine=0.005))
+
+
+def test_cached_meshes_are_read_without_gmsh(tmp_path):
+    file_path = cache_panel(str(tmp_path))
+    cache_panel(str(tmp_path), panel_width=0.3)
+    assert panel_mesh_file(str(tmp_path)) == file_path
+
+    expected = to_triangle_mesh(read_msh(MESH_FILE), [1, 2, 3])
+    mesh = generate_panel_mesh(str(tmp_path))
+    np.testing.assert_array_equal(mesh.coordinates, expected.coordinates)
+    np.testing.assert_array_equal(mesh.physical_tags, expected.physical_tags)
+
+    meshes = generate_panel_meshes([{}, {"panel_width": 0.3}, {}], cache_dir=str(tmp_path))
+    assert len(meshes) == 3
+    assert all(np.array_equal(mesh.connectivity, expected.connectivity) for mesh in meshes)
+    assert len(os.listdir(tmp_path)) == 2
+
+
+def test_generated_panels_fill_their_geometry(tmp_path):
+    try:
+        import gmsh  # noqa: F401
+    except (ImportError, OSError) as error:  # Installed without its system libraries
+        pytest.skip(f"gmsh is not available: {error}")
+
+    variants = [{}, {"panel_width": 0.3, "glass_thickness": 0.01}]
+    meshes = generate_panel_meshes(variants, max_workers=2, cache_dir=str(tmp_path))
+    for variant, mesh in zip(variants, meshes):
+        parameters = panel_parameters(**variant)
+        height = parameters["aluminium_thickness"] + parameters["cell_thickness"] + parameters["glass_thickness"]
+        assert np.isclose(mesh.areas.sum(), parameters["panel_width"] * height)
+        assert set(np.unique(mesh.physical_tags)) == {1, 2, 3}
+    assert len(os.listdir(tmp_path)) == 2
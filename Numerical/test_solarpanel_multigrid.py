@@ -0,0 +1,43 @@
+import os
+
+import numpy as np
+import pytest
+
+from solarpanel_FEA import T_SUPPORT, load_mesh, panel_system, solve_temperature
+from solarpanel_multigrid import build_hierarchy, prolongation, solve_multigrid
+
+MESH_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "solar_panel.msh")
+
+@pytest.fixture(scope="module")
+def mesh():
+  return load_mesh(MESH_FILE)
+
+def test_prolongation_interpolates_linear_fields(mesh):
+  field = 3 * mesh.coordinates[:, 0] - 2 * mesh.coordinates[:, 1] + 1
+  fine = mesh.refine()
+  np.testing.assert_allclose(prolongation(mesh) @ field, 3 * fine.coordinates[:, 0] - 2 * fine.coordinates[:, 1] + 1)
+
+def test_hierarchy_returns_the_finest_system(mesh):
+  levels, fine_mesh, K, p, fixed_nodes = build_hierarchy(mesh, 2)
+  assert len(levels) == 3 and levels[-1]["P"] is None
+  K_expected, p_expected, fixed_expected = panel_system(fine_mesh)
+  assert abs(K - K_expected).max() == 0
+  np.testing.assert_array_equal(p, p_expected)
+  np.testing.assert_array_equal(fixed_nodes, fixed_expected)
+
+  free = np.ones(fine_mesh.num_nodes, dtype=bool)
+  free[fixed_nodes] = False
+  assert abs(levels[0]["A"] - K[free][:, free]).max() == 0
+
+@pytest.mark.parametrize("smoother", ["gauss_seidel", "jacobi"])
+def test_multigrid_matches_the_direct_solve(mesh, smoother):
+  iterations = []
+  for refinements in range(3):
+    T, info = solve_multigrid(mesh, refinements, tolerance=1e-10, smoother=smoother)
+    K, p, fixed_nodes = panel_system(info["mesh"])
+    T_direct = solve_temperature(K, p, fixed_nodes, T_SUPPORT)
+    np.testing.assert_allclose(T, T_direct, atol=1e-6 * np.abs(T_direct).max())
+    iterations.append(info["iterations"])
+
+  # The iteration count does not grow with the refinement
+  assert iterations[-1] <= iterations[1] + 2
@@ -0,0 +1,60 @@
+import os
+
+import numpy as np
+import pytest
+
+from solarpanel_FEA import (
+  IRRADIANCE, T_SUPPORT, assemble_conductance, apply_heat_flux, load_mesh, select_boundary_edges,
+)
+from solarpanel_nonlinear import boundary_flux, boundary_group, panel_boundary_groups, solve_nonlinear
+
+MESH_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "solar_panel.msh")
+
+@pytest.fixture(scope="module")
+def panel():
+  mesh = load_mesh(MESH_FILE)
+  y = mesh.coordinates[:, 1]
+  glass_top = select_boundary_edges(mesh, lambda x, y: np.isclose(y, y.max()), physical_tag=3)
+  p = apply_heat_flux(np.zeros(mesh.num_nodes), mesh, glass_top, IRRADIANCE)
+  return mesh, p, np.flatnonzero(np.isclose(y, y.min()))
+
+def test_boundary_flux_derivative(panel):
+  mesh, _, _ = panel
+  group = panel_boundary_groups(mesh)[0]
+  T = np.linspace(30.0, 60.0, len(group["nodes"]))  # Away from the kink of |T - T_ambient|^(1/3)
+  flux, derivative = boundary_flux(group, T)
+  step = 1e-4
+  finite_difference = (boundary_flux(group, T + step)[0] - boundary_flux(group, T - step)[0]) / (2 * step)
+  np.testing.assert_allclose(derivative, finite_difference, rtol=1e-6)
+
+def test_linear_boundary_matches_a_direct_solve(panel):
+  mesh, p, fixed_nodes = panel
+  edges = select_boundary_edges(mesh, lambda x, y: np.isclose(y, y.max()))
+  group = boundary_group(mesh, edges, h=10.0)
+  T, info = solve_nonlinear(mesh, [group], p, fixed_nodes, T_SUPPORT)
+  assert info["iterations"] <= 2
+
+  # Same problem assembled by hand: K + diag(h w) with the load h w T_ambient
+  K = assemble_conductance(mesh).tolil()
+  load = p.copy()
+  K[group["nodes"], group["nodes"]] += group["h"] * group["weights"]
+  load[group["nodes"]] += group["h"] * group["weights"] * group["T_ambient"]
+  free = ~np.isin(np.arange(mesh.num_nodes), fixed_nodes)
+  K = K.tocsr()
+  expected = np.full(mesh.num_nodes, T_SUPPORT)
+  expected[free] = np.linalg.solve(K[free][:, free].toarray(), load[free] - K[free][:, ~free] @ expected[~free])
+  np.testing.assert_allclose(T, expected, atol=1e-8)
+
+def test_newton_and_quasi_newton_agree(panel):
+  mesh, p, fixed_nodes = panel
+  groups = panel_boundary_groups(mesh)
+  T_newton, newton = solve_nonlinear(mesh, groups, p, fixed_nodes, T_SUPPORT)
+  T_quasi, quasi = solve_nonlinear(mesh, groups, p, fixed_nodes, T_SUPPORT, quasi_newton=True)
+
+  np.testing.assert_allclose(T_quasi, T_newton, atol=1e-6)
+  assert newton["corrections"][-1] <= 1e-8
+  assert quasi["factorizations"] < newton["factorizations"]
+
+  # Quadratic convergence: each correction below the square of the previous one once close
+  corrections = np.array(newton["corrections"])
+  assert np.all(corrections[2:] < corrections[1:-1]**2)
@@ -0,0 +1,72 @@
+import os
+
+import numpy as np
+import pytest
+
+from fem_mesh import TriangleMesh
+from solarpanel_FEA import THICKNESS, load_mesh, solve_steady_state
+from solarpanel_postprocessing import averaging_operator, interface_heat_flow, nodal_flux
+
+MESH_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "solar_panel.msh")
+
+@pytest.fixture(scope="module")
+def mesh():
+  return load_mesh(MESH_FILE)
+
+def test_averaging_keeps_constants_on_the_touched_nodes(mesh):
+  np.testing.assert_allclose(averaging_operator(mesh) @ np.ones(mesh.num_elements), 1)
+
+  uniform = np.tile([2.0, -3.0], (mesh.num_elements, 1))
+  for tag, flux in nodal_flux(mesh, uniform).items():
+    touched = np.zeros(mesh.num_nodes, dtype=bool)
+    touched[mesh.connectivity[mesh.group(tag)].ravel()] = True
+    np.testing.assert_allclose(flux[touched], uniform[:touched.sum()])
+    assert not flux[~touched].any()
+
+def test_nodal_flux_is_a_weighted_mean_of_the_element_flux(mesh):
+  _, q = solve_steady_state(mesh)
+  elements = mesh.group(2)
+  flux = nodal_flux(mesh, q, physical_tags=(2,))[2]
+  node = mesh.connectivity[elements[0], 0]
+  around = elements[np.any(mesh.connectivity[elements] == node, axis=1)]
+  weights = mesh.areas[around]
+  np.testing.assert_allclose(flux[node], weights @ q[around] / weights.sum())
+
+def two_material_square(n=4, corner=False):
+  # Unit square of 2 n^2 triangles, surface 1 left of x = 0.5 and surface 2 right of it
+  # (with corner, surface 2 is the upper right quarter only)
+  x = np.linspace(0, 1, n + 1)
+  X, Y = np.meshgrid(x, x)
+  corners = (np.arange(n)[:, None] * (n + 1) + np.arange(n)).ravel()
+  connectivity = np.concatenate([
+    np.column_stack([corners, corners + 1, corners + n + 2]),
+    np.column_stack([corners, corners + n + 2, corners + n + 1]),
+  ])
+  coordinates = np.column_stack([X.ravel(), Y.ravel()])
+  centroids = coordinates[connectivity].mean(axis=1)
+  right = centroids[:, 0] > 0.5
+  tags = np.where(right & (centroids[:, 1] > 0.5) if corner else right, 2, 1)
+  return TriangleMesh(coordinates, connectivity, tags)
+
+@pytest.mark.parametrize("q, expected", [((1.0, 0.0), 1.0), ((-2.0, 5.0), -2.0), ((0.0, 1.0), 0.0)])
+def test_uniform_flux_crosses_a_conforming_interface(q, expected):
+  mesh = two_material_square()
+  flows = interface_heat_flow(mesh, np.tile(q, (mesh.num_elements, 1)), thickness=0.1)
+  assert list(flows) == [(1, 2, "vertical")]
+  assert np.isclose(flows[(1, 2, "vertical")], 0.1 * expected, atol=1e-12)
+
+def test_interfaces_of_one_pair_are_split_by_orientation():
+  # Across the vertical half the x-component flows into surface 2, across the horizontal
+  # half the y-component flows out of it; summed over the pair they would cancel
+  mesh = two_material_square(corner=True)
+  flows = interface_heat_flow(mesh, np.tile([1.0, -1.0], (mesh.num_elements, 1)), thickness=0.1)
+  assert sorted(flows) == [(1, 2, "horizontal"), (1, 2, "vertical")]
+  assert np.isclose(flows[(1, 2, "vertical")], 0.05)
+  assert np.isclose(flows[(1, 2, "horizontal")], -0.05)
+
+def test_flux_crosses_the_panel_layers(mesh):
+  # The cells band spans 0.15 of the width between the support and the glass; the
+  # x-component of the flux must not leak in through the frame edges
+  flows = interface_heat_flow(mesh, np.tile([1.0, -1.0], (mesh.num_elements, 1)))
+  assert np.isclose(flows[(1, 2, "horizontal")], -0.15 * THICKNESS)
+  assert np.isclose(flows[(2, 3, "horizontal")], -0.15 * THICKNESS)
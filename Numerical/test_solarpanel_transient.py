@@ -0,0 +1,48 @@
+import os
+
+import numpy as np
+import pytest
+
+from solarpanel_FEA import load_mesh
+from solarpanel_transient import capacity_matrix, run_transient
+
+MESH_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "solar_panel.msh")
+
+@pytest.fixture(scope="module")
+def mesh():
+  return load_mesh(MESH_FILE)
+
+def test_lumped_capacity_keeps_the_row_sums(mesh):
+  consistent = capacity_matrix(mesh)
+  lumped = capacity_matrix(mesh, lumped=True)
+  np.testing.assert_allclose(lumped.diagonal(), np.asarray(consistent.sum(axis=1)).ravel())
+
+def test_round_off_last_step_reuses_the_factorization(mesh, tmp_path, capsys):
+  # 1.0 - 9 * 0.1 is not exactly 0.1
+  results = run_transient(mesh, 1.0, 0.1, history_path=os.path.join(tmp_path, "history.npy"))
+  assert "10 steps, 1 factorization(s)" in capsys.readouterr().out
+  assert np.isclose(results["times"][-1], 1.0)
+
+  results = run_transient(mesh, 1.05, 0.1, history_path=os.path.join(tmp_path, "history.npy"))
+  assert "11 steps, 2 factorization(s)" in capsys.readouterr().out
+  assert np.isclose(results["times"][-1], 1.05)
+
+def test_history_is_streamed_in_chunks(mesh, tmp_path):
+  path = os.path.join(tmp_path, "history.npy")
+  chunked = run_transient(mesh, 3600.0, 60.0, save_every=4, history_path=path, chunk_size=3)
+  np.testing.assert_allclose(chunked["times"], np.arange(0, 3601, 240))
+  np.testing.assert_array_equal(chunked["history"][-1], chunked["temperature"])
+
+  whole = run_transient(mesh, 3600.0, 60.0, save_every=4, history_path=os.path.join(tmp_path, "whole.npy"))
+  np.testing.assert_array_equal(np.load(path), np.asarray(whole["history"]))
+
+@pytest.mark.parametrize("theta, order", [(0.5, 2), (1.0, 1)])
+def test_time_integration_order(mesh, tmp_path, theta, order):
+  # Through sunrise; the differences to the finest run shrink like dt^order
+  T = {
+    dt: run_transient(mesh, 8 * 3600.0, dt, theta, history_path=os.path.join(tmp_path, f"{dt}.npy"))["temperature"]
+    for dt in (1800.0, 900.0, 450.0)
+  }
+  ratio = np.abs(T[1800.0] - T[450.0]).max() / np.abs(T[900.0] - T[450.0]).max()
+  assert ratio > (4.0 if order == 2 else 2.5)
+  assert order == 2 or ratio < 3.5
@@ -0,0 +1,32 @@
+"""
+Test setup shared by the project folders.
+
+The projects are folders of scripts that import their siblings by module name, and two of
+them have a solver.py. Every test module is imported with its own folder first on sys.path
+and with the same-named modules of other folders dropped from sys.modules, so a bare
+`from solver import ...` resolves to the module next to the test. This folder (fem_mesh.py)
+is put on sys.path by pytest itself, as the location of this conftest.
+"""
+import os
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+
+# Scripts whose names match the test pattern but that are not tests
+collect_ignore = [os.path.join("Contact Mechanics", "test_setup.py")]
+
+
+def pytest_collectstart(collector):
+    if not isinstance(collector, pytest.Module):
+        return
+    folder = os.path.dirname(str(collector.path))
+    for name, module in list(sys.modules.items()):
+        path = getattr(module, "__file__", None) or ""
+        if (path.startswith(ROOT) and os.path.dirname(path) != folder
+                and os.path.exists(os.path.join(folder, os.path.basename(path)))):
+            del sys.modules[name]
+    if folder in sys.path:
+        sys.path.remove(folder)
+    sys.path.insert(0, folder)
@@ -0,0 +1,255 @@
+import numpy as np
+from scipy import sparse
+
+
+class TriangleMesh:
+    """
+    Linear triangular mesh shared by the finite element projects.
+
+    Stores float64 node coordinates, int32 connectivity (0-based) and optional physical
+    group tags per element. Derived geometric data (areas, B-matrices, adjacency and
+    boundary edges) is computed on first access and cached, so solvers and plotters
+    working on the same mesh never recompute it.
+
+    The project folders import it as a top-level module. Entry scripts put the repository
+    root on sys.path once, in their __main__ block:
+        sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+    and library modules only import it (from fem_mesh import TriangleMesh).
+    """
+
+    __slots__ = (
+        "coordinates",
+        "connectivity",
+        "physical_tags",
+        "_signed_areas",
+        "_gradient_matrices",
+        "_strain_matrices",
+        "_node_elements",
+        "_edges",
+        "_element_edges",
+        "_edge_elements",
+        "_boundary_edges",
+        "_boundary_edge_elements",
+    )
+
+    def __init__(self, coordinates, connectivity, physical_tags=None):
+        """
+        Parameters:
+            coordinates (numpy.ndarray): Node coordinates, shape (num_nodes, 2) or (num_nodes, 3).
+            connectivity (numpy.ndarray): 0-based element connectivity [n1, n2, n3].
+            physical_tags (numpy.ndarray): Physical group tag of every element (optional).
+        """
+        self.coordinates = np.ascontiguousarray(np.asarray(coordinates)[:, :2], dtype=np.float64)
+        self.connectivity = np.ascontiguousarray(connectivity, dtype=np.int32).reshape(-1, 3)
+        self.physical_tags = None if physical_tags is None else np.asarray(physical_tags, dtype=np.int32)
+        for name in self.__slots__[3:]:
+            setattr(self, name, None)
+
+    @classmethod
+    def from_tags(cls, node_tags, coordinates, element_node_tags, physical_tags=None):
+        """
+        Builds a mesh from gmsh-style (1-based, possibly non-contiguous) node tags.
+
+        Parameters:
+            node_tags (numpy.ndarray): Tag of every node.
+            coordinates (numpy.ndarray): Node coordinates, in the order of node_tags.
+            element_node_tags (numpy.ndarray): Node tags of every element, shape (num_elements, 3)
+                or flat.
+            physical_tags (numpy.ndarray): Physical group tag of every element (optional).
+        """
+        node_tags = np.asarray(node_tags, dtype=np.int64)
+        tag_to_index = np.full(int(node_tags.max()) + 1, -1, dtype=np.int32)
+        tag_to_index[node_tags] = np.arange(len(node_tags), dtype=np.int32)
+        connectivity = tag_to_index[np.asarray(element_node_tags, dtype=np.int64)].reshape(-1, 3)
+        if np.any(connectivity < 0):
+            raise ValueError("Element refers to a node tag that is not in node_tags")
+        return cls(np.asarray(coordinates).reshape(len(node_tags), -1), connectivity, physical_tags)
+
+    def merge_coincident_nodes(self, tolerance=1e-10):
+        """
+        Returns a mesh in which nodes closer than tolerance are merged into one.
+
+        Surfaces meshed from duplicated (rather than shared) curves carry two copies of
+        every interface node, which leaves the materials disconnected. Merging the copies
+        makes the interfaces conforming; the first copy of every node is kept.
+        """
+        from scipy.sparse.csgraph import connected_components
+        from scipy.spatial import cKDTree
+
+        pairs = cKDTree(self.coordinates).query_pairs(tolerance, output_type="ndarray")
+        graph = sparse.coo_matrix(
+            (np.ones(len(pairs)), (pairs[:, 0], pairs[:, 1])), shape=(self.num_nodes, self.num_nodes)
+        )
+        _, labels = connected_components(graph, directed=False)
+        _, first, inverse = np.unique(labels, return_index=True, return_inverse=True)
+        return TriangleMesh(self.coordinates[first], inverse[self.connectivity], self.physical_tags)
+
+    def refine(self):
+        """
+        Returns the uniformly refined mesh: every triangle is split into four at its edge
+        midpoints, the children keep the physical tag of their parent.
+
+        The fine nodes are the coarse nodes followed by one midpoint per coarse edge, in the
+        order of self.edges, so transfer operators can be built from the coarse mesh alone.
+        """
+        midpoints = self.num_nodes + self.element_edges
+        n1, n2, n3 = self.connectivity.T
+        m12, m23, m31 = midpoints.T
+        connectivity = np.concatenate([
+            np.column_stack([n1, m12, m31]),
+            np.column_stack([m12, n2, m23]),
+            np.column_stack([m31, m23, n3]),
+            np.column_stack([m12, m23, m31]),
+        ])
+        coordinates = np.vstack([self.coordinates, self.coordinates[self.edges].mean(axis=1)])
+        physical_tags = None if self.physical_tags is None else np.tile(self.physical_tags, 4)
+        return TriangleMesh(coordinates, connectivity, physical_tags)
+
+    @property
+    def num_nodes(self):
+        return len(self.coordinates)
+
+    @property
+    def num_elements(self):
+        return len(self.connectivity)
+
+    def group(self, tag):
+        """Returns the indices of the elements in a physical group."""
+        return np.flatnonzero(self.physical_tags == tag)
+
+    @property
+    def signed_areas(self):
+        """Element areas, negative for clockwise elements."""
+        if self._signed_areas is None:
+            x = self.coordinates[self.connectivity]
+            self._signed_areas = 0.5 * (
+                (x[:, 1, 0] - x[:, 0, 0]) * (x[:, 2, 1] - x[:, 0, 1])
+                - (x[:, 2, 0] - x[:, 0, 0]) * (x[:, 1, 1] - x[:, 0, 1])
+            )
+        return self._signed_areas
+
+    @property
+    def areas(self):
+        return np.abs(self.signed_areas)
+
+    @property
+    def gradient_matrices(self):
+        """
+        Shape function gradients of every element, shape (num_elements, 2, 3):
+            [[dN1/dx, dN2/dx, dN3/dx],
+             [dN1/dy, dN2/dy, dN3/dy]]
+        Zero for degenerate (zero-area) elements.
+        """
+        if self._gradient_matrices is None:
+            x = self.coordinates[self.connectivity]
+            B = np.empty((self.num_elements, 2, 3))
+            B[:, 0, 0] = x[:, 1, 1] - x[:, 2, 1]
+            B[:, 0, 1] = x[:, 2, 1] - x[:, 0, 1]
+            B[:, 0, 2] = x[:, 0, 1] - x[:, 1, 1]
+            B[:, 1, 0] = x[:, 2, 0] - x[:, 1, 0]
+            B[:, 1, 1] = x[:, 0, 0] - x[:, 2, 0]
+            B[:, 1, 2] = x[:, 1, 0] - x[:, 0, 0]
+            double_areas = 2 * self.signed_areas
+            nonzero = double_areas != 0
+            B[nonzero] /= double_areas[nonzero, None, None]
+            B[~nonzero] = 0
+            self._gradient_matrices = B
+        return self._gradient_matrices
+
+    @property
+    def strain_matrices(self):
+        """
+        Plane strain-displacement matrices, shape (num_elements, 3, 6), for the element DOF
+        vector [u_x1, u_y1, u_x2, u_y2, u_x3, u_y3].
+        """
+        if self._strain_matrices is None:
+            G = self.gradient_matrices
+            B = np.zeros((self.num_elements, 3, 6))
+            B[:, 0, 0::2] = G[:, 0]
+            B[:, 1, 1::2] = G[:, 1]
+            B[:, 2, 0::2] = G[:, 1]
+            B[:, 2, 1::2] = G[:, 0]
+            self._strain_matrices = B
+        return self._strain_matrices
+
+    @property
+    def node_elements(self):
+        """
+        Node-to-element incidence as a CSR matrix of shape (num_nodes, num_elements).
+
+        Row i lists the elements around node i (indptr/indices form the adjacency); the
+        matrix also maps element values to nodal sums with a single product.
+        """
+        if self._node_elements is None:
+            rows = self.connectivity.ravel()
+            cols = np.repeat(np.arange(self.num_elements, dtype=np.int32), 3)
+            self._node_elements = sparse.csr_matrix(
+                (np.ones(len(rows)), (rows, cols)), shape=(self.num_nodes, self.num_elements)
+            )
+        return self._node_elements
+
+    def _build_edges(self):
+        local_edges = self.connectivity[:, [[0, 1], [1, 2], [2, 0]]].reshape(-1, 2)
+        # Unique edges through a scalar key per sorted node pair (much faster than unique rows)
+        sorted_edges = np.sort(local_edges, axis=1).astype(np.int64)
+        keys, inverse, counts = np.unique(
+            sorted_edges[:, 0] * self.num_nodes + sorted_edges[:, 1], return_inverse=True, return_counts=True
+        )
+        edges = np.column_stack([keys // self.num_nodes, keys % self.num_nodes])
+        inverse = inverse.ravel()
+
+        # The (at most two) elements on each side of every edge, -1 on the boundary
+        order = np.argsort(inverse, kind="stable")
+        starts = np.concatenate([[0], np.cumsum(counts)[:-1]])
+        edge_elements = np.full((len(edges), 2), -1, dtype=np.int32)
+        edge_elements[:, 0] = order[starts] // 3
+        interior = counts > 1
+        edge_elements[interior, 1] = order[starts[interior] + 1] // 3
+
+        # Boundary edges oriented with the domain on their left (counter-clockwise)
+        boundary_local = order[starts[counts == 1]]
+        boundary_elements = boundary_local // 3
+        boundary_edges = local_edges[boundary_local]
+        clockwise = self.signed_areas[boundary_elements] < 0
+        boundary_edges[clockwise] = boundary_edges[clockwise, ::-1]
+
+        self._edges = edges.astype(np.int32)
+        self._element_edges = inverse.reshape(-1, 3).astype(np.int32)
+        self._edge_elements = edge_elements
+        self._boundary_edges = boundary_edges.astype(np.int32)
+        self._boundary_edge_elements = boundary_elements.astype(np.int32)
+
+    @property
+    def edges(self):
+        """Unique edges [n1, n2] (n1 < n2)."""
+        if self._edges is None:
+            self._build_edges()
+        return self._edges
+
+    @property
+    def element_edges(self):
+        """Index into edges of the three edges of every element."""
+        if self._element_edges is None:
+            self._build_edges()
+        return self._element_edges
+
+    @property
+    def edge_elements(self):
+        """The elements on both sides of every edge, -1 for the missing side of a boundary edge."""
+        if self._edge_elements is None:
+            self._build_edges()
+        return self._edge_elements
+
+    @property
+    def boundary_edges(self):
+        """Boundary edges [n1, n2], oriented counter-clockwise around the domain."""
+        if self._boundary_edges is None:
+            self._build_edges()
+        return self._boundary_edges
+
+    @property
+    def boundary_edge_elements(self):
+        """The element that owns every boundary edge."""
+        if self._boundary_edge_elements is None:
+            self._build_edges()
+        return self._boundary_edge_elements
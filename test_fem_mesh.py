@@ -0,0 +1,80 @@
+import numpy as np
+import pytest
+
+from fem_mesh import TriangleMesh
+
+
+def unit_square(n=4):
+    # n x n cells of two counter-clockwise triangles each
+    x = np.linspace(0, 1, n + 1)
+    X, Y = np.meshgrid(x, x)
+    corners = (np.arange(n)[:, None] * (n + 1) + np.arange(n)).ravel()
+    connectivity = np.concatenate([
+        np.column_stack([corners, corners + 1, corners + n + 2]),
+        np.column_stack([corners, corners + n + 2, corners + n + 1]),
+    ])
+    return TriangleMesh(np.column_stack([X.ravel(), Y.ravel()]), connectivity)
+
+
+def test_geometric_data():
+    mesh = unit_square()
+    assert mesh.coordinates.dtype == np.float64 and mesh.connectivity.dtype == np.int32
+    assert np.all(mesh.signed_areas > 0)
+    assert np.isclose(mesh.areas.sum(), 1.0)
+
+    # The shape function gradients reproduce the gradient of a linear field
+    field = 2 * mesh.coordinates[:, 0] - 3 * mesh.coordinates[:, 1]
+    gradients = np.einsum("eij,ej->ei", mesh.gradient_matrices, field[mesh.connectivity])
+    np.testing.assert_allclose(gradients, np.tile([2.0, -3.0], (mesh.num_elements, 1)))
+
+    # Rigid translations are strain free
+    translation = np.tile([0.3, -0.7], 3)
+    np.testing.assert_allclose(mesh.strain_matrices @ translation, 0, atol=1e-12)
+
+    assert mesh.node_elements.shape == (mesh.num_nodes, mesh.num_elements)
+    np.testing.assert_array_equal(mesh.node_elements @ np.ones(mesh.num_elements), np.bincount(mesh.connectivity.ravel()))
+
+
+def test_edges_and_boundary():
+    mesh = unit_square()
+    # Euler's formula for a disc: V - E + F = 1
+    assert mesh.num_nodes - len(mesh.edges) + mesh.num_elements == 1
+    assert np.all(mesh.edges[:, 0] < mesh.edges[:, 1])
+    element_edge_nodes = np.sort(mesh.edges[mesh.element_edges].reshape(mesh.num_elements, -1), axis=1)
+    np.testing.assert_array_equal(element_edge_nodes[:, ::2], np.sort(mesh.connectivity, axis=1))
+    assert np.sum(mesh.edge_elements[:, 1] == -1) == len(mesh.boundary_edges) == 16
+
+    # Counter-clockwise boundary: the shoelace sum is the (positive) area
+    start, end = mesh.coordinates[mesh.boundary_edges[:, 0]], mesh.coordinates[mesh.boundary_edges[:, 1]]
+    assert np.isclose(0.5 * np.sum(start[:, 0] * end[:, 1] - end[:, 0] * start[:, 1]), 1.0)
+    owners = mesh.connectivity[mesh.boundary_edge_elements]
+    assert np.all((owners[:, :, None] == mesh.boundary_edges[:, None, :]).any(axis=1))
+
+
+def test_from_tags_and_merge():
+    mesh = unit_square(2)
+    tags = 10 + 3 * np.arange(mesh.num_nodes)
+    rebuilt = TriangleMesh.from_tags(tags, mesh.coordinates, tags[mesh.connectivity].ravel())
+    np.testing.assert_array_equal(rebuilt.connectivity, mesh.connectivity)
+    with pytest.raises(ValueError):
+        TriangleMesh.from_tags(tags, mesh.coordinates, [[10, 13, 11]])
+
+    # Two halves meshed with duplicated interface nodes become one conforming mesh
+    left = mesh.connectivity[:4]
+    right = mesh.connectivity[4:] + mesh.num_nodes
+    doubled = TriangleMesh(np.vstack([mesh.coordinates, mesh.coordinates]), np.vstack([left, right]))
+    merged = doubled.merge_coincident_nodes()
+    assert merged.num_nodes == mesh.num_nodes
+    assert len(merged.boundary_edges) == len(mesh.boundary_edges)
+
+
+def test_refine():
+    mesh = TriangleMesh(unit_square(2).coordinates, unit_square(2).connectivity, physical_tags=np.arange(8) % 2 + 1)
+    fine = mesh.refine()
+    assert fine.num_elements == 4 * mesh.num_elements
+    assert fine.num_nodes == mesh.num_nodes + len(mesh.edges)
+    np.testing.assert_array_equal(fine.coordinates[:mesh.num_nodes], mesh.coordinates)
+    np.testing.assert_allclose(fine.coordinates[mesh.num_nodes:], mesh.coordinates[mesh.edges].mean(axis=1))
+    assert np.all(fine.signed_areas > 0)
+    np.testing.assert_allclose([fine.areas[fine.group(tag)].sum() for tag in (1, 2)],
+                               [mesh.areas[mesh.group(tag)].sum() for tag in (1, 2)])